@@ -0,0 +1,376 @@
+"""
+Adafruit.IO feed helpers for CircuitPython NeoPixel control
+A persistent MQTT subscription to the pattern feed, an adaptive HTTP
+poller as the fallback, and a coalescing queue for outbound status updates
+
+With a subscription, Adafruit.IO pushes each new feed value to the device
+over one long-lived connection, so pattern changes arrive within a network
+round trip and an idle feed costs nothing. When MQTT is unavailable the
+poller fetches the feed's last value over HTTP, skipping unchanged data
+and slowing down while the feed is idle or the service is failing.
+
+Status updates are queued rather than sent inline. Only the latest state
+matters, so a newer update replaces one still waiting, and the main loop
+sends it when no frame is due.
+"""
+
+import random
+
+try:
+    import adafruit_minimqtt.adafruit_minimqtt as MQTT
+except ImportError:
+    MQTT = None  # MQTT library not installed - use HTTP polling only
+
+AIO_BROKER = "io.adafruit.com"
+AIO_MQTT_PORT = 8883  # MQTT over TLS
+
+class FeedSubscription:
+    """Long-lived MQTT subscription to one Adafruit.IO feed"""
+
+    def __init__(self, username, key, feed, socket_pool=None, ssl_context=None,
+                 client=None, loop_timeout=0.01, socket_timeout=1):
+        """
+        Initialize subscription
+
+        Args:
+            username: Adafruit.IO username
+            key: Adafruit.IO key
+            feed: Feed name
+            socket_pool: socketpool.SocketPool for the MQTT client
+            ssl_context: SSL context for the MQTT client
+            client: Optional pre-built MQTT client (e.g. a local broker stand-in);
+                by default an adafruit_minimqtt client for io.adafruit.com is created
+            loop_timeout: Seconds each poll() may wait on the socket
+            socket_timeout: Seconds the client may wait while connecting and
+                sending, which includes the TLS handshake
+        """
+        self.topic = f"{username}/feeds/{feed}"
+        self.loop_timeout = loop_timeout
+        self.socket_timeout = socket_timeout
+        self.connected = False
+        self.pending = None  # Latest value not yet taken by poll()
+        self.messages = 0
+
+        if client is None:
+            if MQTT is None:
+                raise RuntimeError("adafruit_minimqtt is not installed")
+            client = MQTT.MQTT(
+                broker=AIO_BROKER,
+                port=AIO_MQTT_PORT,
+                username=username,
+                password=key,
+                socket_pool=socket_pool,
+                ssl_context=ssl_context,
+                is_ssl=True,
+                socket_timeout=socket_timeout,
+            )
+        self.client = client
+        client.on_message = self._on_message
+        client.on_disconnect = self._on_disconnect
+
+    def _on_message(self, client, topic, message):
+        """Keep only the most recent value"""
+        if topic == self.topic:
+            self.pending = message
+            self.messages += 1
+
+    def _on_disconnect(self, client, userdata, rc):
+        self.connected = False
+
+    def connect(self):
+        """
+        Connect, subscribe and ask Adafruit.IO to resend the feed's last value
+
+        Returns:
+            True if subscribed
+        """
+        try:
+            self._set_socket_timeout(self.socket_timeout)
+            self.client.connect()
+            self.client.subscribe(self.topic)
+            # Publishing to <feed>/get makes Adafruit.IO republish the last value
+            self.client.publish(self.topic + "/get", "\0")
+            # minimqtt will not loop() for less than its socket timeout
+            self._set_socket_timeout(self.loop_timeout)
+            self.connected = True
+        except Exception as e:
+            print(f"MQTT connection failed: {e}")
+            self.connected = False
+        return self.connected
+
+    def _set_socket_timeout(self, seconds):
+        """Change the minimqtt client's socket timeout (other clients have none)"""
+        if hasattr(self.client, "_socket_timeout"):
+            self.client._socket_timeout = seconds
+
+    def poll(self):
+        """
+        Service the connection and take the latest received value
+
+        Returns:
+            Latest feed value string, or None if nothing new arrived
+        """
+        if not self.connected:
+            return None
+
+        try:
+            self.client.loop(timeout=self.loop_timeout)
+        except Exception as e:
+            print(f"MQTT connection lost: {e}")
+            self.connected = False
+
+        value = self.pending
+        self.pending = None
+        return value
+
+    def publish(self, value):
+        """
+        Publish a value to the feed over the open connection
+
+        Args:
+            value: Value to publish
+
+        Returns:
+            True if the value was handed to the connection
+        """
+        if not self.connected:
+            return False
+
+        try:
+            self.client.publish(self.topic, value)
+            return True
+        except Exception as e:
+            print(f"MQTT publish failed: {e}")
+            self.connected = False
+            return False
+
+    def disconnect(self):
+        """Close the connection"""
+        try:
+            self.client.disconnect()
+        except Exception:
+            pass
+        self.connected = False
+
+class FeedPoller:
+    """HTTP poller for a feed's last value with adaptive interval and backoff"""
+
+    def __init__(self, session, username, key, feed, fast_interval=0.5, slow_interval=5.0,
+                 idle_after=30.0, max_backoff=60.0):
+        """
+        Initialize poller
+
+        Args:
+            session: adafruit_requests Session
+            username: Adafruit.IO username
+            key: Adafruit.IO key
+            feed: Feed name
+            fast_interval: Seconds between polls right after a change
+            slow_interval: Longest interval between polls while the feed is idle
+            idle_after: Seconds without a change before the interval starts to grow
+            max_backoff: Longest wait after repeated failures or rate limiting
+        """
+        self.session = session
+        self.url = f"https://io.adafruit.com/api/v2/{username}/feeds/{feed}/data/last"
+        self.headers = {"X-AIO-Key": key}
+        self.fast_interval = fast_interval
+        self.slow_interval = slow_interval
+        self.idle_after = idle_after
+        self.max_backoff = max_backoff
+
+        self.interval = fast_interval
+        self.next_poll = 0
+        self.last_change = 0
+        self.failures = 0
+        self.etag = None
+        self.last_created_at = None  # Timestamp of the last value seen
+        self.polls = 0
+        self.unchanged = 0  # Polls that found nothing new
+
+    def due(self, now):
+        """True when the next poll should run"""
+        return now >= self.next_poll
+
+    def note_change(self, now):
+        """Poll quickly again, e.g. after the pattern changed through another path"""
+        self.last_change = now
+        self.interval = self.fast_interval
+        self.next_poll = min(self.next_poll, now + self.fast_interval)
+
+    def _schedule(self, now, changed):
+        """Pick the next poll time after a successful request"""
+        self.failures = 0
+        if changed:
+            self.note_change(now)
+        elif now - self.last_change >= self.idle_after:
+            # Idle feed: stretch the interval toward slow_interval
+            self.interval = min(self.slow_interval, self.interval * 1.5)
+        self.next_poll = now + self.interval
+
+    def _back_off(self, now, retry_after=None):
+        """Wait exponentially longer after each failure, with jitter"""
+        self.failures += 1
+        delay = min(self.max_backoff, self.fast_interval * (2 ** self.failures))
+        delay *= 0.5 + random.random() / 2
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        self.next_poll = now + delay
+
+    def poll(self, now):
+        """
+        Fetch the feed's last value if it changed since the previous poll
+
+        Args:
+            now: Current time.monotonic() value
+
+        Returns:
+            The new feed value, or None if unchanged or the request failed
+        """
+        self.polls += 1
+        headers = self.headers
+        if self.etag is not None:
+            headers = {"X-AIO-Key": headers["X-AIO-Key"], "If-None-Match": self.etag}
+
+        try:
+            response = self.session.get(self.url, headers=headers)
+        except Exception as e:
+            print(f"Error getting pattern from Adafruit.IO: {e}")
+            self._back_off(now)
+            return None
+
+        try:
+            status = response.status_code
+            if status == 304:
+                self.unchanged += 1
+                self._schedule(now, False)
+                return None
+
+            if status == 429:
+                # Rate limited - honour Retry-After when the service sends it
+                retry_after = response.headers.get("retry-after")
+                try:
+                    retry_after = float(retry_after) if retry_after is not None else None
+                except ValueError:
+                    retry_after = None
+                print("Adafruit.IO rate limit reached, backing off")
+                self._back_off(now, retry_after)
+                return None
+
+            if status != 200:
+                print(f"Failed to get pattern: {status}")
+                self._back_off(now)
+                return None
+
+            self.etag = response.headers.get("etag")
+            data = response.json()
+        except Exception as e:
+            print(f"Error getting pattern from Adafruit.IO: {e}")
+            self._back_off(now)
+            return None
+        finally:
+            response.close()
+
+        created_at = data.get("created_at")
+        if created_at is not None and created_at == self.last_created_at:
+            self.unchanged += 1
+            self._schedule(now, False)
+            return None
+
+        self.last_created_at = created_at
+        self._schedule(now, True)
+        return data.get("value", "")
+
+class StatusQueue:
+    """Outbound status updates where only the latest state matters"""
+
+    def __init__(self, send, retry_interval=5.0, max_attempts=3):
+        """
+        Initialize queue
+
+        Args:
+            send: Callable taking the value to send, returning True on success
+            retry_interval: Seconds to wait before retrying a failed send
+            max_attempts: Sends tried before a value is dropped
+        """
+        self.send = send
+        self.retry_interval = retry_interval
+        self.max_attempts = max_attempts
+        self.pending = None
+        self.attempts = 0
+        self.next_attempt = 0
+        self.submitted = 0
+        self.sent = 0
+        self.coalesced = 0  # Updates replaced by a newer one before they were sent
+        self.dropped = 0  # Updates given up on after max_attempts failures
+
+    @property
+    def depth(self):
+        """Number of updates waiting to be sent (0 or 1)"""
+        return 0 if self.pending is None else 1
+
+    def submit(self, value):
+        """
+        Queue a status value, replacing any value not yet sent
+
+        Args:
+            value: Status value to send
+        """
+        if self.pending is not None:
+            self.coalesced += 1
+        self.pending = value
+        self.attempts = 0
+        self.next_attempt = 0
+        self.submitted += 1
+
+    def flush(self, now):
+        """
+        Send the pending value if there is one and it is not waiting to retry
+
+        Args:
+            now: Current time.monotonic() value
+
+        Returns:
+            True if a value was sent
+        """
+        if self.pending is None or now < self.next_attempt:
+            return False
+
+        try:
+            ok = self.send(self.pending)
+        except Exception as e:
+            print(f"Error updating status: {e}")
+            ok = False
+
+        if ok:
+            self.pending = None
+            self.sent += 1
+            return True
+
+        self.attempts += 1
+        if self.attempts >= self.max_attempts:
+            print(f"Dropping status update: {self.pending}")
+            self.pending = None
+            self.dropped += 1
+        else:
+            self.next_attempt = now + self.retry_interval
+        return False
+
+    def stats(self):
+        """
+        Queue counters
+
+        Returns:
+            dict with depth, submitted, sent, coalesced and dropped counts
+        """
+        return {
+            "depth": self.depth,
+            "submitted": self.submitted,
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+        }
+
+    def report(self):
+        """One-line summary for the console"""
+        return (f"Status queue: {self.depth} waiting, {self.submitted} submitted, {self.sent} sent, "
+                f"{self.coalesced} coalesced, {self.dropped} dropped")
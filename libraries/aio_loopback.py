@@ -0,0 +1,74 @@
+"""
+Loopback MQTT broker for the Adafruit.IO feed helpers
+An in-process stand-in for io.adafruit.com and adafruit_minimqtt, so
+FeedSubscription can be exercised on a workstation without a network
+
+Pass LoopbackBroker().client() to FeedSubscription as its client.
+"""
+
+class LoopbackBroker:
+    """
+    In-process stand-in for an MQTT broker such as Adafruit.IO
+
+    Keeps the last value published to each topic and, like Adafruit.IO,
+    republishes it when a client publishes to "<topic>/get".
+    """
+
+    def __init__(self):
+        self.clients = []
+        self.retained = {}
+
+    def client(self):
+        """Create a client attached to this broker"""
+        return LoopbackMQTT(self)
+
+    def publish(self, topic, message):
+        """Deliver a message to every client subscribed to the topic"""
+        if topic.endswith("/get"):
+            topic = topic[:-4]
+            message = self.retained.get(topic)
+            if message is None:
+                return
+        else:
+            self.retained[topic] = message
+
+        for client in self.clients:
+            if topic in client.subscriptions:
+                client.inbox.append((topic, message))
+
+class LoopbackMQTT:
+    """MQTT client for LoopbackBroker with the adafruit_minimqtt calls FeedSubscription uses"""
+
+    def __init__(self, broker):
+        self.broker = broker
+        self.subscriptions = set()
+        self.inbox = []
+        self.on_message = None
+        self.on_disconnect = None
+        self.is_connected = False
+
+    def connect(self):
+        if self not in self.broker.clients:
+            self.broker.clients.append(self)
+        self.is_connected = True
+
+    def subscribe(self, topic):
+        self.subscriptions.add(topic)
+
+    def publish(self, topic, message):
+        self.broker.publish(topic, message)
+
+    def loop(self, timeout=0):
+        """Hand queued messages to on_message"""
+        inbox = self.inbox
+        self.inbox = []
+        for topic, message in inbox:
+            if self.on_message is not None:
+                self.on_message(self, topic, message)
+
+    def disconnect(self):
+        if self in self.broker.clients:
+            self.broker.clients.remove(self)
+        self.is_connected = False
+        if self.on_disconnect is not None:
+            self.on_disconnect(self, None, 0)
@@ -0,0 +1,158 @@
+"""
+Pattern benchmark suite
+Runs every pattern and every BasePattern effect in the host-side simulator at
+several strip lengths and reports the cost of each as JSON
+
+For each run it reports:
+- fps: frames shown per second of real render time (the rate the host could
+  sustain if it did nothing else)
+- show_calls: number of show() calls
+- transmits: number of frames actually sent (show() skips unchanged frames)
+- alloc_peak_bytes: peak Python heap growth while running (tracemalloc)
+- alloc_frames: frames that left memory allocated after rendering (GCMonitor)
+- alloc_bytes_per_frame: average bytes left allocated per rendered frame
+- worst_step_ms: longest single frame render
+
+Usage:
+    python benchmark.py                           # everything, JSON to stdout
+    python benchmark.py --pixels 90 --pixels 300 --output bench.json
+    python benchmark.py --only patterns --seconds 10
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from config import PATTERN_NAMES
+from patterns.base_pattern import BasePattern
+from patterns.playlist import PlaylistPattern, builtin_playlists
+from patterns.simulator import Simulator
+from patterns.gcmonitor import GCMonitor
+
+STRIP_LENGTHS = [30, 90, 300, 1000]
+
+# Effect generator name and arguments, matching how the patterns use them
+EFFECTS = [
+    ("color_wipe", ((255, 0, 0), 20)),
+    ("fast_color_wipe", ((255, 0, 0), 10)),
+    ("theater_chase", ((127, 127, 127), 30)),
+    ("rainbow_cycle", (1, 5)),
+    ("rainbow", (5,)),
+    ("theater_chase_rainbow", (30,)),
+    ("candy_cane", (5, 8, 30)),
+    ("random_white", (10, 100)),
+    ("rainbow_stripe", (2, 4, 50)),
+    ("random_color", (10, 100)),
+    ("alternate_color", ((255, 0, 0), (0, 255, 0), 50)),
+    ("random_position_fill", ((255, 0, 0), 30)),
+    ("middle_fill", ((0, 255, 0), 30)),
+    ("side_fill", ((255, 255, 255), 30)),
+    ("interleave_fill", (((255, 0, 0), (255, 35, 0), (255, 255, 15)), 100, 50)),
+    ("twinkle", (((255, 0, 0), (255, 255, 15), (255, 35, 0)), 200, 50)),
+]
+
+def measure(kind, name, make_frames, num_pixels, seconds):
+    """
+    Run one frame generator in the simulator and collect its numbers
+
+    Args:
+        kind: "pattern" or "effect"
+        name: Pattern or effect name
+        make_frames: Callable taking a FrameBuffer and returning a frame generator
+        num_pixels: Strip length
+        seconds: Virtual seconds to run for (effects stop earlier when they finish)
+
+    Returns:
+        dict of results
+    """
+    random.seed(0)
+    monitor = GCMonitor()
+    sim = Simulator(num_pixels, record=False, timer=time.perf_counter, monitor=monitor)
+    frames = make_frames(sim.frame)
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    sim.run(frames, seconds)
+    # The monitor resets the peak every frame and keeps the highest one itself
+    peak = max(tracemalloc.get_traced_memory()[1], monitor.heap_peak)
+    tracemalloc.stop()
+
+    shows = sim.frame.show_count
+    return {
+        "kind": kind,
+        "name": name,
+        "pixels": num_pixels,
+        "virtual_seconds": round(sim.clock.now, 3),
+        "frames": sim.steps,
+        "show_calls": shows,
+        "transmits": sim.frame.transmit_count,
+        "fps": round(shows / sim.busy_time, 1) if sim.busy_time > 0 else None,
+        "alloc_peak_bytes": max(0, peak - baseline),
+        "alloc_frames": monitor.alloc_frames,
+        "alloc_bytes_per_frame": round(monitor.alloc_bytes / monitor.frames, 1) if monitor.frames else 0,
+        "worst_step_ms": round(sim.worst_step * 1000.0, 3),
+    }
+
+def run_benchmarks(lengths, seconds, only=None):
+    """
+    Benchmark the patterns and/or effects at each strip length
+
+    Args:
+        lengths: List of strip lengths
+        seconds: Virtual seconds per run
+        only: "patterns", "effects" or None for both
+
+    Returns:
+        List of result dicts
+    """
+    playlists = builtin_playlists()
+    results = []
+    for num_pixels in lengths:
+        if only in (None, "patterns"):
+            for name in PATTERN_NAMES:
+                results.append(measure(
+                    "pattern", name,
+                    lambda frame, playlist=playlists[name]:
+                        PlaylistPattern(frame, num_pixels, playlist).frames(),
+                    num_pixels, seconds))
+
+        if only in (None, "effects"):
+            for name, args in EFFECTS:
+                results.append(measure(
+                    "effect", name,
+                    lambda frame, name=name, args=args:
+                        getattr(BasePattern(frame, num_pixels), name + "_frames")(*args),
+                    num_pixels, seconds))
+    return results
+
+def main():
+    """Run the benchmarks and write JSON"""
+    parser = argparse.ArgumentParser(description="Benchmark NeoPixel patterns and effects")
+    parser.add_argument("--pixels", type=int, action="append",
+                        help="Strip length (repeatable, default 30, 90, 300, 1000)")
+    parser.add_argument("--seconds", type=float, default=30.0,
+                        help="Virtual seconds per run (default 30)")
+    parser.add_argument("--only", choices=["patterns", "effects"], help="Only run one group")
+    parser.add_argument("--output", help="Write JSON to this file instead of stdout")
+    args = parser.parse_args()
+
+    lengths = args.pixels or STRIP_LENGTHS
+    report = {
+        "python": platform.python_implementation() + " " + platform.python_version(),
+        "virtual_seconds": args.seconds,
+        "results": run_benchmarks(lengths, args.seconds, args.only),
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+if __name__ == "__main__":
+    main()
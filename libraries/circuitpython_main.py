@@ -24,67 +24,177 @@ Control:
 import board
 import neopixel
 import time
-import random
 import wifi
 import socketpool
 import ssl
 import adafruit_requests
 import supervisor
 import json
-from adafruit_seesaw import seesaw, neopixel
+from adafruit_seesaw import seesaw
 import busio
- # Default NeoPixel pin for Qtpy
+
+try:
+    import asyncio
+except ImportError:
+    asyncio = None  # asyncio library not installed - run the single main loop
+
+# Default configuration, for settings config.py leaves out (or all of them
+# without a config.py), so a config.py from an older version still works
+WIFI_SSID = "your_wifi_ssid"
+WIFI_PASSWORD = "your_wifi_password"
+AIO_USERNAME = "your_adafruit_io_username"
+AIO_KEY = "your_adafruit_io_key"
+AIO_FEED = "neopixel-pattern"
+AIO_USE_MQTT = True
+NUM_PIXELS = 90
+STRIPS = None  # One seesaw strip of NUM_PIXELS, set below once NUM_PIXELS is known
+BRIGHTNESS = 0.3
+GAMMA = 2.8
+DITHER = False
+TARGET_FPS = 100
+GC_MONITOR = False
+FRAME_STATS = False
+TRANSITION_MS = 500
+FRAME_CACHE_KB = 32
+PLAYLIST_FILE = "playlists.json"
+PATTERN_NAMES = ["fall", "july", "xmas", "normal", "alert", "blue", "pink"]
+ZONED_PATTERNS = {}
+ANIMATIONS = {}
+STATUS_PIXEL = None
 
 # Import configuration
 try:
     from config import *
 except ImportError:
     print("config.py not found. Using default configuration.")
-    # Default configuration
-    WIFI_SSID = "your_wifi_ssid"
-    WIFI_PASSWORD = "your_wifi_password"
-    AIO_USERNAME = "your_adafruit_io_username"
-    AIO_KEY = "your_adafruit_io_key"
-    AIO_FEED = "neopixel-pattern"
-    NUM_PIXELS = 90
-    BRIGHTNESS = 0.3
-    PATTERN_NAMES = ["fall", "july", "xmas", "normal", "alert", "blue", "pink"]
+
+if STRIPS is None:
+    STRIPS = [(0x60, 15, NUM_PIXELS)]
 
 # Configuration
 
 i2c = busio.I2C(board.SCL1, board.SDA1)
-ss = seesaw.Seesaw(i2c, addr=0x60)
-
-NEOPIXEL_PIN = 15  # Default NeoPixel pin for Qtpy
-
-# Initialize NeoPixels
-pixels = neopixel.NeoPixel(ss, NEOPIXEL_PIN, NUM_PIXELS, brightness = 1.0, auto_write = False, pixel_order = neopixel.GRB)
-
-# Pattern classes
-from patterns.fall_pattern import FallPattern
-from patterns.july_pattern import JulyPattern
-from patterns.xmas_pattern import XmasPattern
-from patterns.norm_pattern import NormPattern
-from patterns.alert_pattern import AlertPattern
-from patterns.blue_pattern import BluePattern
-from patterns.pink_pattern import PinkPattern
-
-# Pattern instances
-patterns = [
-    FallPattern(pixels, NUM_PIXELS),
-    JulyPattern(pixels, NUM_PIXELS),
-    XmasPattern(pixels, NUM_PIXELS),
-    NormPattern(pixels, NUM_PIXELS),
-    AlertPattern(pixels, NUM_PIXELS),
-    BluePattern(pixels, NUM_PIXELS),
-    PinkPattern(pixels, NUM_PIXELS)
-]
+seesaws = {}  # Seesaw for each I2C address in STRIPS
+
+# Pattern modules
+from patterns.playlist import PlaylistPattern, builtin_playlists, load_playlists
+from patterns.registry import OFF, PatternRegistry
+from patterns.scheduler import FrameScheduler
+from patterns.gcmonitor import GCMonitor
+from patterns.framebuffer import FrameBuffer, PixelBufOutput, Zone
+from patterns.zones import ZonedPattern
+from patterns.animation import AnimationPattern
+from patterns.segments import chain
+from patterns.seesaw_output import SeesawOutput
+from patterns.correction import CorrectedOutput
+from patterns.layers import Compositor
+from patterns.framecache import FrameCache
+from patterns.transition import Crossfade
+from aio_feed import FeedPoller, FeedSubscription, StatusQueue
+
+def make_output(address, pin, num_pixels):
+    """
+    Create the output for one strip in STRIPS
+
+    Args:
+        address: I2C address of the seesaw driving the strip, or None for a native pin
+        pin: Seesaw pin number, or board pin name (e.g. "D5") for a native pin
+        num_pixels: Number of pixels on the strip
+
+    Returns:
+        Output object with a write(frame) method
+    """
+    if address is None:
+        pixels = neopixel.NeoPixel(getattr(board, pin), num_pixels, brightness=1.0,
+                                   auto_write=False, pixel_order=neopixel.GRB)
+        return PixelBufOutput(pixels)
+    if address not in seesaws:
+        seesaws[address] = seesaw.Seesaw(i2c, addr=address)
+    # Full-size I2C chunks with one latch per frame
+    return SeesawOutput(seesaws[address], pin, num_pixels * 3)
+
+# Initialize NeoPixels: the strips in STRIPS laid end to end as one logical
+# strip, rendered into a shared frame in GRB wire order, with the overlay
+# layers blended on top, gamma and brightness corrected (and dithered if
+# DITHER is on), then split back over the strips
+strips = chain([(make_output(*strip), strip[2]) for strip in STRIPS])
+NUM_PIXELS = strips.num_pixels
+strip_output = CorrectedOutput(strips, NUM_PIXELS, "GRB", GAMMA, BRIGHTNESS, dither=DITHER)
+compositor = Compositor(strip_output, NUM_PIXELS, "GRB")
+frame = FrameBuffer(NUM_PIXELS, compositor, "GRB")
+# Overlay showing a red pixel while Adafruit.IO is not connected
+status_layer = compositor.layer("alpha") if STATUS_PIXEL is not None else None
+crossfade = Crossfade(frame, TRANSITION_MS)  # Blends the strip into each new pattern
+
+# Frames of deterministic effects, kept to replay them instead of redrawing
+frame_cache = FrameCache(FRAME_CACHE_KB * 1024) if FRAME_CACHE_KB else None
+
+# Pattern playlists: the built-in themes, plus any added or replaced in playlists.json
+playlists = builtin_playlists()
+try:
+    playlists.update(load_playlists(PLAYLIST_FILE))
+    print(f"Loaded playlists from {PLAYLIST_FILE}")
+except OSError:
+    pass  # No playlist file - built-in playlists only
+except ValueError as e:
+    print(f"Error in {PLAYLIST_FILE}: {e}")
+
+def zoned_pattern(zones):
+    """
+    Create a pattern playing playlists side by side in zones of the strip
+
+    Args:
+        zones: List of (playlist name, first pixel, pixels, options) from ZONED_PATTERNS
+
+    Returns:
+        ZonedPattern
+    """
+    parts = []
+    for name, start, length, options in zones:
+        if name not in playlists:
+            raise ValueError(f"No playlist for zone {name!r}")
+        zone = Zone(frame, start, length, "reverse" in options, "mirror" in options)
+        parts.append(PlaylistPattern(zone, zone.num_pixels, playlists[name], frame_cache))
+    return ZonedPattern(frame, NUM_PIXELS, parts)
+
+# Pattern instances, registered in PATTERN_NAMES order so IDs match the
+# numbers the feed accepts
+patterns = PatternRegistry()
+for name in PATTERN_NAMES:
+    if name in ZONED_PATTERNS:
+        patterns.register(name, zoned_pattern(ZONED_PATTERNS[name]))
+        continue
+    if name in ANIMATIONS:
+        patterns.register(name, AnimationPattern(frame, NUM_PIXELS, ANIMATIONS[name]))
+        continue
+    if name not in playlists:
+        raise ValueError(f"No playlist for pattern {name!r}")
+    playlist = playlists[name]
+    patterns.register(name, PlaylistPattern(frame, NUM_PIXELS, playlist, frame_cache),
+                      playlist.aliases)
+for alias, name in patterns.shadowed:
+    print(f"Alias {alias!r} of {name!r} is taken by another pattern - ignoring it")
 
 current_pattern = 0
-last_pattern = -1
 requests = None
 adafruit_io_connected = False
-pattern_state = {}  # Store pattern state for smooth transitions
+feed_subscription = None  # MQTT subscription to the pattern feed, None when polling over HTTP
+feed_poller = None  # HTTP poller used while there is no MQTT subscription
+STATUS_SLOT = 0.02  # Only send a status update when the next frame is at least this far off
+# Measures heap allocation per frame when GC_MONITOR is on
+gc_monitor = GCMonitor() if GC_MONITOR else None
+scheduler = FrameScheduler(gc_monitor)  # Drives the current pattern one frame at a time
+
+STREAM_INTERVAL = 0.05  # Service the MQTT subscription every 50ms
+RECONNECT_INTERVAL = 30  # Retry a dropped MQTT subscription every 30 seconds
+FRAME_INTERVAL = 1.0 / TARGET_FPS  # Shortest time between two frames
+IDLE_WAIT = 0.05  # Longest a task sleeps before checking for new work
+INPUT_INTERVAL = 0.1  # Serial console check interval
+STATS_INTERVAL = 10  # Seconds between GC and frame timing reports
+last_stream_time = 0
+last_reconnect_time = 0
+last_refresh_time = 0  # When the dithered frame was last sent
+last_stats_time = 0
 
 def connect_wifi():
     """Connect to WiFi network"""
@@ -100,68 +210,76 @@ def connect_wifi():
 
 def setup_adafruit_io():
     """Setup Adafruit.IO connection"""
-    global requests, adafruit_io_connected
+    global requests, adafruit_io_connected, feed_poller
     
     if not connect_wifi():
         return False
         
     try:
         pool = socketpool.SocketPool(wifi.radio)
-        requests = adafruit_requests.Session(pool, ssl.create_default_context())
+        ssl_context = ssl.create_default_context()
+        requests = adafruit_requests.Session(pool, ssl_context)
+        feed_poller = FeedPoller(requests, AIO_USERNAME, AIO_KEY, AIO_FEED)
         print("Adafruit.IO connection setup complete")
         adafruit_io_connected = True
+        
+        if AIO_USE_MQTT:
+            setup_feed_subscription(pool, ssl_context)
         return True
     except Exception as e:
         print(f"Adafruit.IO setup failed: {e}")
         adafruit_io_connected = False
         return False
 
-def get_pattern_from_adafruit_io():
-    """Get current pattern selection from Adafruit.IO"""
-    global requests, current_pattern, adafruit_io_connected
+def setup_feed_subscription(pool, ssl_context):
+    """Subscribe to the pattern feed over MQTT, falling back to HTTP polling on failure"""
+    global feed_subscription
     
-    if not requests or not adafruit_io_connected:
-        return current_pattern
-        
     try:
-        url = f"https://io.adafruit.com/api/v2/{AIO_USERNAME}/feeds/{AIO_FEED}/data/last"
-        headers = {"X-AIO-Key": AIO_KEY}
+        feed_subscription = FeedSubscription(AIO_USERNAME, AIO_KEY, AIO_FEED, pool, ssl_context)
+    except Exception as e:
+        print(f"MQTT unavailable, polling over HTTP: {e}")
+        feed_subscription = None
+        return False
         
-        response = requests.get(url, headers=headers)
+    if feed_subscription.connect():
+        print(f"Subscribed to Adafruit.IO feed: {feed_subscription.topic}")
+        return True
         
-        if response.status_code == 200:
-            data = response.json()
-            pattern_value = data.get("value", "").lower().strip()
-            
-            # Check for "off" command first
-            if pattern_value == "off":
-                return -1  # Special value for "off" state
-            
-            # Find pattern index by name
-            for i, name in enumerate(PATTERN_NAMES):
-                if pattern_value == name:
-                    return i
-                    
-            # If numeric value is sent, use that directly
-            try:
-                pattern_num = int(pattern_value)
-                if 0 <= pattern_num < len(patterns):
-                    return pattern_num
-            except ValueError:
-                pass
-                
-        return current_pattern
+    print("MQTT subscription failed, polling over HTTP")
+    return False
+
+def get_pattern_from_subscription():
+    """Get a pattern change pushed over the MQTT subscription, or None if there is none"""
+    value = feed_subscription.poll()
+    if value is None:
+        return None
         
-    except Exception as e:
-        print(f"Error getting pattern from Adafruit.IO: {e}")
-        return current_pattern
+    return patterns.resolve(value)
+
+def get_pattern_from_adafruit_io(current_time):
+    """Get a new pattern selection from Adafruit.IO, or None if there is none"""
+    if not feed_poller or not adafruit_io_connected:
+        return None
+        
+    # The poller skips unchanged values and handles errors and backoff itself
+    value = feed_poller.poll(current_time)
+    if value is None:
+        return None
+        
+    return patterns.resolve(value)
 
 def send_status_to_adafruit_io(pattern_name):
-    """Send current pattern status to Adafruit.IO"""
+    """Send current pattern status to Adafruit.IO, returning True on success"""
     global requests, adafruit_io_connected
     
     if not requests or not adafruit_io_connected:
-        return
+        return False
+        
+    # A publish on the open MQTT connection is far cheaper than an HTTPS POST
+    if feed_subscription is not None and feed_subscription.publish(pattern_name):
+        print(f"Status sent to Adafruit.IO: {pattern_name} (MQTT)")
+        return True
         
     try:
         url = f"https://io.adafruit.com/api/v2/{AIO_USERNAME}/feeds/{AIO_FEED}/data"
@@ -173,11 +291,14 @@ def send_status_to_adafruit_io(pattern_name):
         # Accept both 200 and 201 as successful responses
         if response.status_code in [200, 201]:
             print(f"Status sent to Adafruit.IO: {pattern_name} (Status: {response.status_code})")
-        else:
-            print(f"Failed to send status: {response.status_code}")
+            return True
+            
+        print(f"Failed to send status: {response.status_code}")
+        return False
             
     except Exception as e:
         print(f"Error sending status to Adafruit.IO: {e}")
+        return False
 
 def initialize_adafruit_io_feed():
     """Initialize the Adafruit.IO feed with a default pattern if it's empty"""
@@ -197,326 +318,303 @@ def initialize_adafruit_io_feed():
             data = response.json()
             # If feed is empty or has no valid data, set default
             if not data or not data.get("value"):
-                send_status_to_adafruit_io(PATTERN_NAMES[current_pattern])
-                print(f"Initialized feed with default pattern: {PATTERN_NAMES[current_pattern]}")
+                send_status_to_adafruit_io(patterns.name(current_pattern))
+                print(f"Initialized feed with default pattern: {patterns.name(current_pattern)}")
         else:
             # If we can't read the feed, try to set a default
-            send_status_to_adafruit_io(PATTERN_NAMES[current_pattern])
-            print(f"Set default pattern in feed: {PATTERN_NAMES[current_pattern]}")
+            send_status_to_adafruit_io(patterns.name(current_pattern))
+            print(f"Set default pattern in feed: {patterns.name(current_pattern)}")
             
     except Exception as e:
         print(f"Error initializing Adafruit.IO feed: {e}")
 
-def run_pattern_step(pattern_index):
-    """Run one step of the current pattern"""
-    global pattern_state
-    
-    pattern = patterns[pattern_index]
-    pattern_name = PATTERN_NAMES[pattern_index]
-    
-    # Initialize pattern state if needed
-    if pattern_name not in pattern_state:
-        pattern_state[pattern_name] = {"step": 0, "last_update": 0}
-    
-    state = pattern_state[pattern_name]
-    current_time = time.monotonic()
-    
-    # Run pattern-specific logic
-    if pattern_name == "fall":
-        return run_fall_pattern_step(pattern, state, current_time)
-    elif pattern_name == "july":
-        return run_july_pattern_step(pattern, state, current_time)
-    elif pattern_name == "xmas":
-        return run_xmas_pattern_step(pattern, state, current_time)
-    elif pattern_name == "normal":
-        return run_normal_pattern_step(pattern, state, current_time)
-    elif pattern_name == "alert":
-        return run_alert_pattern_step(pattern, state, current_time)
-    elif pattern_name == "blue":
-        return run_blue_pattern_step(pattern, state, current_time)
-    elif pattern_name == "pink":
-        return run_pink_pattern_step(pattern, state, current_time)
-    
-    return True  # Continue pattern
+# Status updates to Adafruit.IO, sent from the main loop between frames
+status_queue = StatusQueue(send_status_to_adafruit_io)
 
-def run_fall_pattern_step(pattern, state, current_time):
-    """Run one step of fall pattern"""
-    if current_time - state["last_update"] < 0.05:  # 50ms delay
-        return True
-    
-    step = state["step"] % 8  # 8 different phases
+def switch_pattern(new_pattern):
+    """Switch to a new pattern ID (OFF turns the strip off) and report it"""
+    global current_pattern
     
-    if step == 0:
-        pattern.color_wipe((255, 0, 0), 20)  # Red - faster
-    elif step == 1:
-        pattern.color_wipe((255, 255, 15), 20)  # Yellow - faster
-    elif step == 2:
-        pattern.color_wipe((255, 35, 0), 20)  # Orange - faster
-    elif step == 3:
-        pattern.theater_chase((255, 255, 15), 30)  # Yellow chase
-    elif step == 4:
-        pattern.theater_chase((255, 0, 0), 30)  # Red chase
-    elif step == 5:
-        pattern.theater_chase((255, 35, 0), 30)  # Orange chase
-    elif step == 6:
-        return run_fall_pattern1_step(pattern, state, current_time)
-    elif step == 7:
-        return run_fall_pattern2_step(pattern, state, current_time)
+    current_pattern = new_pattern
     
-    state["step"] += 1
-    state["last_update"] = current_time
-    return True
-
-def run_fall_pattern1_step(pattern, state, current_time):
-    """Run one step of fall pattern 1 - alternating red, orange, yellow"""
-    # Initialize sub-step if not present
-    if "sub_step" not in state:
-        state["sub_step"] = 0
-        state["r"] = 0
-        state["o"] = 1
-        state["y"] = 2
-    
-    # Run for 100 steps (5 seconds at 50ms intervals)
-    if state["sub_step"] >= 100:
-        state["step"] += 1
-        state["last_update"] = current_time
-        state.pop("sub_step", None)
-        state.pop("r", None)
-        state.pop("o", None)
-        state.pop("y", None)
-        return True
-    
-    # Set red pixels
-    if state["r"] < pattern.num_pixels:
-        pattern.set_pixel(state["r"], (255, 0, 0))
-        state["r"] += 3
+    if current_pattern == OFF:
+        # "off" command received - clear all pixels
+        print("Turning off all pixels")
+        scheduler.start(crossfade.frames())  # Fade to black, then idle
         
-    # Set orange pixels
-    if state["o"] < pattern.num_pixels:
-        pattern.set_pixel(state["o"], (255, 35, 0))
-        state["o"] += 3
+        # Queue status update, sent from the main loop between frames
+        if adafruit_io_connected:
+            status_queue.submit("off")
+    else:
+        print(f"Switching to pattern {current_pattern}: {patterns.name(current_pattern)}")
         
-    # Set yellow pixels
-    if state["y"] < pattern.num_pixels:
-        pattern.set_pixel(state["y"], (255, 255, 15))
-        state["y"] += 3
+        # Start the new pattern from its first frame, faded in over the old one
+        scheduler.start(crossfade.frames(patterns[current_pattern].frames()))
         
-    pattern.show()
-    state["sub_step"] += 1
-    return True
-
-def run_fall_pattern2_step(pattern, state, current_time):
-    """Run one step of fall pattern 2 - random fall color twinkling"""
-    # Initialize sub-step if not present
-    if "sub_step" not in state:
-        state["sub_step"] = 0
-    
-    # Run for 200 steps (10 seconds at 50ms intervals)
-    if state["sub_step"] >= 200:
-        state["step"] += 1
-        state["last_update"] = current_time
-        state.pop("sub_step", None)
-        return True
-    
-    # Random red pixel
-    pattern.set_pixel(random.randint(0, pattern.num_pixels - 1), (255, 0, 0))
-    pattern.show()
-    
-    # Random yellow pixel
-    pattern.set_pixel(random.randint(0, pattern.num_pixels - 1), (255, 255, 15))
-    pattern.show()
-    
-    # Random orange pixel
-    pattern.set_pixel(random.randint(0, pattern.num_pixels - 1), (255, 35, 0))
-    pattern.show()
-    
-    state["sub_step"] += 1
-    return True
+        # Queue status update, sent from the main loop between frames
+        if adafruit_io_connected:
+            status_queue.submit(patterns.name(current_pattern))
 
-def run_july_pattern_step(pattern, state, current_time):
-    """Run one step of july pattern"""
-    if current_time - state["last_update"] < 0.05:  # 50ms delay
-        return True
-    
-    step = state["step"] % 8  # 8 different phases
-    
-    if step == 0:
-        pattern.color_wipe((255, 0, 0), 20)  # Red - faster
-    elif step == 1:
-        pattern.color_wipe((255, 255, 255), 20)  # White - faster
-    elif step == 2:
-        pattern.color_wipe((0, 0, 255), 20)  # Blue - faster
-    elif step == 3:
-        pattern.theater_chase((255, 255, 255), 30)  # White chase
-    elif step == 4:
-        pattern.theater_chase((255, 0, 0), 30)  # Red chase
-    elif step == 5:
-        pattern.theater_chase((0, 0, 255), 30)  # Blue chase
-    elif step == 6:
-        return run_july_pattern1_step(pattern, state, current_time)
-    elif step == 7:
-        return run_july_pattern2_step(pattern, state, current_time)
-    
-    state["step"] += 1
-    state["last_update"] = current_time
-    return True
-
-def run_july_pattern1_step(pattern, state, current_time):
-    """Run one step of july pattern 1 - alternating red, blue, white"""
-    # Initialize sub-step if not present
-    if "sub_step" not in state:
-        state["sub_step"] = 0
-        state["r"] = 0
-        state["b"] = 1
-        state["w"] = 2
+def check_pattern_sources(current_time):
+    """
+    Service whichever pattern source is active
+
+    Args:
+        current_time: Current time.monotonic() value
+
+    Returns:
+        Tuple of (pattern index received, or None if nothing new came in,
+        and seconds until the sources need checking again)
+    """
+    global last_stream_time, last_reconnect_time
+    
+    # Pattern changes pushed over MQTT
+    if feed_subscription is not None and feed_subscription.connected:
+        since = current_time - last_stream_time
+        if since < STREAM_INTERVAL:
+            return None, STREAM_INTERVAL - since
+        last_stream_time = current_time
+        return get_pattern_from_subscription(), STREAM_INTERVAL
+    
+    if feed_poller is None:
+        return None, IDLE_WAIT
+    
+    # Poll Adafruit.IO as a fallback; the poller speeds up after a change
+    # and slows down while the feed is idle
+    if not feed_poller.due(current_time):
+        return None, feed_poller.next_poll - current_time
+    new_pattern = get_pattern_from_adafruit_io(current_time)
+    
+    # Try to bring a dropped subscription back
+    if feed_subscription is not None and current_time - last_reconnect_time >= RECONNECT_INTERVAL:
+        feed_subscription.connect()
+        last_reconnect_time = current_time
+    
+    return new_pattern, max(0, feed_poller.next_poll - current_time)
+
+def render_overlays():
+    """Render the overlay frames that are due, clearing an overlay that fails"""
+    for layer in compositor.layers:
+        try:
+            layer.scheduler.poll()
+        except Exception as e:
+            print(f"Error in overlay: {e}")
+            layer.clear()
+
+def render_frame():
+    """
+    Render the overlays and the next pattern frame once they are due (the
+    scheduler is idle in "off" state)
+
+    Returns:
+        True if a frame was sent
+    """
+    render_overlays()
+    try:
+        rendered = scheduler.poll()
+    except Exception as e:
+        print(f"Error in pattern {current_pattern}: {e}")
+        # Restart the pattern from its first frame after a short pause
+        crossfade.cancel()
+        if current_pattern == OFF:
+            scheduler.stop()
+        else:
+            scheduler.start(patterns[current_pattern].frames(), 100)
+        rendered = False
+    # Send overlay changes the pattern's frame did not carry
+    return compositor.flush() or rendered
+
+def time_until_next_frame():
+    """
+    Seconds until the pattern or an overlay has a frame due
+
+    Returns:
+        Seconds to wait (0 if a frame is due, None if nothing is playing)
+    """
+    wait = scheduler.time_until_next()
+    overlay_wait = compositor.time_until_next()
+    if overlay_wait is not None and (wait is None or overlay_wait < wait):
+        wait = overlay_wait
+    return wait
+
+def show_connection_status():
+    """Light the status pixel while Adafruit.IO is not connected"""
+    if status_layer is None:
+        return
+    status_layer.pixels[STATUS_PIXEL] = (0, 0, 0) if adafruit_io_connected else (128, 0, 0)
+    status_layer.pixels.show()
+
+def refresh_dither(current_time):
+    """
+    Resend the frame while the pattern holds it, so dithering keeps working
+
+    Returns:
+        True if the frame was sent
+    """
+    global last_refresh_time
     
-    # Run for 100 steps (5 seconds at 50ms intervals)
-    if state["sub_step"] >= 100:
-        state["step"] += 1
-        state["last_update"] = current_time
-        state.pop("sub_step", None)
-        state.pop("r", None)
-        state.pop("b", None)
-        state.pop("w", None)
-        return True
+    if not DITHER or not scheduler.active or current_time - last_refresh_time < FRAME_INTERVAL:
+        return False
+    last_refresh_time = current_time
+    return strip_output.refresh()
+
+def flush_status(current_time):
+    """Send a queued status update only while no frame is due"""
+    if status_queue.depth:
+        slack = time_until_next_frame()
+        if slack is None or slack >= STATUS_SLOT:
+            status_queue.flush(current_time)
+
+def report_stats(current_time):
+    """
+    Print the GC, frame timing, frame cache and status queue counters every
+    STATS_INTERVAL seconds, restarting all but the status queue's totals
+    """
+    global last_stats_time
+    
+    if not (GC_MONITOR or FRAME_STATS) or current_time - last_stats_time < STATS_INTERVAL:
+        return
+    if gc_monitor is not None:
+        print(gc_monitor.report())
+        gc_monitor.reset()
+    if FRAME_STATS:
+        print(scheduler.report())
+        scheduler.reset_stats()
+        if frame_cache is not None:
+            print(frame_cache.report())
+            frame_cache.reset_stats()
+        print(status_queue.report())
+    last_stats_time = current_time
+
+def run_loop():
+    """Cooperative main loop, used when asyncio is not installed"""
+    global last_refresh_time
     
-    # Set red pixels
-    if state["r"] < pattern.num_pixels:
-        pattern.set_pixel(state["r"], (255, 0, 0))
-        state["r"] += 3
+    while True:
+        current_time = time.monotonic()
         
-    # Set blue pixels
-    if state["b"] < pattern.num_pixels:
-        pattern.set_pixel(state["b"], (0, 0, 255))
-        state["b"] += 3
+        new_pattern, _ = check_pattern_sources(current_time)
+        if new_pattern is not None and new_pattern != current_pattern:
+            switch_pattern(new_pattern)
+        show_connection_status()
         
-    # Set white pixels
-    if state["w"] < pattern.num_pixels:
-        pattern.set_pixel(state["w"], (255, 255, 255))
-        state["w"] += 3
+        # Check for serial input to break pattern
+        if supervisor.runtime.serial_bytes_available:
+            break
         
-    pattern.show()
-    state["sub_step"] += 1
-    return True
-
-def run_july_pattern2_step(pattern, state, current_time):
-    """Run one step of july pattern 2 - random patriotic color twinkling"""
-    # Initialize sub-step if not present
-    if "sub_step" not in state:
-        state["sub_step"] = 0
-    
-    # Run for 200 steps (10 seconds at 50ms intervals)
-    if state["sub_step"] >= 200:
-        state["step"] += 1
-        state["last_update"] = current_time
-        state.pop("sub_step", None)
-        return True
-    
-    # Random red pixel
-    pattern.set_pixel(random.randint(0, pattern.num_pixels - 1), (255, 0, 0))
-    pattern.show()
-    
-    # Random white pixel
-    pattern.set_pixel(random.randint(0, pattern.num_pixels - 1), (255, 255, 255))
-    pattern.show()
-    
-    # Random blue pixel
-    pattern.set_pixel(random.randint(0, pattern.num_pixels - 1), (0, 0, 255))
-    pattern.show()
-    
-    state["sub_step"] += 1
-    return True
+        if render_frame():
+            last_refresh_time = current_time
+        else:
+            refresh_dither(current_time)
+        flush_status(current_time)
+        report_stats(current_time)
 
-def run_xmas_pattern_step(pattern, state, current_time):
-    """Run one step of xmas pattern"""
-    if current_time - state["last_update"] < 0.1:  # 100ms delay
-        return True
-    
-    step = state["step"] % 12  # 12 different phases
-    
-    if step == 0:
-        pattern.candy_cane(5, 8, 30)  # Shorter candy cane
-    elif step == 1:
-        pattern.rainbow_stripe(2, 4, 50)  # Shorter rainbow
-    elif step == 2:
-        pattern.random_white(10, 100)  # Shorter random white
-    elif step == 3:
-        pattern.random_color(10, 100)  # Shorter random color
-    elif step == 4:
-        pattern.color_wipe((255, 0, 0), 30)  # Red
-    elif step == 5:
-        pattern.color_wipe((0, 255, 0), 30)  # Green
-    elif step == 6:
-        pattern.color_wipe((255, 255, 255), 30)  # White
-    elif step == 7:
-        pattern.rainbow_cycle(3, 5)  # Shorter rainbow cycle
-    elif step == 8:
-        pattern.alternate_color((255, 0, 0), (0, 255, 0), 50)  # Red/Green
-    elif step == 9:
-        pattern.random_position_fill((255, 0, 0), 30)  # Red fill
-    elif step == 10:
-        pattern.middle_fill((0, 255, 0), 30)  # Green middle fill
-    elif step == 11:
-        pattern.side_fill((255, 255, 255), 30)  # White side fill
-    
-    state["step"] += 1
-    state["last_update"] = current_time
-    return True
+class PatternRequest:
+    """Latest pattern change waiting for the render task"""
 
-def run_normal_pattern_step(pattern, state, current_time):
-    """Run one step of normal pattern"""
-    if current_time - state["last_update"] < 0.05:  # 50ms delay
-        return True
-    
-    step = state["step"] % 6  # 6 different phases
-    
-    if step == 0:
-        pattern.color_wipe((255, 0, 0), 20)  # Red - faster
-    elif step == 1:
-        pattern.color_wipe((0, 255, 0), 20)  # Green - faster
-    elif step == 2:
-        pattern.color_wipe((0, 0, 255), 20)  # Blue - faster
-    elif step == 3:
-        pattern.theater_chase((127, 127, 127), 30)  # White chase
-    elif step == 4:
-        pattern.rainbow(5)  # Shorter rainbow
-    elif step == 5:
-        pattern.theater_chase_rainbow(30)  # Rainbow chase
-    
-    state["step"] += 1
-    state["last_update"] = current_time
-    return True
+    def __init__(self):
+        self.pending = None
 
-def run_alert_pattern_step(pattern, state, current_time):
-    """Run one step of alert pattern"""
-    if current_time - state["last_update"] < 0.05:  # 50ms delay
-        return True
-    
-    pattern.color_wipe((255, 255, 0), 20)  # Yellow - faster
-    state["last_update"] = current_time
-    return True
+    def put(self, pattern):
+        """Request a pattern ID (OFF for "off"), replacing any request not yet taken"""
+        self.pending = pattern
 
-def run_blue_pattern_step(pattern, state, current_time):
-    """Run one step of blue pattern"""
-    if current_time - state["last_update"] < 0.1:  # 100ms delay
-        return True
-    
-    pattern.color_wipe((0, 0, 255), 50)  # Blue
-    state["last_update"] = current_time
-    return True
+    def take(self):
+        """
+        Take the waiting request
 
-def run_pink_pattern_step(pattern, state, current_time):
-    """Run one step of pink pattern"""
-    if current_time - state["last_update"] < 0.1:  # 100ms delay
-        return True
-    
-    pattern.color_wipe((255, 0, 255), 50)  # Pink
-    state["last_update"] = current_time
-    return True
+        Returns:
+            Pattern index, or None if nothing was requested
+        """
+        pattern = self.pending
+        self.pending = None
+        return pattern
+
+async def render_task(stop, pattern_request):
+    """
+    Render frames on the scheduler's deadlines and apply requested pattern changes
+
+    Args:
+        stop: asyncio.Event set when the program should exit
+        pattern_request: PatternRequest filled in by the other tasks
+    """
+    global last_refresh_time
+    
+    while not stop.is_set():
+        new_pattern = pattern_request.take()
+        if new_pattern is not None and new_pattern != current_pattern:
+            switch_pattern(new_pattern)
+        
+        current_time = time.monotonic()
+        rendered = render_frame()
+        if rendered:
+            last_refresh_time = current_time
+        else:
+            refresh_dither(current_time)
+        
+        # Sleep until the next frame, but wake up often enough to pick up
+        # pattern changes and never render faster than TARGET_FPS. A dither
+        # refresh does not hold back the pattern's next frame.
+        wait = time_until_next_frame()
+        if wait is None or wait > IDLE_WAIT:
+            wait = IDLE_WAIT
+        if DITHER and scheduler.active and wait > FRAME_INTERVAL:
+            wait = FRAME_INTERVAL  # Dithered frames go out at TARGET_FPS
+        if rendered and wait < FRAME_INTERVAL:
+            wait = FRAME_INTERVAL
+        await asyncio.sleep(wait)
+
+async def network_task(stop, pattern_request):
+    """
+    Talk to Adafruit.IO: receive pattern changes and send queued status updates
+
+    Args:
+        stop: asyncio.Event set when the program should exit
+        pattern_request: PatternRequest passed to the render task
+    """
+    while not stop.is_set():
+        current_time = time.monotonic()
+        
+        # Every value received is passed on, even the pattern playing now:
+        # it may undo a request the render task has not taken yet
+        new_pattern, wait = check_pattern_sources(current_time)
+        if new_pattern is not None:
+            pattern_request.put(new_pattern)
+        show_connection_status()
+        
+        flush_status(current_time)
+        report_stats(current_time)
+        
+        # Yield to the render task at least once per pass, and come back
+        # for a waiting status update within one frame
+        if status_queue.depth:
+            wait = min(wait, FRAME_INTERVAL)
+        await asyncio.sleep(max(0, min(wait, IDLE_WAIT)))
+
+async def input_task(stop):
+    """
+    Watch the serial console and stop the program when a key is pressed
+
+    Args:
+        stop: asyncio.Event to set
+    """
+    while not supervisor.runtime.serial_bytes_available:
+        await asyncio.sleep(INPUT_INTERVAL)
+    stop.set()
+
+async def run_tasks():
+    """Run the render, network and input tasks until console input stops them"""
+    stop = asyncio.Event()
+    pattern_request = PatternRequest()
+    await asyncio.gather(
+        render_task(stop, pattern_request),
+        network_task(stop, pattern_request),
+        input_task(stop),
+    )
 
 def main():
-    """Main loop"""
-    global current_pattern, last_pattern, adafruit_io_connected
+    """Main program"""
+    global current_pattern, adafruit_io_connected
     
     print("CircuitPython NeoPixel Control Starting...")
     print(f"Number of patterns: {len(patterns)}")
@@ -530,63 +628,16 @@ def main():
         print("Adafruit.IO setup failed - using default pattern")
     
     # Clear all pixels initially
-    pixels.fill((0, 0, 0))
-    pixels.show()
+    frame.fill((0, 0, 0))
+    frame.show()
     
-    last_check_time = 0
-    check_interval = 0.5  # Check for pattern changes every 0.5 seconds
+    scheduler.start(patterns[current_pattern].frames())
     
-    while True:
-        current_time = time.monotonic()
-        
-        # Check for pattern change from Adafruit.IO periodically
-        if current_time - last_check_time >= check_interval:
-            new_pattern = get_pattern_from_adafruit_io()
-            
-            if new_pattern != current_pattern:
-                current_pattern = new_pattern
-                
-                if current_pattern == -1:
-                    # "off" command received - clear all pixels
-                    print("Turning off all pixels")
-                    pixels.fill((0, 0, 0))
-                    pixels.show()
-                    
-                    # Send status update
-                    if adafruit_io_connected:
-                        try:
-                            send_status_to_adafruit_io("off")
-                        except Exception as e:
-                            print(f"Error updating status: {e}")
-                else:
-                    print(f"Switching to pattern {current_pattern}: {PATTERN_NAMES[current_pattern]}")
-                    pixels.fill((0, 0, 0))
-                    pixels.show()
-                    time.sleep(0.2)  # Shorter transition delay
-                    
-                    # Reset pattern state for new pattern
-                    pattern_state.clear()
-                    
-                    # Send status update (but don't wait for it to complete)
-                    if adafruit_io_connected:
-                        try:
-                            send_status_to_adafruit_io(PATTERN_NAMES[current_pattern])
-                        except Exception as e:
-                            print(f"Error updating status: {e}")
-            
-            last_check_time = current_time
-        
-        # Check for serial input to break pattern
-        if supervisor.runtime.serial_bytes_available:
-            break
-            
-        # Run one step of the current pattern (only if not in "off" state)
-        if current_pattern >= 0:
-            try:
-                run_pattern_step(current_pattern)
-            except Exception as e:
-                print(f"Error in pattern {current_pattern}: {e}")
-                time.sleep(0.1)
+    if asyncio is None:
+        print("asyncio not installed - using the single main loop")
+        run_loop()
+    else:
+        asyncio.run(run_tasks())
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -1,6 +1,8 @@
 """
 Configuration file for CircuitPython NeoPixel Control with Adafruit.IO
 Copy this file to your CIRCUITPY drive and update with your credentials
+
+Settings left out of this file keep their defaults (see circuitpython_main.py)
 """
 
 # WiFi Configuration
@@ -11,13 +13,30 @@ WIFI_PASSWORD = "your_wifi_password_here"
 AIO_USERNAME = "your_adafruit_io_username_here"
 AIO_KEY = "your_adafruit_io_key_here"
 AIO_FEED = "neopixel-pattern"  # Feed name for pattern control
+AIO_USE_MQTT = True            # Get pattern changes pushed over MQTT (needs adafruit_minimqtt), else poll over HTTP
 
 # NeoPixel Configuration
 NEOPIXEL_PIN = "board.D5"  # NeoPixel data pin
 NUM_PIXELS = 90            # Number of pixels in your strip
+# Strips the patterns play across, end to end, as (seesaw I2C address, seesaw pin,
+# pixels); use (None, "D5", pixels) for a strip on a native pin. Without
+# STRIPS, the patterns play on one seesaw strip of NUM_PIXELS pixels
+STRIPS = [
+    (0x60, 15, NUM_PIXELS),
+]
 BRIGHTNESS = 0.3           # Brightness (0.0 to 1.0)
+GAMMA = 2.8                # Gamma correction for the strip (1.0 to turn it off)
+DITHER = False             # Dither between brightness levels for smoother dim colors and fades
+TARGET_FPS = 100           # Highest frame rate the render task runs at
+GC_MONITOR = False         # Print heap allocation and GC counts per frame every 10 seconds
+FRAME_STATS = False        # Print late, skipped frame, jitter and status queue counts every 10 seconds
+TRANSITION_MS = 500        # Cross-fade length when the pattern changes, 0 to switch straight away
+FRAME_CACHE_KB = 32        # Memory for replaying repeated frames of deterministic effects, 0 to turn off
+STATUS_PIXEL = None        # Pixel lit red over the pattern while Adafruit.IO is not connected, None for none
 
 # Pattern Configuration
+# Each name needs a playlist, built in or from PLAYLIST_FILE
+PLAYLIST_FILE = "playlists.json"  # Optional file with extra or replacement playlists
 PATTERN_NAMES = [
     "fall",
     "july", 
@@ -28,6 +47,17 @@ PATTERN_NAMES = [
     "pink"
 ]
 
+# Patterns that play other playlists side by side, each in a zone of the strip:
+# name -> list of (playlist, first pixel, pixels, options), where options may
+# hold "reverse" and/or "mirror". Add the name to PATTERN_NAMES to use it, e.g.
+# "split": [("xmas", 0, 45, ""), ("july", 45, 45, "reverse")]
+ZONED_PATTERNS = {}
+
+# Patterns played from animation files recorded with record.py:
+# name -> file on the CIRCUITPY drive, e.g. "show": "show.npxa"
+# Add the name to PATTERN_NAMES to use it
+ANIMATIONS = {}
+
 # Adafruit.IO Feed Settings
 # Create a feed named "neopixel-pattern" in your Adafruit.IO dashboard
 # Set the feed type to "Text" or "Number"
@@ -0,0 +1,8 @@
+"""
+pytest configuration for the host-side tests in tests/
+
+The tests import the libraries the way the board does, from this
+directory. test_adafruit_io.py is a script for the board, not a test.
+"""
+
+collect_ignore = ["test_adafruit_io.py"]
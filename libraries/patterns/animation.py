@@ -0,0 +1,223 @@
+"""
+Animation files for CircuitPython NeoPixel patterns
+Plays pre-recorded frames streamed from flash instead of computing them
+
+An animation file is a header followed by one record per frame, at a
+fixed frame interval. All numbers are little-endian.
+
+Header (18 bytes):
+    magic         4 bytes  b"NPXA"
+    version       1 byte   1
+    bpp           1 byte   Bytes per pixel (3 or 4)
+    num_pixels    2 bytes
+    pixel_order   4 bytes  Wire order, e.g. b"GRB", padded with zero bytes
+    interval      2 bytes  Milliseconds per frame (1000 / FPS)
+    frame_count   4 bytes
+
+Frame record:
+    start         2 bytes  First pixel that changed since the previous frame
+    count         2 bytes  Number of pixels that changed (0 for none)
+    data          count * bpp bytes of wire-order pixels
+
+The first frame covers every pixel, so the changes of the frames after it
+are all that is stored; a still frame takes four bytes. The player reads
+each record's pixels with readinto() straight into the frame buffer, so
+a frame is never held twice in RAM, and the length of a show is limited
+by flash, not memory. The frame buffer and the output's own buffer keep
+the frame on the strip while the next one is read.
+
+Recording happens on the host (see record.py); AnimationWriter turns any
+sequence of frames into a file.
+"""
+
+import struct
+from .base_pattern import BasePattern
+from .framebuffer import FrameBuffer
+
+MAGIC = b"NPXA"
+VERSION = 1
+_HEADER = "<4sBBH4sHI"
+HEADER_SIZE = struct.calcsize(_HEADER)
+_RECORD = "<HH"
+RECORD_SIZE = struct.calcsize(_RECORD)
+
+class AnimationWriter:
+    """Writes frames to an animation file, storing what changed in each"""
+
+    def __init__(self, file, num_pixels, pixel_order="GRB", interval=20):
+        """
+        Initialize writer and write the header
+
+        Args:
+            file: Binary file open for writing (and seeking)
+            num_pixels: Number of pixels per frame
+            pixel_order: Wire byte order of the frames
+            interval: Milliseconds per frame
+        """
+        self.file = file
+        self.num_pixels = num_pixels
+        self.pixel_order = pixel_order
+        self.bpp = len(pixel_order)
+        self.interval = interval
+        self.frame_count = 0
+        self.bytes_written = 0
+        self._last = None  # The previous frame's bytes
+        self._write_header()
+
+    def _write_header(self):
+        """Write the header at the current position"""
+        self.file.write(struct.pack(_HEADER, MAGIC, VERSION, self.bpp, self.num_pixels,
+                                    self.pixel_order.encode(), self.interval, self.frame_count))
+
+    def write_frame(self, buf):
+        """
+        Append a frame
+
+        Args:
+            buf: Wire-order bytes of the whole frame
+        """
+        bpp = self.bpp
+        last = self._last
+        if last is None:
+            start = 0
+            stop = self.num_pixels
+        else:
+            # The span of pixels that differ from the previous frame
+            start = 0
+            while start < self.num_pixels and \
+                    buf[start * bpp:(start + 1) * bpp] == last[start * bpp:(start + 1) * bpp]:
+                start += 1
+            stop = self.num_pixels
+            while stop > start and \
+                    buf[(stop - 1) * bpp:stop * bpp] == last[(stop - 1) * bpp:stop * bpp]:
+                stop -= 1
+
+        self.file.write(struct.pack(_RECORD, start, stop - start))
+        self.file.write(bytes(buf[start * bpp:stop * bpp]))
+        self.bytes_written += RECORD_SIZE + (stop - start) * bpp
+        self._last = bytes(buf)
+        self.frame_count += 1
+
+    def close(self):
+        """Write the final frame count into the header"""
+        self.file.seek(0)
+        self._write_header()
+        self.file.seek(0, 2)
+
+class AnimationPattern(BasePattern):
+    """Pattern that loops an animation file, streaming its frames from flash"""
+
+    def __init__(self, pixels, num_pixels, path):
+        """
+        Initialize pattern and check the file's header
+
+        Args:
+            pixels: FrameBuffer shared by all patterns, or a NeoPixel object
+            num_pixels: Number of pixels in the strip
+            path: Animation file to play
+
+        Raises:
+            ValueError: If the file is not an animation or does not fit the strip
+        """
+        super().__init__(pixels, num_pixels)
+        if not isinstance(self.pixels, FrameBuffer):
+            raise ValueError("Animations play into a whole FrameBuffer")
+        self.path = path
+        self.file = None
+        with open(path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE:
+            raise ValueError(f"{path}: too short for an animation header")
+        magic, version, bpp, pixel_count, order, interval, frame_count = struct.unpack(_HEADER, header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a version {VERSION} animation file")
+        order = order.rstrip(b"\0").decode()
+        if order != self.pixels.pixel_order or bpp != self.pixels.bpp:
+            raise ValueError(f"{path}: recorded in {order} order, the strip is {self.pixels.pixel_order}")
+        if pixel_count > self.pixels.num_pixels:
+            raise ValueError(f"{path}: {pixel_count} pixels, the strip has {self.pixels.num_pixels}")
+        if frame_count < 1 or interval < 1:
+            raise ValueError(f"{path}: no frames")
+
+        self.pixel_count = pixel_count
+        self.interval = interval
+        self.frame_count = frame_count
+        self.period = frame_count * interval  # Milliseconds the animation takes to loop
+        self.drawn = -1  # Last frame read, -1 before the first
+        self._record = bytearray(RECORD_SIZE)
+        self._off = self.pixels.prepare(self.pixels.pack((0, 0, 0)))
+
+    def frames(self):
+        """
+        Endless loop of the animation - yields the delay before each frame in milliseconds
+
+        The file is open while the generator plays and is closed when it is
+        closed (FrameScheduler closes the generator it replaces).
+        """
+        return self._play()
+
+    def _play(self):
+        """Generator behind frames()"""
+        self.close()  # Only the newest generator reads the file
+        file = open(self.path, "rb")
+        self.file = file
+        try:
+            self._rewind()
+            yield from self.timeline_frames(self)
+        finally:
+            file.close()
+            if self.file is file:
+                self.file = None
+
+    def _rewind(self):
+        """Go back to before the first frame"""
+        self.file.seek(HEADER_SIZE)
+        self.drawn = -1
+        if self.pixel_count < self.pixels.num_pixels:
+            # Pixels past the recording would keep the previous pattern's colors
+            self.pixels.tile(self._off, 0, self.pixel_count, self.pixels.num_pixels)
+
+    def _read_frame(self):
+        """Read the next record into the frame"""
+        record = self._record
+        if self.file.readinto(record) != RECORD_SIZE:
+            raise ValueError(f"{self.path}: truncated at frame {self.drawn + 1}")
+        start = record[0] | (record[1] << 8)
+        count = record[2] | (record[3] << 8)
+        if count:
+            if start + count > self.pixel_count:
+                raise ValueError(f"{self.path}: frame {self.drawn + 1} is outside the strip")
+            pixels = self.pixels
+            view = pixels.span(start, start + count)
+            if self.file.readinto(view) != len(view):
+                raise ValueError(f"{self.path}: truncated at frame {self.drawn + 1}")
+            pixels.mark_dirty(start, start + count)
+        self.drawn += 1
+
+    def render(self, t):
+        """
+        Read up to the frame at a time in the animation
+
+        Frames that were due while the player was behind are read without
+        being shown, as each one only holds what changed.
+
+        Args:
+            t: Milliseconds since the animation started
+
+        Returns:
+            Milliseconds since the start when the next frame is due
+        """
+        k = t // self.interval
+        if k >= self.frame_count:
+            k = self.frame_count - 1
+        if k < self.drawn:
+            self._rewind()
+        while self.drawn < k:
+            self._read_frame()
+        return (k + 1) * self.interval
+
+    def close(self):
+        """Close the animation file"""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
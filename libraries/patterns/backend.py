@@ -0,0 +1,90 @@
+"""
+Runtime backend for CircuitPython NeoPixel patterns
+Holds the clock and console input that patterns and the scheduler use, so a
+host-side simulator can swap them out for virtual ones
+
+On a CircuitPython board the defaults wrap time and supervisor. On a
+workstation, where supervisor does not exist, console input reads as idle.
+
+Frame timing uses integer millisecond ticks rather than time.monotonic().
+CircuitPython floats lose millisecond resolution after a few hours of
+uptime, and time.monotonic_ns() returns long integers that allocate on
+every call. Ticks wrap around like supervisor.ticks_ms(), so they are
+compared with ticks_diff() and advanced with ticks_add().
+"""
+
+import time
+
+try:
+    import supervisor
+except ImportError:
+    supervisor = None
+
+TICKS_PERIOD = 1 << 29  # supervisor.ticks_ms() wraps around at this value
+TICKS_MAX = TICKS_PERIOD - 1
+TICKS_HALF = TICKS_PERIOD // 2
+
+def ticks_add(ticks, delta):
+    """Add milliseconds to a tick value"""
+    return (ticks + delta) & TICKS_MAX
+
+def ticks_diff(end, start):
+    """Signed milliseconds from start to end, correct across one wraparound"""
+    diff = (end - start) & TICKS_MAX
+    if diff >= TICKS_HALF:
+        diff -= TICKS_PERIOD
+    return diff
+
+class SystemClock:
+    """Real time from the time module"""
+
+    def monotonic(self):
+        """Seconds from an arbitrary, never decreasing start point"""
+        return time.monotonic()
+
+    def ticks_ms(self):
+        """Millisecond tick counter that wraps at TICKS_PERIOD"""
+        if supervisor is not None:
+            return supervisor.ticks_ms()
+        return (time.monotonic_ns() // 1000000) & TICKS_MAX
+
+    def sleep(self, seconds):
+        """Block for a number of seconds"""
+        time.sleep(seconds)
+
+class SupervisorInput:
+    """Console input from supervisor.runtime"""
+
+    @property
+    def serial_bytes_available(self):
+        """Number of bytes waiting on the USB serial console (or a bool)"""
+        return supervisor.runtime.serial_bytes_available
+
+class NoInput:
+    """Console input that never has bytes waiting"""
+
+    serial_bytes_available = 0
+
+clock = SystemClock()
+serial = SupervisorInput() if supervisor is not None else NoInput()
+
+def install(new_clock=None, new_serial=None):
+    """
+    Replace the active clock and/or console input
+
+    Args:
+        new_clock: Object with monotonic(), ticks_ms() (wrapping at TICKS_PERIOD,
+            as the scheduler's deadlines are ticks) and sleep(seconds), or None
+            to keep the current one
+        new_serial: Object with a serial_bytes_available attribute, or None to keep the current one
+    """
+    global clock, serial
+
+    if new_clock is not None:
+        clock = new_clock
+    if new_serial is not None:
+        serial = new_serial
+
+def reset():
+    """Restore the default clock and console input"""
+    install(SystemClock(), SupervisorInput() if supervisor is not None else NoInput())
@@ -1,429 +1,329 @@
 """
 Base pattern class for CircuitPython NeoPixel patterns
 Provides common functionality used by all pattern classes
+
+Every effect is played as a frame generator (the ``*_frames`` methods).
+Each ``yield`` hands back the number of milliseconds to wait before the
+next frame, so a scheduler can interleave rendering with other work.
+The generators draw each frame from the time since the effect started
+(see effects.py), so effects keep their speed whatever the frame rate.
+The original blocking effect methods are kept as thin wrappers that
+play their generator to completion.
+
+Effects render into a FrameBuffer, writing pre-packed wire-order bytes
+and whole tiled runs instead of building a tuple per pixel.
 """
 
-import time
-import supervisor
-import random
+from . import backend
+from .framebuffer import FrameBuffer, PixelBufOutput, Zone
+from . import effects
+from . import palette
 
 class BasePattern:
     """Base class for all NeoPixel patterns"""
-    
+
     def __init__(self, pixels, num_pixels):
         """
         Initialize pattern
-        
+
         Args:
-            pixels: NeoPixel object
+            pixels: FrameBuffer shared by all patterns, a Zone of it, or a NeoPixel object
             num_pixels: Number of pixels in the strip
         """
+        if not isinstance(pixels, (FrameBuffer, Zone)):
+            pixels = FrameBuffer(num_pixels, PixelBufOutput(pixels),
+                                 getattr(pixels, "byteorder", "GRB"))
         self.pixels = pixels
         self.num_pixels = num_pixels
-        
-    def color_wipe(self, color, wait):
+
+    def play(self, frames):
         """
-        Fill strip with a color one pixel at a time
-        
+        Play a frame generator to completion, sleeping between frames
+
         Args:
-            color: RGB tuple (r, g, b)
-            wait: Delay between pixels in milliseconds
+            frames: Generator yielding the delay before the next frame in milliseconds
         """
-        for i in range(self.num_pixels):
-            if supervisor.runtime.serial_bytes_available:
+        deadline = backend.clock.ticks_ms()
+        for wait in frames:
+            if backend.serial.serial_bytes_available:
                 break
-                
-            self.pixels[i] = color
-            self.pixels.show()
-            time.sleep(wait / 1000.0)  # Convert ms to seconds
-            
-    def theater_chase(self, color, wait):
+
+            # Sleep until the frame's deadline, less the time spent rendering
+            deadline = backend.ticks_add(deadline, wait)
+            delay = backend.ticks_diff(deadline, backend.clock.ticks_ms())
+            if delay > 0:
+                backend.clock.sleep(delay / 1000.0)  # Convert ms to seconds
+
+    def frames(self):
         """
-        Theater-style crawling lights
-        
-        Args:
-            color: RGB tuple (r, g, b)
-            wait: Delay between steps in milliseconds
+        Endless frame generator for this pattern - must be implemented by subclasses
         """
-        for j in range(5):  # Reduced from 10 to 5 cycles for faster animation
-            if supervisor.runtime.serial_bytes_available:
-                break
-                
-            for q in range(3):
-                for i in range(0, self.num_pixels, 3):
-                    self.pixels[i + q] = color
-                self.pixels.show()
-                time.sleep(wait / 1000.0)
-                
-                for i in range(0, self.num_pixels, 3):
-                    self.pixels[i + q] = (0, 0, 0)
-                    
+        raise NotImplementedError("Subclasses must implement frames() method")
+
+    def start(self):
+        """
+        Start the pattern, blocking until serial input is received
+        """
+        self.play(self.frames())
+
     def clear(self):
         """Turn off all pixels"""
         self.pixels.fill((0, 0, 0))
         self.pixels.show()
-        
+
     def set_pixel(self, index, color):
         """
         Set a single pixel color
-        
+
         Args:
             index: Pixel index (0 to num_pixels-1)
             color: RGB tuple (r, g, b)
         """
         if 0 <= index < self.num_pixels:
             self.pixels[index] = color
-            
+
     def show(self):
         """Update the display"""
         self.pixels.show()
-        
-    def start(self):
+
+    def timeline_frames(self, timeline):
         """
-        Start the pattern - must be implemented by subclasses
+        Play a timeline against the clock - yields the delay before each frame in milliseconds
+
+        Every frame is drawn for the time it is rendered at, so a frame that
+        is late shows the animation further along instead of slowing it down.
+
+        Args:
+            timeline: Object with render(t), which draws the frame t milliseconds
+                in and returns when the next frame is due (None when finished).
+                A timeline that repeats every ``period`` milliseconds has its
+                clock wound back a period at a time, so t stays a small int
+                however long it plays.
         """
-        raise NotImplementedError("Subclasses must implement start() method")
-        
-    # Additional methods for faster animations
-    def fast_color_wipe(self, color, wait=10):
+        period = getattr(timeline, "period", 0)
+        start = backend.clock.ticks_ms()
+        due = 0  # When this frame was due, in milliseconds since start
+        while True:
+            t = backend.ticks_diff(backend.clock.ticks_ms(), start)
+            if t < due:
+                t = due
+            next_due = timeline.render(t)
+            self.pixels.show()
+            if next_due is None:
+                return
+
+            yield next_due - due
+            due = next_due
+            if period and due >= period:
+                start = backend.ticks_add(start, period)
+                due -= period
+
+    # Frame generators, each playing one effect from effects.py
+    def color_wipe_frames(self, color, wait):
         """
-        Fast color wipe with shorter delays
-        
+        Fill strip with a color one pixel at a time
+
         Args:
             color: RGB tuple (r, g, b)
-            wait: Delay between pixels in milliseconds (default 10ms)
+            wait: Delay between pixels in milliseconds
         """
-        for i in range(self.num_pixels):
-            if supervisor.runtime.serial_bytes_available:
-                break
-                
-            self.pixels[i] = color
-            if i % 3 == 0:  # Show every 3rd pixel for smoother animation
-                self.pixels.show()
-            time.sleep(wait / 1000.0)
-        self.pixels.show()  # Final show to ensure all pixels are updated
-        
-    def fast_theater_chase(self, color, wait=20):
+        return self.timeline_frames(effects.ColorWipe(self.pixels, color, wait))
+
+    def theater_chase_frames(self, color, wait, cycles=5):
         """
-        Fast theater chase with shorter delays
-        
+        Theater-style crawling lights
+
         Args:
             color: RGB tuple (r, g, b)
-            wait: Delay between steps in milliseconds (default 20ms)
+            wait: Delay between steps in milliseconds
+            cycles: Number of chase cycles
         """
-        for j in range(3):  # Reduced cycles for faster animation
-            if supervisor.runtime.serial_bytes_available:
-                break
-                
-            for q in range(3):
-                for i in range(0, self.num_pixels, 3):
-                    self.pixels[i + q] = color
-                self.pixels.show()
-                time.sleep(wait / 1000.0)
-                
-                for i in range(0, self.num_pixels, 3):
-                    self.pixels[i + q] = (0, 0, 0)
-                    
-    def rainbow_cycle(self, wait=5):
-        """
-        Fast rainbow cycle
-        
+        return self.timeline_frames(effects.TheaterChase(self.pixels, color, wait, cycles))
+
+    def fast_color_wipe_frames(self, color, wait=10):
+        """
+        Fast color wipe that shows three new pixels per frame
+
+        Args:
+            color: RGB tuple (r, g, b)
+            wait: Delay per pixel in milliseconds (default 10ms)
+        """
+        return self.timeline_frames(effects.FastColorWipe(self.pixels, color, wait))
+
+    def rainbow_cycle_frames(self, sets=1, wait=5):
+        """
+        Rainbow cycle along the strip
+
         Args:
+            sets: Number of complete cycles through the color wheel
             wait: Delay between updates in milliseconds (default 5ms)
         """
-        for j in range(256):
-            if supervisor.runtime.serial_bytes_available:
-                break
-                
-            for i in range(self.num_pixels):
-                if supervisor.runtime.serial_bytes_available:
-                    break
-                    
-                rc_index = (i * 256 // self.num_pixels) + j
-                self.pixels[i] = self.wheel(rc_index & 255)
-                
-            self.pixels.show()
-            time.sleep(wait / 1000.0)
-            
-    def rainbow(self, wait):
+        return self.timeline_frames(effects.RainbowCycle(self.pixels, sets, wait))
+
+    def rainbow_frames(self, wait):
         """
         Rainbow effect that cycles through the color wheel
-        
+
         Args:
             wait: Delay between updates in milliseconds
         """
-        # Hue of first pixel runs 5 complete loops through the color wheel
-        for first_pixel_hue in range(0, 5 * 65536, 256):
-            if supervisor.runtime.serial_bytes_available:
-                break
-                
-            for i in range(self.num_pixels):
-                if supervisor.runtime.serial_bytes_available:
-                    break
-                    
-                # Offset pixel hue to make one full revolution of the color wheel
-                # along the length of the strip
-                pixel_hue = first_pixel_hue + (i * 65536 // self.num_pixels)
-                color = self.hsv_to_rgb(pixel_hue, 255, 255)
-                self.set_pixel(i, color)
-                
-            self.show()
-            time.sleep(wait / 1000.0)
-            
-    def theater_chase_rainbow(self, wait):
+        return self.timeline_frames(effects.Rainbow(self.pixels, wait))
+
+    def theater_chase_rainbow_frames(self, wait):
         """
         Rainbow-enhanced theater chase variant
-        
+
         Args:
             wait: Delay between updates in milliseconds
         """
-        first_pixel_hue = 0  # First pixel starts at red (hue 0)
-        
-        for a in range(30):  # Repeat 30 times
-            if supervisor.runtime.serial_bytes_available:
-                break
-                
-            for b in range(3):  # 'b' counts from 0 to 2
-                if supervisor.runtime.serial_bytes_available:
-                    break
-                    
-                self.clear()  # Set all pixels to off
-                
-                # 'c' counts up from 'b' to end of strip in increments of 3
-                for c in range(b, self.num_pixels, 3):
-                    if supervisor.runtime.serial_bytes_available:
-                        break
-                        
-                    # Hue of pixel 'c' is offset to make one full revolution
-                    # of the color wheel along the length of the strip
-                    hue = first_pixel_hue + c * 65536 // self.num_pixels
-                    color = self.hsv_to_rgb(hue, 255, 255)
-                    self.set_pixel(c, color)
-                    
-                self.show()
-                time.sleep(wait / 1000.0)
-                first_pixel_hue += 65536 // 90  # One cycle over 90 frames
-                
+        return self.timeline_frames(effects.TheaterChaseRainbow(self.pixels, wait))
+
+    def stripe_run(self, colors, width):
+        """
+        Build a packed run of color stripes that scrolls toward pixel 0
+        (see effects.stripe_run())
+
+        Args:
+            colors: Sequence of RGB tuples
+            width: Stripe width in pixels
+
+        Returns:
+            TileRun for tile()
+        """
+        return effects.stripe_run(self.pixels, colors, width)
+
+    def candy_cane_frames(self, sets, width, wait):
+        """Candy cane pattern with red and white stripes"""
+        return self.timeline_frames(effects.CandyCane(self.pixels, sets, width, wait))
+
+    def random_white_frames(self, sets, wait):
+        """Random white/grayscale pattern"""
+        return self.timeline_frames(effects.RandomWhite(self.pixels, sets, wait))
+
+    def rainbow_stripe_frames(self, sets, width, wait):
+        """Rainbow stripe pattern"""
+        return self.timeline_frames(effects.RainbowStripe(self.pixels, sets, width, wait))
+
+    def random_color_frames(self, sets, wait):
+        """Random color pattern"""
+        return self.timeline_frames(effects.RandomColor(self.pixels, sets, wait))
+
+    def alternate_color_frames(self, color1, color2, wait):
+        """Alternate between two colors"""
+        return self.timeline_frames(effects.AlternateColor(self.pixels, color1, color2, wait))
+
+    def random_position_fill_frames(self, color, wait):
+        """Fill strip by lighting random positions"""
+        return self.timeline_frames(effects.RandomPositionFill(self.pixels, color, wait))
+
+    def middle_fill_frames(self, color, wait):
+        """Fill strip from middle outward"""
+        return self.timeline_frames(effects.MiddleFill(self.pixels, color, wait))
+
+    def side_fill_frames(self, color, wait):
+        """Fill strip from sides inward"""
+        return self.timeline_frames(effects.SideFill(self.pixels, color, wait))
+
+    def interleave_fill_frames(self, colors, steps, wait):
+        """
+        Fill interleaved runs of colors, one pixel of each color per frame
+
+        Args:
+            colors: Sequence of RGB tuples, pixel i gets colors[i % len(colors)]
+            steps: Number of frames to run
+            wait: Delay between frames in milliseconds
+        """
+        return self.timeline_frames(effects.InterleaveFill(self.pixels, colors, steps, wait))
+
+    def twinkle_frames(self, colors, steps, wait):
+        """
+        Light one random pixel in each color per frame
+
+        Args:
+            colors: Sequence of RGB tuples
+            steps: Number of frames to run
+            wait: Delay between frames in milliseconds
+        """
+        return self.timeline_frames(effects.Twinkle(self.pixels, colors, steps, wait))
+
+    # Blocking effects, kept for scripts that drive a pattern directly
+    def color_wipe(self, color, wait):
+        """Blocking version of color_wipe_frames()"""
+        self.play(self.color_wipe_frames(color, wait))
+
+    def theater_chase(self, color, wait):
+        """Blocking version of theater_chase_frames()"""
+        self.play(self.theater_chase_frames(color, wait))
+
+    def fast_color_wipe(self, color, wait=10):
+        """Blocking version of fast_color_wipe_frames()"""
+        self.play(self.fast_color_wipe_frames(color, wait))
+
+    def fast_theater_chase(self, color, wait=20):
+        """Blocking theater chase with fewer cycles and shorter delays"""
+        self.play(self.theater_chase_frames(color, wait, 3))
+
+    def rainbow_cycle(self, sets=1, wait=5):
+        """Blocking version of rainbow_cycle_frames()"""
+        self.play(self.rainbow_cycle_frames(sets, wait))
+
+    def rainbow(self, wait):
+        """Blocking version of rainbow_frames()"""
+        self.play(self.rainbow_frames(wait))
+
+    def theater_chase_rainbow(self, wait):
+        """Blocking version of theater_chase_rainbow_frames()"""
+        self.play(self.theater_chase_rainbow_frames(wait))
+
+    def candy_cane(self, sets, width, wait):
+        """Blocking version of candy_cane_frames()"""
+        self.play(self.candy_cane_frames(sets, width, wait))
+
+    def random_white(self, sets, wait):
+        """Blocking version of random_white_frames()"""
+        self.play(self.random_white_frames(sets, wait))
+
+    def rainbow_stripe(self, sets, width, wait):
+        """Blocking version of rainbow_stripe_frames()"""
+        self.play(self.rainbow_stripe_frames(sets, width, wait))
+
+    def random_color(self, sets, wait):
+        """Blocking version of random_color_frames()"""
+        self.play(self.random_color_frames(sets, wait))
+
+    def alternate_color(self, color1, color2, wait):
+        """Blocking version of alternate_color_frames()"""
+        self.play(self.alternate_color_frames(color1, color2, wait))
+
+    def random_position_fill(self, color, wait):
+        """Blocking version of random_position_fill_frames()"""
+        self.play(self.random_position_fill_frames(color, wait))
+
+    def middle_fill(self, color, wait):
+        """Blocking version of middle_fill_frames()"""
+        self.play(self.middle_fill_frames(color, wait))
+
+    def side_fill(self, color, wait):
+        """Blocking version of side_fill_frames()"""
+        self.play(self.side_fill_frames(color, wait))
+
     def hsv_to_rgb(self, h, s, v):
         """
         Convert HSV to RGB color
-        
+
         Args:
             h: Hue (0-65535)
             s: Saturation (0-255)
             v: Value (0-255)
-            
+
         Returns:
             RGB tuple (r, g, b)
         """
-        # Convert hue from 16-bit to 8-bit
-        h = h >> 8
-        
-        if s == 0:
-            return (v, v, v)
-            
-        # Sector 0 to 5
-        sector = h // 43
-        f = ((h % 43) * 6) // 256
-        
-        p = (v * (255 - s)) // 255
-        q = (v * (255 - ((s * f) // 256))) // 255
-        t = (v * (255 - ((s * (255 - f)) // 256))) // 255
-        
-        if sector == 0:
-            return (v, t, p)
-        elif sector == 1:
-            return (q, v, p)
-        elif sector == 2:
-            return (p, v, t)
-        elif sector == 3:
-            return (p, q, v)
-        elif sector == 4:
-            return (t, p, v)
-        else:
-            return (v, p, q)
-            
+        return palette.hsv_to_rgb(h, s, v)
+
     def wheel(self, pos):
         """
         Input a value 0 to 255 to get a color value.
         The colours are a transition r - g - b - back to r.
         """
-        if pos < 85:
-            return (pos * 3, 255 - pos * 3, 0)
-        elif pos < 170:
-            pos -= 85
-            return (255 - pos * 3, 0, pos * 3)
-        else:
-            pos -= 170
-            return (0, pos * 3, 255 - pos * 3)
-            
-    def candy_cane(self, sets, width, wait):
-        """Candy cane pattern with red and white stripes"""
-        for j in range(sets * width):
-            if supervisor.runtime.serial_bytes_available:
-                break
-                
-            for i in range(self.num_pixels):
-                if supervisor.runtime.serial_bytes_available:
-                    break
-                    
-                l = self.num_pixels - i - 1
-                if ((i + j) % (width * 2)) < width:
-                    self.set_pixel(l, (255, 0, 0))  # Red
-                else:
-                    self.set_pixel(l, (255, 255, 255))  # White
-                    
-            self.show()
-            time.sleep(wait / 1000.0)
-            
-    def random_white(self, sets, wait):
-        """Random white/grayscale pattern"""
-        for i in range(sets):
-            if supervisor.runtime.serial_bytes_available:
-                break
-                
-            for j in range(self.num_pixels):
-                if supervisor.runtime.serial_bytes_available:
-                    break
-                    
-                v = random.randint(0, 255)
-                self.set_pixel(j, (v, v, v))
-                
-            self.show()
-            time.sleep(wait / 1000.0)
-            
-    def rainbow_stripe(self, sets, width, wait):
-        """Rainbow stripe pattern"""
-        for j in range(sets * width * 6):
-            if supervisor.runtime.serial_bytes_available:
-                break
-                
-            for i in range(self.num_pixels):
-                if supervisor.runtime.serial_bytes_available:
-                    break
-                    
-                l = self.num_pixels - i - 1
-                color_index = ((i + j) // width) % 6
-                
-                if color_index == 0:
-                    self.set_pixel(l, (255, 0, 0))  # Red
-                elif color_index == 1:
-                    self.set_pixel(l, (255, 255, 0))  # Yellow
-                elif color_index == 2:
-                    self.set_pixel(l, (0, 255, 0))  # Green
-                elif color_index == 3:
-                    self.set_pixel(l, (0, 255, 255))  # Cyan
-                elif color_index == 4:
-                    self.set_pixel(l, (0, 0, 255))  # Blue
-                elif color_index == 5:
-                    self.set_pixel(l, (255, 0, 255))  # Magenta
-                    
-            self.show()
-            time.sleep(wait / 1000.0)
-            
-    def random_color(self, sets, wait):
-        """Random color pattern"""
-        for i in range(sets):
-            if supervisor.runtime.serial_bytes_available:
-                break
-                
-            for j in range(self.num_pixels):
-                if supervisor.runtime.serial_bytes_available:
-                    break
-                    
-                r = random.randint(0, 255)
-                g = random.randint(0, 255)
-                b = random.randint(0, 255)
-                self.set_pixel(j, (r, g, b))
-                
-            self.show()
-            time.sleep(wait / 1000.0)
-            
-    def alternate_color(self, color1, color2, wait):
-        """Alternate between two colors"""
-        # Set even pixels to color1, odd to color2
-        for i in range(self.num_pixels):
-            if supervisor.runtime.serial_bytes_available:
-                break
-                
-            if i % 2 == 0:
-                self.set_pixel(i, color1)
-            else:
-                self.set_pixel(i, color2)
-                
-        self.show()
-        time.sleep(wait / 1000.0)
-        
-        # Swap colors
-        for i in range(self.num_pixels):
-            if supervisor.runtime.serial_bytes_available:
-                break
-                
-            if i % 2 == 0:
-                self.set_pixel(i, color2)
-            else:
-                self.set_pixel(i, color1)
-                
-        self.show()
-        time.sleep(wait / 1000.0)
-        
-    def random_position_fill(self, color, wait):
-        """Fill strip by lighting random positions"""
-        used = [0] * self.num_pixels
-        lights = 0
-        
-        while lights < self.num_pixels - 1:
-            if supervisor.runtime.serial_bytes_available:
-                break
-                
-            j = random.randint(0, self.num_pixels - 1)
-            if used[j] != 1:
-                self.set_pixel(j, color)
-                used[j] = 1
-                lights += 1
-                self.show()
-                time.sleep(wait / 1000.0)
-                
-    def middle_fill(self, color, wait):
-        """Fill strip from middle outward"""
-        # Fill from middle outward
-        for i in range(self.num_pixels // 2):
-            if supervisor.runtime.serial_bytes_available:
-                break
-                
-            self.set_pixel(self.num_pixels // 2 + i, color)
-            self.set_pixel(self.num_pixels // 2 - i, color)
-            self.show()
-            time.sleep(wait / 1000.0)
-            
-        # Clear from middle outward
-        for i in range(self.num_pixels // 2):
-            if supervisor.runtime.serial_bytes_available:
-                break
-                
-            self.set_pixel(i, (0, 0, 0))
-            self.set_pixel(self.num_pixels - i - 1, (0, 0, 0))
-            self.show()
-            time.sleep(wait / 1000.0)
-            
-    def side_fill(self, color, wait):
-        """Fill strip from sides inward"""
-        # Fill from sides inward
-        for i in range(self.num_pixels // 2):
-            if supervisor.runtime.serial_bytes_available:
-                break
-                
-            self.set_pixel(i, color)
-            self.set_pixel(self.num_pixels - i - 1, color)
-            self.show()
-            time.sleep(wait / 1000.0)
-            
-        # Clear from middle outward
-        for i in range(self.num_pixels // 2):
-            if supervisor.runtime.serial_bytes_available:
-                break
-                
-            self.set_pixel(self.num_pixels // 2 + i, (0, 0, 0))
-            self.set_pixel(self.num_pixels // 2 - i, (0, 0, 0))
-            self.show()
-            time.sleep(wait / 1000.0) 
\ No newline at end of file
+        return palette.wheel(pos)
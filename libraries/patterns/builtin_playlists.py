@@ -0,0 +1,96 @@
+"""
+Built-in pattern playlists for CircuitPython NeoPixel control
+The seven pattern themes, described as playlist data (see playlist.py)
+
+The entries have the same shape as a playlists.json file, so any of them
+can be copied there and edited without touching code.
+"""
+
+BUILTIN_PLAYLISTS = [
+    {
+        "name": "fall",
+        "aliases": ["autumn"],
+        "pause": 50,
+        "colors": {"red": [255, 0, 0], "yellow": [255, 255, 15], "orange": [255, 35, 0]},
+        "steps": [
+            {"effect": "color_wipe", "colors": ["red"], "wait": 20},
+            {"effect": "color_wipe", "colors": ["yellow"], "wait": 20},
+            {"effect": "color_wipe", "colors": ["orange"], "wait": 20},
+            {"effect": "theater_chase", "colors": ["yellow"], "wait": 30},
+            {"effect": "theater_chase", "colors": ["red"], "wait": 30},
+            {"effect": "theater_chase", "colors": ["orange"], "wait": 30},
+            {"effect": "interleave_fill", "colors": ["red", "orange", "yellow"], "count": 100, "wait": 50},
+            {"effect": "twinkle", "colors": ["red", "yellow", "orange"], "count": 200, "wait": 50},
+        ],
+    },
+    {
+        "name": "july",
+        "aliases": ["4th", "patriotic"],
+        "pause": 50,
+        "colors": {"red": [255, 0, 0], "white": [255, 255, 255], "blue": [0, 0, 255]},
+        "steps": [
+            {"effect": "color_wipe", "colors": ["red"], "wait": 20},
+            {"effect": "color_wipe", "colors": ["white"], "wait": 20},
+            {"effect": "color_wipe", "colors": ["blue"], "wait": 20},
+            {"effect": "theater_chase", "colors": ["white"], "wait": 30},
+            {"effect": "theater_chase", "colors": ["red"], "wait": 30},
+            {"effect": "theater_chase", "colors": ["blue"], "wait": 30},
+            {"effect": "interleave_fill", "colors": ["red", "blue", "white"], "count": 100, "wait": 50},
+            {"effect": "twinkle", "colors": ["red", "white", "blue"], "count": 200, "wait": 50},
+        ],
+    },
+    {
+        "name": "xmas",
+        "aliases": ["christmas"],
+        "pause": 100,
+        "colors": {"red": [255, 0, 0], "green": [0, 255, 0], "white": [255, 255, 255]},
+        "steps": [
+            {"effect": "candy_cane", "count": 5, "width": 8, "wait": 30},
+            {"effect": "rainbow_stripe", "count": 2, "width": 4, "wait": 50},
+            {"effect": "random_white", "count": 10, "wait": 100},
+            {"effect": "random_color", "count": 10, "wait": 100},
+            {"effect": "color_wipe", "colors": ["red"], "wait": 30},
+            {"effect": "color_wipe", "colors": ["green"], "wait": 30},
+            {"effect": "color_wipe", "colors": ["white"], "wait": 30},
+            {"effect": "rainbow_cycle", "count": 3, "wait": 5},
+            {"effect": "alternate_color", "colors": ["red", "green"], "wait": 50},
+            {"effect": "random_position_fill", "colors": ["red"], "wait": 30},
+            {"effect": "middle_fill", "colors": ["green"], "wait": 30},
+            {"effect": "side_fill", "colors": ["white"], "wait": 30},
+        ],
+    },
+    {
+        "name": "normal",
+        "aliases": ["norm"],
+        "pause": 50,
+        "steps": [
+            {"effect": "color_wipe", "colors": [[255, 0, 0]], "wait": 20},
+            {"effect": "color_wipe", "colors": [[0, 255, 0]], "wait": 20},
+            {"effect": "color_wipe", "colors": [[0, 0, 255]], "wait": 20},
+            {"effect": "theater_chase", "colors": [[127, 127, 127]], "wait": 30},
+            {"effect": "rainbow", "wait": 5},
+            {"effect": "theater_chase_rainbow", "wait": 30},
+        ],
+    },
+    {
+        "name": "alert",
+        "pause": 50,
+        "steps": [
+            {"effect": "color_wipe", "colors": [[255, 255, 0]], "wait": 20},
+        ],
+    },
+    {
+        "name": "blue",
+        "pause": 100,
+        "steps": [
+            {"effect": "color_wipe", "colors": [[0, 0, 255]], "wait": 50},
+        ],
+    },
+    {
+        "name": "pink",
+        "pause": 100,
+        "steps": [
+            {"effect": "color_wipe", "colors": [[255, 0, 255]], "wait": 50},
+        ],
+    },
+]
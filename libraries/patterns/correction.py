@@ -0,0 +1,181 @@
+"""
+Color correction for CircuitPython NeoPixel patterns
+Applies gamma and brightness to each frame on its way to the strip
+
+Patterns draw in plain 0-255 channel values. LEDs look much brighter at
+low values than those numbers suggest, so each frame is passed through a
+256-entry lookup table per channel that applies a gamma curve and the
+brightness setting together. The tables are built once, and again only
+when the brightness changes, so correcting a frame is one table lookup
+per byte of the changed span, with no floating point.
+
+The corrected bytes go to a second buffer; the patterns' own frame keeps
+its uncorrected values, since effects draw over what is already there.
+
+Gamma and low brightness squeeze many input values onto a few output
+levels, so dim colors and slow fades step visibly. With dithering on,
+each table entry keeps the corrected value to 1/256 of a level as a
+whole part and a fraction. Every frame adds the fraction to a per-byte
+remainder carried over from the frame before and sends one level more
+whenever the remainder overflows, so over a few frames each LED averages
+out to the exact corrected value. This needs frames to keep going out
+while the pattern is still; refresh() resends the last one.
+"""
+
+from .framebuffer import FrameBuffer
+
+def correction_table(gamma=1.0, level=1.0):
+    """
+    Build a lookup table for one channel
+
+    Args:
+        gamma: Gamma exponent (1.0 leaves the curve linear)
+        level: Brightness the table scales to (0.0 to 1.0)
+
+    Returns:
+        bytes of 256 corrected values, indexed by the uncorrected value
+    """
+    table = bytearray(256)
+    for v in range(256):
+        table[v] = int(((v / 255) ** gamma) * level * 255 + 0.5)
+    return bytes(table)
+
+def dither_tables(gamma=1.0, level=1.0):
+    """
+    Build the lookup tables for one channel with 8 bits of fraction
+
+    Args:
+        gamma: Gamma exponent (1.0 leaves the curve linear)
+        level: Brightness the tables scale to (0.0 to 1.0)
+
+    Returns:
+        Tuple of (whole, fraction) bytes of 256 values each; the corrected
+        value is whole + fraction / 256
+    """
+    whole = bytearray(256)
+    fraction = bytearray(256)
+    for v in range(256):
+        value = min(255 << 8, int(((v / 255) ** gamma) * level * (255 << 8) + 0.5))
+        whole[v] = value >> 8
+        fraction[v] = value & 0xFF
+    return bytes(whole), bytes(fraction)
+
+class CorrectedOutput:
+    """Output stage that corrects each frame through per-channel tables"""
+
+    def __init__(self, output, num_pixels, pixel_order="GRB", gamma=2.8,
+                 brightness=1.0, balance=None, dither=False):
+        """
+        Initialize output
+
+        Args:
+            output: Output the corrected frames go to (e.g. SeesawOutput)
+            num_pixels: Number of pixels in the strip
+            pixel_order: Wire byte order of the strip
+            gamma: Gamma exponent applied to every channel
+            brightness: Initial brightness (0.0 to 1.0)
+            balance: Optional dict of channel letter to scale (0.0 to 1.0),
+                e.g. {"B": 0.8} to tone down a blue tint
+            dither: Spread the fractions of corrected values over successive frames
+        """
+        self.output = output
+        self.target = FrameBuffer(num_pixels, None, pixel_order)
+        self.gamma = gamma
+        self.balance = balance or {}
+        self.dither = dither
+        self.brightness = None
+        self.tables = ()  # One table per wire byte position
+        self.fractions = ()  # Matching fraction tables when dithering
+        if dither:
+            # Remainder carried per byte, started staggered so neighbouring
+            # pixels step up on different frames
+            self.remainder = bytearray((o * 97) & 0xFF for o in range(num_pixels * len(pixel_order)))
+        self._last = None  # Frame written last, corrected again when the tables change
+        self._stale = True  # The whole frame needs correcting on the next write
+        self.set_brightness(brightness)
+
+    def set_brightness(self, brightness):
+        """
+        Change the brightness, rebuilding the tables and resending the last frame
+
+        Args:
+            brightness: New brightness (0.0 to 1.0)
+
+        Returns:
+            True if the brightness changed
+        """
+        brightness = min(1.0, max(0.0, brightness))
+        if brightness == self.brightness:
+            return False
+
+        self.brightness = brightness
+        built = {}  # Channels with the same scale share tables
+        tables = []
+        for channel in self.target.pixel_order:
+            level = brightness * self.balance.get(channel, 1.0)
+            if level not in built:
+                if self.dither:
+                    built[level] = dither_tables(self.gamma, level)
+                else:
+                    built[level] = (correction_table(self.gamma, level), None)
+            tables.append(built[level])
+        self.tables = tuple(whole for whole, fraction in tables)
+        self.fractions = tuple(fraction for whole, fraction in tables)
+        self._stale = True
+
+        if self._last is not None:
+            self.write(self._last)
+        return True
+
+    def refresh(self):
+        """
+        Send the last frame again, so a dithered frame keeps averaging out
+
+        Returns:
+            True if a frame was sent
+        """
+        if self._last is None:
+            return False
+        self._stale = True
+        self.write(self._last)
+        return True
+
+    def write(self, frame):
+        """
+        Correct the changed span of a frame and send it on
+
+        Args:
+            frame: FrameBuffer to send
+        """
+        start = frame.dirty_start
+        stop = frame.dirty_stop
+        if self._stale or frame is not self._last or self.dither:
+            # Dithering moves every pixel's remainder, so it corrects all of them
+            start = 0
+            stop = frame.num_pixels
+            self._stale = False
+        self._last = frame
+
+        src = frame.buf
+        target = self.target
+        dst = target.buf
+        bpp = len(self.tables)
+        end = stop * bpp
+        if self.dither:
+            remainder = self.remainder
+            for c in range(bpp):
+                whole = self.tables[c]
+                fraction = self.fractions[c]
+                for o in range(start * bpp + c, end, bpp):
+                    total = remainder[o] + fraction[src[o]]
+                    remainder[o] = total & 0xFF
+                    dst[o] = whole[src[o]] + (total >> 8)
+        else:
+            for c in range(bpp):
+                table = self.tables[c]
+                for o in range(start * bpp + c, end, bpp):
+                    dst[o] = table[src[o]]
+
+        target.dirty_start = start
+        target.dirty_stop = stop
+        self.output.write(target)
@@ -0,0 +1,380 @@
+"""
+Time-based effects for CircuitPython NeoPixel patterns
+Each effect draws the frame for any time since it started
+
+An effect is a sequence of frames, one every ``wait`` milliseconds, and
+render(t) draws frame t // wait. Nothing depends on how many frames were
+rendered before, so an effect plays at the same speed at any frame rate,
+late frames jump ahead instead of slowing the animation down, and
+playback can start at any point.
+
+Most effects draw every pixel of every frame (``full``). The wipes and
+fills draw over whatever the strip already shows, one change per frame,
+so render(t) applies the changes since the last frame it drew; after
+reset() it replays them from the first frame. Random effects draw new
+values whenever a frame is drawn, so seeking into them gives a frame
+that looks the same rather than the same bytes.
+
+Full effects whose frames depend on nothing but the frame number say how
+many distinct frames they have (``slots``), so a FrameCache can keep
+them and copy them back instead of drawing them again.
+"""
+
+import random
+from . import palette
+
+class Effect:
+    """Base class for an effect of frames played against time"""
+
+    full = False  # True if every frame draws every pixel
+    slots = 0  # Distinct frames of a deterministic full effect, 0 if not cacheable
+
+    def __init__(self, pixels, frames, wait):
+        """
+        Initialize effect
+
+        Args:
+            pixels: FrameBuffer to draw into
+            frames: Number of frames
+            wait: Milliseconds per frame (at least 1)
+        """
+        self.pixels = pixels
+        self.num_pixels = pixels.num_pixels
+        self.frames = frames
+        self.wait = max(1, wait)
+        self.length = frames * self.wait  # Milliseconds from the first frame to the end
+        self.fills = self.full  # True if the last frame covers every pixel
+        self.drawn = -1  # Last frame drawn, -1 after reset()
+        self.cache = None  # FrameCache full frames are drawn through, if any
+
+    def reset(self):
+        """Forget the frames drawn, so the next render starts from the first frame"""
+        self.drawn = -1
+
+    def render(self, t):
+        """
+        Draw the frame at a time
+
+        Args:
+            t: Milliseconds since the effect started
+
+        Returns:
+            Milliseconds since the start when the next frame is due, or None
+            once t is past the end
+        """
+        if t >= self.length:
+            k = self.frames - 1
+        else:
+            k = t // self.wait
+
+        if k != self.drawn:
+            if self.full:
+                if self.cache is not None:
+                    self.cache.draw(self, k)
+                else:
+                    self.draw(k)
+            else:
+                for j in range(self.drawn + 1, k + 1):
+                    self.draw(j)
+            self.drawn = k
+
+        if t >= self.length:
+            return None
+        return (k + 1) * self.wait
+
+    def slot(self, k):
+        """Which of the distinct frames frame k is (0 to slots-1)"""
+        return k
+
+    def draw(self, k):
+        """
+        Draw frame k (full effects) or the change frame k makes (others)
+        - must be implemented by subclasses
+        """
+        raise NotImplementedError("Subclasses must implement draw() method")
+
+def stripe_run(pixels, colors, width):
+    """
+    Build a packed run of color stripes that scrolls toward pixel 0
+
+    Stripe k of the run is colors[k], width pixels wide, laid out so that
+    tile(run, -j) draws the stripes shifted by j pixels, starting from
+    the far end of the strip like the original per-pixel loops.
+
+    Args:
+        pixels: FrameBuffer the run is for
+        colors: Sequence of RGB tuples
+        width: Stripe width in pixels
+
+    Returns:
+        TileRun for tile()
+    """
+    period = len(colors) * width
+    bpp = pixels.bpp
+    packed = [pixels.pack(color) for color in colors]
+    run = bytearray(period * bpp)
+    for m in range(period):
+        run[m * bpp:(m + 1) * bpp] = packed[((pixels.num_pixels - 1 - m) % period) // width]
+    return pixels.prepare(run)
+
+class ColorWipe(Effect):
+    """Fill strip with a color one pixel at a time"""
+
+    def __init__(self, pixels, color, wait):
+        super().__init__(pixels, pixels.num_pixels, wait)
+        self.packed = pixels.pack(color)
+        self.fills = True
+
+    def draw(self, k):
+        self.pixels.put(k, self.packed)
+
+class FastColorWipe(Effect):
+    """Color wipe that shows three new pixels per frame"""
+
+    def __init__(self, pixels, color, wait=10):
+        super().__init__(pixels, (pixels.num_pixels + 2) // 3, 3 * wait)
+        self.packed = pixels.pack(color)
+        self.fills = True
+
+    def draw(self, k):
+        for i in range(3 * k, min(3 * k + 3, self.num_pixels)):
+            self.pixels.put(i, self.packed)
+
+class TheaterChase(Effect):
+    """Theater-style crawling lights, every third pixel lit"""
+
+    full = True
+
+    slots = 3
+
+    def __init__(self, pixels, color, wait, cycles=5):
+        super().__init__(pixels, 3 * cycles, wait)
+        self.run = pixels.prepare(pixels.pack(color) + pixels.pack((0, 0, 0)) * 2)
+
+    def slot(self, k):
+        return k % 3
+
+    def draw(self, k):
+        self.pixels.tile(self.run, -(k % 3))
+
+class RainbowCycle(Effect):
+    """Rainbow cycle along the strip"""
+
+    full = True
+
+    slots = 256
+
+    def __init__(self, pixels, sets=1, wait=5):
+        super().__init__(pixels, 256 * sets, wait)
+        self.table = palette.wheel_table(pixels.pixel_order)
+        self.index = palette.strip_index(pixels.num_pixels)
+
+    def slot(self, k):
+        return k & 255
+
+    def draw(self, k):
+        # Pixel i shows wheel(i * 256 // num_pixels + k), so every pixel
+        # moves one wheel entry per frame
+        pixels = self.pixels
+        table = self.table
+        index = self.index
+        for i in range(self.num_pixels):
+            pixels.put_from(i, table, (index[i] + k) & 255)
+
+class Rainbow(RainbowCycle):
+    """Rainbow that turns through the color wheel five times"""
+
+    def __init__(self, pixels, wait):
+        # The first pixel's hue moves 256 of 65536 (one hue table entry) per frame
+        super().__init__(pixels, 5, wait)
+        self.table = palette.hue_table(pixels.pixel_order)
+
+class TheaterChaseRainbow(Effect):
+    """Rainbow-enhanced theater chase"""
+
+    full = True
+
+    def __init__(self, pixels, wait):
+        super().__init__(pixels, 90, wait)  # 30 chases of 3 frames, one hue cycle
+        self.slots = 90
+        self.table = palette.hue_table(pixels.pixel_order)
+        # Hue of pixel 'c' is offset to make one full revolution
+        # of the color wheel along the length of the strip
+        self.offsets = tuple(c * 65536 // pixels.num_pixels for c in range(pixels.num_pixels))
+        self.off = pixels.prepare(pixels.pack((0, 0, 0)))
+
+    def draw(self, k):
+        pixels = self.pixels
+        table = self.table
+        offsets = self.offsets
+        pixels.tile(self.off)
+        first_pixel_hue = k * (65536 // 90)
+
+        # Every third pixel from k % 3 lit
+        for c in range(k % 3, self.num_pixels, 3):
+            pixels.put_from(c, table, ((first_pixel_hue + offsets[c]) >> 8) & 255)
+
+class Stripes(Effect):
+    """Stripes of colors scrolling along the strip one pixel per frame"""
+
+    full = True
+
+    def __init__(self, pixels, colors, frames, width, wait):
+        super().__init__(pixels, frames, wait)
+        self.run = stripe_run(pixels, colors, width)
+        self.slots = len(colors) * width  # The stripes repeat after one period
+
+    def slot(self, k):
+        return k % self.slots
+
+    def draw(self, k):
+        self.pixels.tile(self.run, -k)
+
+class CandyCane(Stripes):
+    """Candy cane pattern with red and white stripes"""
+
+    def __init__(self, pixels, sets, width, wait):
+        super().__init__(pixels, ((255, 0, 0), (255, 255, 255)),  # Red, White
+                         sets * width, width, wait)
+
+class RainbowStripe(Stripes):
+    """Rainbow stripe pattern"""
+
+    def __init__(self, pixels, sets, width, wait):
+        super().__init__(pixels, (
+            (255, 0, 0),  # Red
+            (255, 255, 0),  # Yellow
+            (0, 255, 0),  # Green
+            (0, 255, 255),  # Cyan
+            (0, 0, 255),  # Blue
+            (255, 0, 255),  # Magenta
+        ), sets * width * 6, width, wait)
+
+class RandomWhite(Effect):
+    """Random white/grayscale pattern"""
+
+    full = True
+
+    def __init__(self, pixels, sets, wait):
+        super().__init__(pixels, sets, wait)
+
+    def draw(self, k):
+        for j in range(self.num_pixels):
+            v = random.randint(0, 255)
+            self.pixels.set_rgb(j, v, v, v)
+
+class RandomColor(Effect):
+    """Random color pattern"""
+
+    full = True
+
+    def __init__(self, pixels, sets, wait):
+        super().__init__(pixels, sets, wait)
+
+    def draw(self, k):
+        for j in range(self.num_pixels):
+            r = random.randint(0, 255)
+            g = random.randint(0, 255)
+            b = random.randint(0, 255)
+            self.pixels.set_rgb(j, r, g, b)
+
+class AlternateColor(Effect):
+    """Alternate between two colors"""
+
+    full = True
+
+    slots = 2
+
+    def __init__(self, pixels, color1, color2, wait):
+        super().__init__(pixels, 2, wait)
+        self.run = pixels.prepare(pixels.pack(color1) + pixels.pack(color2))
+
+    def draw(self, k):
+        # Even pixels color1 and odd color2, then swapped
+        self.pixels.tile(self.run, k)
+
+class RandomPositionFill(Effect):
+    """Fill strip by lighting random positions"""
+
+    def __init__(self, pixels, color, wait):
+        super().__init__(pixels, max(0, pixels.num_pixels - 1), wait)
+        self.packed = pixels.pack(color)
+        self.used = bytearray(pixels.num_pixels)  # Pixels lit so far
+
+    def reset(self):
+        super().reset()
+        used = self.used
+        for j in range(self.num_pixels):
+            used[j] = 0
+
+    def draw(self, k):
+        used = self.used
+        while True:
+            j = random.randint(0, self.num_pixels - 1)
+            if used[j] != 1:
+                self.pixels.put(j, self.packed)
+                used[j] = 1
+                return
+
+class MiddleFill(Effect):
+    """Fill strip from middle outward, then clear it from middle outward"""
+
+    def __init__(self, pixels, color, wait):
+        super().__init__(pixels, 2 * (pixels.num_pixels // 2), wait)
+        self.packed = pixels.pack(color)
+        self.off = pixels.pack((0, 0, 0))
+        self.fills = True
+
+    def draw(self, k):
+        half = self.num_pixels // 2
+        if k < half:
+            self.pixels.put(half + k, self.packed)
+            self.pixels.put(half - k, self.packed)
+        else:
+            i = k - half
+            self.pixels.put(i, self.off)
+            self.pixels.put(self.num_pixels - i - 1, self.off)
+
+class SideFill(Effect):
+    """Fill strip from sides inward, then clear it from middle outward"""
+
+    def __init__(self, pixels, color, wait):
+        super().__init__(pixels, 2 * (pixels.num_pixels // 2), wait)
+        self.packed = pixels.pack(color)
+        self.off = pixels.pack((0, 0, 0))
+        self.fills = True
+
+    def draw(self, k):
+        half = self.num_pixels // 2
+        if k < half:
+            self.pixels.put(k, self.packed)
+            self.pixels.put(self.num_pixels - k - 1, self.packed)
+        else:
+            i = k - half
+            self.pixels.put(half + i, self.off)
+            self.pixels.put(half - i, self.off)
+
+class InterleaveFill(Effect):
+    """Fill interleaved runs of colors, one pixel of each color per frame"""
+
+    def __init__(self, pixels, colors, steps, wait):
+        super().__init__(pixels, steps, wait)
+        self.packed = [pixels.pack(color) for color in colors]
+        self.fills = steps * len(colors) >= pixels.num_pixels
+
+    def draw(self, k):
+        stride = len(self.packed)
+        for i in range(stride):
+            if k * stride + i < self.num_pixels:
+                self.pixels.put(k * stride + i, self.packed[i])
+
+class Twinkle(Effect):
+    """Light one random pixel in each color per frame"""
+
+    def __init__(self, pixels, colors, steps, wait):
+        super().__init__(pixels, steps, wait)
+        self.packed = [pixels.pack(color) for color in colors]
+
+    def draw(self, k):
+        for color in self.packed:
+            self.pixels.put(random.randint(0, self.num_pixels - 1), color)
@@ -0,0 +1,579 @@
+"""
+Framebuffer for CircuitPython NeoPixel patterns
+Holds a whole frame as a preallocated bytearray in the strip's wire order
+and hands it to the pixel driver in one bulk transfer
+
+The framebuffer tracks the range of pixels written since the last show().
+show() skips the transfer when nothing changed. Outputs that can update
+part of a strip read frame.dirty_start and frame.dirty_stop to send only
+the changed span. A Zone lets a pattern draw into part of a frame, reversed
+or mirrored, as if it were a whole strip.
+"""
+
+class PixelBufOutput:
+    """Sends a frame to an adafruit_pixelbuf based driver in one call"""
+
+    def __init__(self, pixels):
+        """
+        Initialize output
+
+        Args:
+            pixels: NeoPixel object (native, or seesaw), created with auto_write=False
+        """
+        self.pixels = pixels
+        # PixelBuf drivers expose _transmit(buffer), which takes the raw
+        # wire-order bytes. Drivers without it get the frame pixel by pixel.
+        self._transmit = getattr(pixels, "_transmit", None)
+
+    def write(self, frame):
+        """
+        Transmit a frame (NeoPixel data always carries the whole strip)
+
+        Args:
+            frame: FrameBuffer to send
+        """
+        if self._transmit is not None:
+            self._transmit(frame.buf)
+            return
+
+        for i in range(frame.dirty_start, frame.dirty_stop):
+            self.pixels[i] = frame[i]
+        self.pixels.show()
+
+class TileRun:
+    """
+    A packed run prepared for repeated tile() calls
+
+    The run is stored twice over, so every rotation of it is one contiguous
+    slice, and each rotation's slice is kept once made (as are the shorter
+    slices used when the run is longer than the range it is tiled over).
+    Tiling the same run again then allocates nothing.
+    """
+
+    def __init__(self, run, bpp):
+        """
+        Initialize run
+
+        Args:
+            run: Wire-order bytes holding one or more packed pixels
+            bpp: Bytes per pixel of the frame it will be tiled into
+        """
+        length = len(run)
+        doubled = bytearray(2 * length)
+        doubled[:length] = run
+        doubled[length:] = run
+        self.length = length
+        self.bpp = bpp
+        self.pixels = length // bpp
+        self._doubled = memoryview(doubled)
+        self._rotations = [None] * self.pixels
+        self._heads = {}  # (rotation << 16) | length -> shorter rotated slice
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        return self._doubled[index]
+
+    def rotation(self, phase, length=None):
+        """
+        The run rotated left by phase pixels, as a memoryview
+
+        Args:
+            phase: Number of pixels to rotate by
+            length: Bytes of the rotated run wanted (default all of it)
+        """
+        k = phase % self.pixels
+        if length is not None and length < self.length:
+            key = (k << 16) | length
+            view = self._heads.get(key)
+            if view is None:
+                offset = k * self.bpp
+                view = self._doubled[offset:offset + length]
+                if len(self._heads) < 64:
+                    self._heads[key] = view
+            return view
+
+        view = self._rotations[k]
+        if view is None:
+            offset = k * self.bpp
+            view = self._rotations[k] = self._doubled[offset:offset + self.length]
+        return view
+
+class FrameBuffer:
+    """A whole strip frame stored as wire-order bytes"""
+
+    def __init__(self, num_pixels, output=None, pixel_order="GRB"):
+        """
+        Initialize framebuffer
+
+        Args:
+            num_pixels: Number of pixels in the strip
+            output: Object with a write(frame) method, or None to render headless
+            pixel_order: Wire byte order of the strip, e.g. "GRB" or "GRBW"
+        """
+        self.num_pixels = num_pixels
+        self.output = output
+        self.pixel_order = pixel_order
+        self.bpp = len(pixel_order)
+        self.buf = bytearray(num_pixels * self.bpp)
+        self._view = memoryview(self.buf)
+        self._r = pixel_order.index("R")
+        self._g = pixel_order.index("G")
+        self._b = pixel_order.index("B")
+        self._w = pixel_order.find("W")
+        self._prefixes = {}  # (start << 16) | length -> memoryview of the frame, for tile()
+        self._spans = {}  # The same for span()
+        self.show_count = 0  # Calls to show()
+        self.transmit_count = 0  # Frames actually sent to the output
+        self.invalidate()
+
+    def __len__(self):
+        return self.num_pixels
+
+    def __setitem__(self, index, color):
+        if index < 0:
+            index += self.num_pixels
+        if isinstance(color, int):
+            color = ((color >> 16) & 255, (color >> 8) & 255, color & 255)
+        if self._w >= 0:
+            self.set_rgbw(index, color[0], color[1], color[2], color[3] if len(color) > 3 else 0)
+        else:
+            self.set_rgb(index, color[0], color[1], color[2])
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.num_pixels
+        offset = index * self.bpp
+        buf = self.buf
+        if self._w >= 0:
+            return (buf[offset + self._r], buf[offset + self._g],
+                    buf[offset + self._b], buf[offset + self._w])
+        return (buf[offset + self._r], buf[offset + self._g], buf[offset + self._b])
+
+    def pack(self, color):
+        """
+        Convert a color to wire-order bytes for put() and tile()
+
+        Args:
+            color: RGB tuple (r, g, b), RGBW tuple or 0xRRGGBB integer
+
+        Returns:
+            bytes of length bpp
+        """
+        if isinstance(color, int):
+            color = ((color >> 16) & 255, (color >> 8) & 255, color & 255)
+        packed = bytearray(self.bpp)
+        packed[self._r] = color[0]
+        packed[self._g] = color[1]
+        packed[self._b] = color[2]
+        if self._w >= 0 and len(color) > 3:
+            packed[self._w] = color[3]
+        return bytes(packed)
+
+    def prepare(self, run):
+        """
+        Prepare a packed run for tiling it many times without allocating
+
+        Args:
+            run: Wire-order bytes holding one or more packed pixels
+
+        Returns:
+            TileRun for tile()
+        """
+        return TileRun(run, self.bpp)
+
+    def mark_dirty(self, start, stop):
+        """
+        Record that pixels in [start, stop) changed since the last show()
+
+        Args:
+            start: First changed pixel
+            stop: Pixel after the last changed one
+        """
+        if start < self.dirty_start:
+            self.dirty_start = start
+        if stop > self.dirty_stop:
+            self.dirty_stop = stop
+
+    def invalidate(self):
+        """Mark the whole frame as changed, e.g. after the output was reset"""
+        self.dirty_start = 0
+        self.dirty_stop = self.num_pixels
+
+    @property
+    def dirty(self):
+        """True when the frame changed since the last show()"""
+        return self.dirty_start < self.dirty_stop
+
+    def set_rgb(self, index, r, g, b):
+        """
+        Set a single pixel from channel values without building a tuple
+
+        Args:
+            index: Pixel index (0 to num_pixels-1)
+            r, g, b: Channel values (0-255)
+        """
+        offset = index * self.bpp
+        buf = self.buf
+        ro = offset + self._r
+        go = offset + self._g
+        bo = offset + self._b
+        if buf[ro] != r or buf[go] != g or buf[bo] != b:
+            buf[ro] = r
+            buf[go] = g
+            buf[bo] = b
+            self.mark_dirty(index, index + 1)
+
+    def set_rgbw(self, index, r, g, b, w):
+        """
+        Set a single pixel of an RGBW strip from channel values
+
+        Args:
+            index: Pixel index (0 to num_pixels-1)
+            r, g, b, w: Channel values (0-255)
+        """
+        self.set_rgb(index, r, g, b)
+        offset = index * self.bpp + self._w
+        if self.buf[offset] != w:
+            self.buf[offset] = w
+            self.mark_dirty(index, index + 1)
+
+    def put(self, index, packed):
+        """
+        Copy one pre-packed pixel into the frame
+
+        Args:
+            index: Pixel index (0 to num_pixels-1)
+            packed: Wire-order bytes from pack()
+        """
+        self.put_from(index, packed, 0)
+
+    def put_from(self, index, src, src_index):
+        """
+        Copy one packed pixel out of a table or ring without slicing it
+
+        Args:
+            index: Pixel index (0 to num_pixels-1)
+            src: Wire-order bytes in the same pixel order, e.g. from palette
+            src_index: Pixel index within src
+        """
+        bpp = self.bpp
+        offset = index * bpp
+        src_offset = src_index * bpp
+        buf = self.buf
+        if (buf[offset] != src[src_offset] or buf[offset + 1] != src[src_offset + 1]
+                or buf[offset + 2] != src[src_offset + 2]
+                or (bpp == 4 and buf[offset + 3] != src[src_offset + 3])):
+            buf[offset] = src[src_offset]
+            buf[offset + 1] = src[src_offset + 1]
+            buf[offset + 2] = src[src_offset + 2]
+            if bpp == 4:
+                buf[offset + 3] = src[src_offset + 3]
+            self.mark_dirty(index, index + 1)
+
+    def tile(self, run, phase=0, start=0, stop=None):
+        """
+        Repeat a packed run of pixels across a range of the frame
+
+        Pixel p takes pixel (p - start + phase) % run_length of the run.
+        The run is written once and then doubled with slice copies, so the
+        cost is a handful of bulk copies rather than one write per pixel.
+        A run from prepare() is copied without allocating.
+
+        The range is compared with the result first, and left alone (not
+        marked dirty) when it already holds it, so redrawing an unchanged
+        frame does not make show() send it again.
+
+        Args:
+            run: Wire-order bytes holding one or more packed pixels, or a TileRun
+            phase: Number of pixels to rotate the run by
+            start: First pixel to write
+            stop: Pixel after the last one to write (default end of strip)
+        """
+        if stop is None:
+            stop = self.num_pixels
+        if stop <= start:
+            return
+
+        bpp = self.bpp
+        view = self._view
+        first = start * bpp
+        total = (stop - start) * bpp
+        run_length = len(run)
+        filled = min(run_length, total)
+
+        # One rotated copy of the run, as long as the range allows
+        if isinstance(run, TileRun):
+            head = run.rotation(phase, filled)
+        else:
+            split = (phase * bpp) % run_length
+            head = memoryview(bytes(run[split:]) + bytes(run[:split]) if split else run)[:filled]
+
+        # Already drawn: the range starts with the run and repeats every run length
+        rest = total - filled
+        if self._window(first, filled) == head and \
+                (rest == 0 or self._window(first + run_length, rest) == self._window(first, rest)):
+            return
+
+        self.mark_dirty(start, stop)
+        view[first:first + filled] = head
+
+        # Double the filled region until the range is covered
+        while filled < total:
+            count = min(filled, total - filled)
+            view[first + filled:first + filled + count] = self._window(first, count)
+            filled += count
+
+    def _window(self, first, count):
+        """A view of count bytes of the frame from byte first, kept for tile()"""
+        key = (first << 16) | count
+        window = self._prefixes.get(key)
+        if window is None:
+            window = self._view[first:first + count]
+            if len(self._prefixes) < 64:
+                self._prefixes[key] = window
+        return window
+
+    def span(self, start, stop):
+        """
+        A writable view of pixels [start, stop) of the frame, e.g. for readinto()
+
+        Views are kept like tile()'s prefixes, so asking for the same span
+        again allocates nothing. Writing through the view does not mark the
+        pixels dirty; call mark_dirty() after.
+
+        Args:
+            start: First pixel
+            stop: Pixel after the last one
+
+        Returns:
+            memoryview of the span's wire-order bytes
+        """
+        first = start * self.bpp
+        count = (stop - start) * self.bpp
+        key = (first << 16) | count
+        view = self._spans.get(key)
+        if view is None:
+            view = self._view[first:first + count]
+            if len(self._spans) < 64:
+                self._spans[key] = view
+        return view
+
+    def fill(self, color):
+        """
+        Set every pixel to one color
+
+        Args:
+            color: RGB tuple (r, g, b)
+        """
+        self.tile(self.pack(color))
+
+    def fill_range(self, start, stop, color):
+        """
+        Set a contiguous range of pixels to one color
+
+        Args:
+            start: First pixel
+            stop: Pixel after the last one
+            color: RGB tuple (r, g, b)
+        """
+        self.tile(self.pack(color), 0, max(0, start), min(stop, self.num_pixels))
+
+    def show(self):
+        """Send the frame to the output if it changed since the last show()"""
+        self.show_count += 1
+        if self.dirty_start >= self.dirty_stop:
+            return
+
+        if self.output is not None:
+            self.output.write(self)
+        self.transmit_count += 1
+        self.dirty_start = self.num_pixels
+        self.dirty_stop = 0
+
+class Zone:
+    """
+    A run of a FrameBuffer's pixels that a pattern can draw into as a strip of its own
+
+    Pixel i of the zone is a pixel of the shared frame, counted from the
+    zone's start, or back from its end when reversed. A mirrored zone is
+    half as long as its run (rounded up), and every pixel drawn into it
+    also lands on its mirror image in the other half, so a pattern draws
+    half the pixels for a symmetric result. Reversing a mirrored zone puts
+    its first pixel in the middle.
+
+    Drawing writes straight into the shared frame; nothing is copied.
+    show() does not send - whatever shows the shared frame does, once for
+    all of its zones. Forward zones tile with the frame's bulk copies;
+    reversed and mirrored pixels are written one at a time.
+    """
+
+    def __init__(self, frame, start, length, reverse=False, mirror=False):
+        """
+        Initialize zone
+
+        Args:
+            frame: FrameBuffer the zone is part of
+            start: First pixel of the frame in the zone
+            length: Number of frame pixels in the zone
+            reverse: Count the zone's pixels from its far end (from the middle if mirrored)
+            mirror: Draw every pixel into both halves of the zone
+        """
+        if start < 0 or length < 1 or start + length > frame.num_pixels:
+            raise ValueError(f"Zone {start}-{start + length - 1} is outside the "
+                             f"{frame.num_pixels} pixel frame")
+        self.frame = frame
+        self.start = start
+        self.length = length
+        self.reverse = reverse
+        self.mirror = mirror
+        self.pixel_order = frame.pixel_order
+        self.bpp = frame.bpp
+        self.show_count = 0  # Calls to show()
+        if mirror:
+            self.num_pixels = (length + 1) // 2
+            if reverse:
+                self._base = start + length - self.num_pixels
+                self._twin = start + self.num_pixels - 1
+            else:
+                self._base = start
+                self._twin = start + length - 1
+            self._step = 1
+        else:
+            self.num_pixels = length
+            self._base = start + length - 1 if reverse else start
+            self._step = -1 if reverse else 1
+            self._twin = -1  # No mirror image
+
+    def __len__(self):
+        return self.num_pixels
+
+    def __setitem__(self, index, color):
+        if index < 0:
+            index += self.num_pixels
+        p = self._base + self._step * index
+        self.frame[p] = color
+        if self._twin >= 0 and self._twin - index != p:
+            self.frame[self._twin - index] = color
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.num_pixels
+        return self.frame[self._base + self._step * index]
+
+    def pack(self, color):
+        """Convert a color to wire-order bytes, as FrameBuffer.pack()"""
+        return self.frame.pack(color)
+
+    def prepare(self, run):
+        """Prepare a packed run for tile(), as FrameBuffer.prepare()"""
+        return self.frame.prepare(run)
+
+    def mark_dirty(self, start, stop):
+        """
+        Record that zone pixels in [start, stop) changed since the last show()
+
+        Args:
+            start: First changed pixel
+            stop: Pixel after the last changed one
+        """
+        if start < 0:
+            start = 0
+        if stop > self.num_pixels:
+            stop = self.num_pixels
+        if start >= stop:
+            return
+
+        base = self._base
+        if self._step > 0:
+            self.frame.mark_dirty(base + start, base + stop)
+        else:
+            self.frame.mark_dirty(base - stop + 1, base - start + 1)
+        twin = self._twin
+        if twin >= 0:
+            self.frame.mark_dirty(twin - stop + 1, twin - start + 1)
+
+    def invalidate(self):
+        """Mark the whole zone as changed"""
+        self.frame.mark_dirty(self.start, self.start + self.length)
+
+    def set_rgb(self, index, r, g, b):
+        """Set a single pixel from channel values, as FrameBuffer.set_rgb()"""
+        p = self._base + self._step * index
+        self.frame.set_rgb(p, r, g, b)
+        if self._twin >= 0 and self._twin - index != p:
+            self.frame.set_rgb(self._twin - index, r, g, b)
+
+    def set_rgbw(self, index, r, g, b, w):
+        """Set a single pixel of an RGBW strip, as FrameBuffer.set_rgbw()"""
+        p = self._base + self._step * index
+        self.frame.set_rgbw(p, r, g, b, w)
+        if self._twin >= 0 and self._twin - index != p:
+            self.frame.set_rgbw(self._twin - index, r, g, b, w)
+
+    def put(self, index, packed):
+        """Copy one pre-packed pixel into the zone, as FrameBuffer.put()"""
+        self.put_from(index, packed, 0)
+
+    def put_from(self, index, src, src_index):
+        """Copy one packed pixel out of a table or ring, as FrameBuffer.put_from()"""
+        p = self._base + self._step * index
+        self.frame.put_from(p, src, src_index)
+        if self._twin >= 0 and self._twin - index != p:
+            self.frame.put_from(self._twin - index, src, src_index)
+
+    def tile(self, run, phase=0, start=0, stop=None):
+        """
+        Repeat a packed run of pixels across a range of the zone, as FrameBuffer.tile()
+
+        Args:
+            run: Wire-order bytes holding one or more packed pixels, or a TileRun
+            phase: Number of pixels to rotate the run by
+            start: First zone pixel to write
+            stop: Zone pixel after the last one to write (default end of zone)
+        """
+        if stop is None:
+            stop = self.num_pixels
+        if stop <= start:
+            return
+
+        frame = self.frame
+        base = self._base
+        if self._step > 0:
+            frame.tile(run, phase, base + start, base + stop)
+        else:
+            period = len(run) // self.bpp
+            for i in range(start, stop):
+                frame.put_from(base - i, run, (i - start + phase) % period)
+
+        twin = self._twin
+        if twin >= 0:
+            buf = frame.buf
+            for i in range(start, stop):
+                if twin - i != base + i:
+                    frame.put_from(twin - i, buf, base + i)
+
+    def fill(self, color):
+        """
+        Set every pixel of the zone to one color
+
+        Args:
+            color: RGB tuple (r, g, b)
+        """
+        self.tile(self.pack(color))
+
+    def fill_range(self, start, stop, color):
+        """
+        Set a contiguous range of the zone's pixels to one color
+
+        Args:
+            start: First pixel
+            stop: Pixel after the last one
+            color: RGB tuple (r, g, b)
+        """
+        self.tile(self.pack(color), 0, max(0, start), min(stop, self.num_pixels))
+
+    def show(self):
+        """Count the show - the shared frame is sent by whatever plays the zones"""
+        self.show_count += 1
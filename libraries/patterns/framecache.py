@@ -0,0 +1,134 @@
+"""
+Frame cache for CircuitPython NeoPixel patterns
+Keeps the frames of deterministic effects so repeats are a single copy
+
+An effect that draws every pixel of every frame from the frame number
+alone (``slots`` > 0) has a fixed set of distinct frames: a theater
+chase has 3, stripes one per pixel of their period. The first time a
+frame is drawn it is copied into the effect's cache entry; every later
+time, in this loop of the pattern or the next, the frame is one copy out
+of the entry instead of a redraw, and the bytes are the same.
+
+Entries are allocated when an effect first draws, so nothing is rendered
+ahead of time. The total size of the entries is kept within a budget by
+dropping the least recently used ones; an effect too big for the budget
+is drawn as usual.
+"""
+
+class CacheEntry:
+    """The cached frames of one effect"""
+
+    def __init__(self, slots, size):
+        """
+        Initialize entry
+
+        Args:
+            slots: Number of distinct frames
+            size: Bytes per frame
+        """
+        self.data = bytearray(slots * size)
+        view = memoryview(self.data)
+        self.frames = [view[s * size:(s + 1) * size] for s in range(slots)]  # View of each frame
+        self.filled = bytearray(slots)  # 1 once a frame has been stored
+        self.nbytes = slots * size
+        self.used = 0  # Cache clock at the last draw, for LRU eviction
+
+class FrameCache:
+    """Byte-budgeted, least recently used cache of effect frames"""
+
+    def __init__(self, budget):
+        """
+        Initialize cache
+
+        Args:
+            budget: Most bytes of frames to keep
+        """
+        self.budget = budget
+        self.used_bytes = 0
+        self._entries = {}  # Effect -> CacheEntry, or None if it does not fit
+        self._clock = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Clear the hit and miss counters"""
+        self.hits = 0  # Frames copied out of the cache
+        self.misses = 0  # Frames drawn and stored
+        self.evictions = 0  # Entries dropped to make room
+
+    def _add(self, effect):
+        """Make an entry for an effect, evicting others to fit it"""
+        nbytes = effect.slots * len(effect.pixels.buf)
+        if nbytes > self.budget:
+            self._entries[effect] = None  # Never fits - draw it as usual
+            return None
+
+        entries = self._entries
+        while self.used_bytes + nbytes > self.budget:
+            oldest = None
+            for key in entries:
+                entry = entries[key]
+                if entry is not None and (oldest is None or entry.used < entries[oldest].used):
+                    oldest = key
+            self.used_bytes -= entries[oldest].nbytes
+            del entries[oldest]
+            self.evictions += 1
+
+        entry = CacheEntry(effect.slots, len(effect.pixels.buf))
+        entries[effect] = entry
+        self.used_bytes += nbytes
+        return entry
+
+    def draw(self, effect, k):
+        """
+        Draw frame k of an effect, copying it from the cache when it is there
+
+        Args:
+            effect: Effect with slots > 0, drawing into a FrameBuffer
+            k: Frame number
+        """
+        entries = self._entries
+        if effect in entries:
+            entry = entries[effect]
+            if entry is None:
+                effect.draw(k)
+                return
+        else:
+            entry = self._add(effect)
+            if entry is None:
+                effect.draw(k)
+                return
+
+        self._clock += 1
+        if self._clock >= 1 << 28:
+            self._rebase()
+        entry.used = self._clock
+        slot = effect.slot(k)
+        pixels = effect.pixels
+        if entry.filled[slot]:
+            cached = entry.frames[slot]
+            if pixels._view != cached:  # The same frame again is not resent
+                pixels._view[:] = cached
+                pixels.mark_dirty(0, pixels.num_pixels)
+            self.hits += 1
+        else:
+            effect.draw(k)
+            entry.frames[slot][:] = pixels.buf
+            entry.filled[slot] = 1
+            self.misses += 1
+
+    def _rebase(self):
+        """Wind the LRU clock back, keeping the entries' order, so it stays a small int"""
+        for entry in self._entries.values():
+            if entry is not None:
+                entry.used >>= 16
+        self._clock >>= 16
+
+    def clear(self):
+        """Drop every entry, e.g. to free memory"""
+        self._entries.clear()
+        self.used_bytes = 0
+
+    def report(self):
+        """One-line summary for the console"""
+        return (f"Frame cache: {self.hits} hits, {self.misses} misses, {self.evictions} evictions, "
+                f"{self.used_bytes} of {self.budget} bytes")
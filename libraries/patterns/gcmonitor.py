@@ -0,0 +1,107 @@
+"""
+Allocation monitor for CircuitPython NeoPixel patterns
+Measures heap allocation and garbage collections per rendered frame
+
+On the board the monitor reads gc.mem_free() before and after each frame.
+A drop is memory the frame allocated, and a rise means a collection ran
+while the frame was rendered. On a workstation, where gc.mem_free() does
+not exist, it compares tracemalloc's traced heap size before and after
+the frame instead, so only memory the frame left allocated counts. CPython
+frees its short-lived objects (such as integers above 256, which
+CircuitPython does not allocate at all) as soon as they are dropped, so
+they do not show up, and a frame that keeps something - a new run, a
+grown table - does. tracemalloc has to be started by the caller.
+
+The steady-state render path should allocate nothing, so any frame that
+allocates is worth a look.
+"""
+
+import gc
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None  # CircuitPython - gc.mem_free() is used instead
+
+class GCMonitor:
+    """Per-frame heap allocation and collection counters"""
+
+    def __init__(self, mem_free=None):
+        """
+        Initialize monitor
+
+        Args:
+            mem_free: Callable returning free heap bytes (default gc.mem_free
+                when it exists, otherwise tracemalloc is used)
+        """
+        if mem_free is None:
+            mem_free = getattr(gc, "mem_free", None)
+        self.mem_free = mem_free
+        self._before = 0
+        self.heap_peak = 0  # Highest traced heap use seen, temporaries included (tracemalloc only)
+        self.reset()
+
+    def reset(self):
+        """Clear the counters"""
+        self.frames = 0
+        self.alloc_frames = 0  # Frames that allocated anything
+        self.alloc_bytes = 0
+        self.worst_bytes = 0  # Most bytes allocated by a single frame
+        self.collections = 0  # Frames during which a collection ran
+
+    def begin(self):
+        """Call right before a frame is rendered"""
+        if self.mem_free is not None:
+            self._before = self.mem_free()
+        elif tracemalloc is not None:
+            self._before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+
+    def end(self):
+        """Call right after a frame is rendered"""
+        if self.mem_free is not None:
+            after = self.mem_free()
+            if after > self._before:
+                # The frame allocated enough to trigger a collection; how much
+                # it allocated is unknown
+                self.collections += 1
+                allocated = 0
+            else:
+                allocated = self._before - after
+        elif tracemalloc is not None:
+            current, peak = tracemalloc.get_traced_memory()
+            if peak > self.heap_peak:
+                self.heap_peak = peak
+            # Memory the frame still holds; what it freed again does not count
+            allocated = current - self._before
+        else:
+            allocated = 0
+
+        self.frames += 1
+        if allocated > 0:
+            self.alloc_frames += 1
+            self.alloc_bytes += allocated
+            if allocated > self.worst_bytes:
+                self.worst_bytes = allocated
+
+    def stats(self):
+        """
+        Counters since the last reset()
+
+        Returns:
+            dict with frames, alloc_frames, alloc_bytes, worst_bytes and collections
+        """
+        return {
+            "frames": self.frames,
+            "alloc_frames": self.alloc_frames,
+            "alloc_bytes": self.alloc_bytes,
+            "worst_bytes": self.worst_bytes,
+            "collections": self.collections,
+        }
+
+    def report(self):
+        """One-line summary for the console"""
+        per_frame = self.alloc_bytes / self.frames if self.frames else 0
+        return (f"GC: {self.frames} frames, {self.alloc_frames} allocating, "
+                f"{per_frame:.1f} bytes/frame, worst {self.worst_bytes} bytes, "
+                f"{self.collections} collections")
@@ -0,0 +1,220 @@
+"""
+Layer compositor for CircuitPython NeoPixel patterns
+Overlays effects on top of the current pattern without replacing it
+
+The pattern renders into the shared frame as usual. Each overlay layer
+(an alert flash, a sparkle, a status pixel) has a frame of its own and a
+blend mode:
+
+- "alpha" mixes the layer over the pattern by its opacity, wherever the
+  layer's pixel is lit (black is transparent)
+- "add" adds the layer's channels to the pattern's, clipped at 255
+- "max" keeps the brighter of the two in every channel
+
+The compositor sits between the shared frame and the strip's output. It
+copies the changed span of the pattern's frame into a preallocated
+buffer, blends each layer over it in one integer pass, and sends the
+result on. A layer only costs the span of pixels it has drawn since it
+was last cleared, so a status pixel costs a pixel, not a second frame.
+
+A layer can play any frame generator on its own frame through its own
+FrameScheduler. flush() then sends what the layers changed if the
+pattern did not render a frame at the same time.
+"""
+
+from .framebuffer import FrameBuffer
+from .scheduler import FrameScheduler
+
+BLEND_MODES = ("alpha", "add", "max")
+
+class Layer:
+    """An overlay with its own frame, blend mode and opacity"""
+
+    def __init__(self, compositor, mode="alpha", opacity=256):
+        """
+        Initialize layer
+
+        Args:
+            compositor: Compositor the layer belongs to
+            mode: "alpha", "add" or "max"
+            opacity: Weight of the layer from 0 (hidden) to 256 (full)
+        """
+        if mode not in BLEND_MODES:
+            raise ValueError(f"Unknown blend mode {mode!r}")
+        self.compositor = compositor
+        self.mode = mode
+        self.opacity = opacity
+        # Drawing into pixels and calling show() updates the layer
+        self.pixels = FrameBuffer(compositor.num_pixels, self, compositor.pixel_order)
+        self.pixels.dirty_start = compositor.num_pixels  # Transparent until drawn into
+        self.pixels.dirty_stop = 0
+        self.scheduler = FrameScheduler()  # Plays the layer's own frames
+        self.extent_start = compositor.num_pixels  # Span drawn since the last clear()
+        self.extent_stop = 0
+        self._off = self.pixels.prepare(self.pixels.pack((0, 0, 0)))
+
+    def write(self, frame):
+        """Take a shown layer frame, recording the pixels it covers"""
+        start = frame.dirty_start
+        stop = frame.dirty_stop
+        if start < self.extent_start:
+            self.extent_start = start
+        if stop > self.extent_stop:
+            self.extent_stop = stop
+        self.compositor.mark_dirty(start, stop)
+
+    def play(self, frames):
+        """
+        Play a frame generator on the layer, replacing any playing
+
+        Args:
+            frames: Generator yielding the delay before the next frame in milliseconds
+        """
+        self.scheduler.start(frames)
+
+    def clear(self):
+        """Stop the layer's frames and make it transparent"""
+        self.scheduler.stop()
+        if self.extent_start < self.extent_stop:
+            self.pixels.tile(self._off, 0, self.extent_start, self.extent_stop)
+            self.compositor.mark_dirty(self.extent_start, self.extent_stop)
+        self.pixels.dirty_start = self.pixels.num_pixels
+        self.pixels.dirty_stop = 0
+        self.extent_start = self.pixels.num_pixels
+        self.extent_stop = 0
+
+    def set_opacity(self, opacity):
+        """
+        Change the layer's weight
+
+        Args:
+            opacity: Weight from 0 (hidden) to 256 (full)
+        """
+        opacity = min(256, max(0, opacity))
+        if opacity != self.opacity:
+            self.opacity = opacity
+            self.compositor.mark_dirty(self.extent_start, self.extent_stop)
+
+class Compositor:
+    """Output stage that blends overlay layers over each frame"""
+
+    def __init__(self, output, num_pixels, pixel_order="GRB"):
+        """
+        Initialize compositor
+
+        Args:
+            output: Output the composited frames go to (e.g. CorrectedOutput)
+            num_pixels: Number of pixels in the strip
+            pixel_order: Wire byte order of the strip
+        """
+        self.num_pixels = num_pixels
+        self.pixel_order = pixel_order
+        self.mixed = FrameBuffer(num_pixels, output, pixel_order)
+        self.layers = []  # Bottom to top
+        self._base = None  # Frame written last, composited again when a layer changes
+        self.dirty_start = num_pixels  # Span changed by layers since the last composite
+        self.dirty_stop = 0
+
+    def layer(self, mode="alpha", opacity=256):
+        """
+        Add a layer on top of the others
+
+        Args:
+            mode: "alpha", "add" or "max"
+            opacity: Weight of the layer from 0 (hidden) to 256 (full)
+
+        Returns:
+            The new Layer
+        """
+        layer = Layer(self, mode, opacity)
+        self.layers.append(layer)
+        return layer
+
+    def mark_dirty(self, start, stop):
+        """Record that layers changed pixels in [start, stop)"""
+        if start < self.dirty_start:
+            self.dirty_start = start
+        if stop > self.dirty_stop:
+            self.dirty_stop = stop
+
+    def time_until_next(self):
+        """
+        Seconds until the next layer frame is due
+
+        Returns:
+            Seconds to wait (0 if a frame is due, None if no layer is playing)
+        """
+        wait = None
+        for layer in self.layers:
+            layer_wait = layer.scheduler.time_until_next()
+            if layer_wait is not None and (wait is None or layer_wait < wait):
+                wait = layer_wait
+        return wait
+
+    def flush(self):
+        """
+        Send the pixels layers changed since the last frame
+
+        Returns:
+            True if a frame was sent
+        """
+        if self._base is None or self.dirty_start >= self.dirty_stop:
+            return False
+        self._composite(self._base, self.dirty_start, self.dirty_stop)
+        return True
+
+    def write(self, frame):
+        """
+        Composite the changed span of a frame with the layers and send it on
+
+        Args:
+            frame: FrameBuffer to send
+        """
+        start = frame.dirty_start
+        stop = frame.dirty_stop
+        if frame is not self._base:
+            start = 0
+            stop = self.num_pixels
+            self._base = frame
+        if self.dirty_start < start:
+            start = self.dirty_start
+        if self.dirty_stop > stop:
+            stop = self.dirty_stop
+        self._composite(frame, start, stop)
+
+    def _composite(self, frame, start, stop):
+        """Blend the layers over frame pixels [start, stop) and send them"""
+        mixed = self.mixed
+        out = mixed.buf
+        bpp = mixed.bpp
+        mixed.span(start, stop)[:] = frame.span(start, stop)  # Kept views, no slicing
+
+        for layer in self.layers:
+            level = layer.opacity
+            first = max(start, layer.extent_start)
+            last = min(stop, layer.extent_stop)
+            if level <= 0 or first >= last:
+                continue
+
+            src = layer.pixels.buf
+            mode = layer.mode
+            if mode == "add":
+                for o in range(first * bpp, last * bpp):
+                    v = out[o] + ((src[o] * level) >> 8)
+                    out[o] = v if v < 255 else 255
+            elif mode == "max":
+                for o in range(first * bpp, last * bpp):
+                    v = (src[o] * level) >> 8
+                    if v > out[o]:
+                        out[o] = v
+            else:
+                inv = 256 - level
+                for o in range(first * bpp, last * bpp, bpp):
+                    if src[o] or src[o + 1] or src[o + 2] or (bpp == 4 and src[o + 3]):
+                        for c in range(o, o + bpp):
+                            out[c] = (out[c] * inv + src[c] * level) >> 8
+
+        self.dirty_start = self.num_pixels
+        self.dirty_stop = 0
+        mixed.mark_dirty(start, stop)
+        mixed.show()
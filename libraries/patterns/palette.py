@@ -0,0 +1,134 @@
+"""
+Color palettes for CircuitPython NeoPixel patterns
+Lazily built lookup tables for the color wheel and the quantized HSV hues
+
+Tables are packed in a strip's wire order, so rendering a rainbow frame is
+a copy out of a table instead of per-pixel color math.
+"""
+
+from .framebuffer import FrameBuffer
+
+_tables = {}  # (kind, pixel_order, level, length) -> packed bytes
+
+def hsv_to_rgb(h, s, v):
+    """
+    Convert HSV to RGB color
+
+    Args:
+        h: Hue (0-65535)
+        s: Saturation (0-255)
+        v: Value (0-255)
+
+    Returns:
+        RGB tuple (r, g, b)
+    """
+    # Convert hue from 16-bit to 8-bit
+    h = h >> 8
+
+    if s == 0:
+        return (v, v, v)
+
+    # Sector 0 to 5, and how far into it the hue is (0-252)
+    sector = h // 43
+    f = (h % 43) * 6
+
+    p = (v * (255 - s)) // 255
+    q = (v * (255 - ((s * f) // 256))) // 255
+    t = (v * (255 - ((s * (255 - f)) // 256))) // 255
+
+    if sector == 0:
+        return (v, t, p)
+    elif sector == 1:
+        return (q, v, p)
+    elif sector == 2:
+        return (p, v, t)
+    elif sector == 3:
+        return (p, q, v)
+    elif sector == 4:
+        return (t, p, v)
+    else:
+        return (v, p, q)
+
+def wheel(pos):
+    """
+    Input a value 0 to 255 to get a color value.
+    The colours are a transition r - g - b - back to r.
+    """
+    if pos < 85:
+        return (pos * 3, 255 - pos * 3, 0)
+    elif pos < 170:
+        pos -= 85
+        return (255 - pos * 3, 0, pos * 3)
+    else:
+        pos -= 170
+        return (0, pos * 3, 255 - pos * 3)
+
+def _scaled(color, level):
+    """Scale an RGB tuple by level/255"""
+    if level == 255:
+        return color
+    return ((color[0] * level) // 255, (color[1] * level) // 255, (color[2] * level) // 255)
+
+def wheel_table(pixel_order="GRB", level=255):
+    """
+    Get the 256 wheel() colors packed in wire order
+
+    Args:
+        pixel_order: Wire byte order of the strip
+        level: Brightness the colors are scaled to (0-255)
+
+    Returns:
+        bytes holding 256 packed pixels, entry k is wheel(k)
+    """
+    key = ("wheel", pixel_order, level, 256)
+    table = _tables.get(key)
+    if table is None:
+        frame = FrameBuffer(256, pixel_order=pixel_order)
+        for pos in range(256):
+            frame[pos] = _scaled(wheel(pos), level)
+        table = _tables[key] = bytes(frame.buf)
+    return table
+
+def hue_table(pixel_order="GRB", level=255):
+    """
+    Get the 256 quantized full-saturation hues packed in wire order
+
+    hsv_to_rgb() only looks at the top 8 bits of the hue, so these 256
+    entries cover every color it can produce at full saturation.
+
+    Args:
+        pixel_order: Wire byte order of the strip
+        level: Value (brightness) of the colors (0-255)
+
+    Returns:
+        bytes holding 256 packed pixels, entry k is hsv_to_rgb(k << 8, 255, level)
+    """
+    key = ("hue", pixel_order, level, 256)
+    table = _tables.get(key)
+    if table is None:
+        frame = FrameBuffer(256, pixel_order=pixel_order)
+        for hue in range(256):
+            frame[hue] = hsv_to_rgb(hue << 8, 255, level)
+        table = _tables[key] = bytes(frame.buf)
+    return table
+
+def strip_index(num_pixels):
+    """
+    Get the table entry each pixel starts at for one revolution along a strip
+
+    Args:
+        num_pixels: Number of pixels in the strip
+
+    Returns:
+        bytes where entry i is i * 256 // num_pixels, the table entry of
+        pixel i before it is turned
+    """
+    key = ("index", None, 0, num_pixels)
+    index = _tables.get(key)
+    if index is None:
+        index = _tables[key] = bytes(i * 256 // num_pixels for i in range(num_pixels))
+    return index
+
+def clear_cache():
+    """Drop all built tables, e.g. to free memory"""
+    _tables.clear()
@@ -0,0 +1,296 @@
+"""
+Playlist sequencer for CircuitPython NeoPixel patterns
+Plays patterns described as data instead of code
+
+A playlist is a list of steps, each naming an effect with its colors,
+timing and duration, in the same shape JSON gives:
+
+    {
+        "name": "fall",
+        "aliases": ["autumn"],
+        "pause": 50,
+        "colors": {"red": [255, 0, 0], "orange": [255, 35, 0]},
+        "steps": [
+            {"effect": "color_wipe", "colors": ["red"], "wait": 20},
+            {"effect": "twinkle", "colors": ["red", "orange"], "count": 200, "wait": 50}
+        ]
+    }
+
+Step fields:
+- effect: Effect name (see EFFECTS)
+- colors: Color names from the playlist's "colors" table or [r, g, b] lists
+- wait: Delay between frames in milliseconds
+- count: How long the effect runs - sets, cycles or frames depending on the effect
+- width: Stripe width for the striped effects
+- pause: Delay after the step, defaults to the playlist's "pause"
+
+"aliases" lists other names the pattern can be selected by from the feed.
+
+compile_playlist() checks a playlist once and turns it into a tuple of
+(effect index, arguments, pause) steps. A PlaylistPattern builds each
+step's effect once and lays the steps out on a timeline, so any time in
+the playlist maps straight to a step and a frame.
+"""
+
+import json
+from .base_pattern import BasePattern
+from .framebuffer import FrameBuffer
+from .builtin_playlists import BUILTIN_PLAYLISTS
+from . import effects
+
+# Effect name, effect class, step fields passed to it after the frame buffer
+# in order, and defaults. A step's effect index is its position in this table.
+EFFECTS = (
+    ("color_wipe", effects.ColorWipe, ("color", "wait"), {}),
+    ("fast_color_wipe", effects.FastColorWipe, ("color", "wait"), {"wait": 10}),
+    ("theater_chase", effects.TheaterChase, ("color", "wait", "count"), {"count": 5}),
+    ("rainbow_cycle", effects.RainbowCycle, ("count", "wait"), {"count": 1, "wait": 5}),
+    ("rainbow", effects.Rainbow, ("wait",), {}),
+    ("theater_chase_rainbow", effects.TheaterChaseRainbow, ("wait",), {}),
+    ("candy_cane", effects.CandyCane, ("count", "width", "wait"), {}),
+    ("random_white", effects.RandomWhite, ("count", "wait"), {}),
+    ("rainbow_stripe", effects.RainbowStripe, ("count", "width", "wait"), {}),
+    ("random_color", effects.RandomColor, ("count", "wait"), {}),
+    ("alternate_color", effects.AlternateColor, ("color", "color2", "wait"), {}),
+    ("random_position_fill", effects.RandomPositionFill, ("color", "wait"), {}),
+    ("middle_fill", effects.MiddleFill, ("color", "wait"), {}),
+    ("side_fill", effects.SideFill, ("color", "wait"), {}),
+    ("interleave_fill", effects.InterleaveFill, ("colors", "count", "wait"), {}),
+    ("twinkle", effects.Twinkle, ("colors", "count", "wait"), {}),
+)
+
+EFFECT_INDEX = {entry[0]: i for i, entry in enumerate(EFFECTS)}
+
+DEFAULT_PAUSE = 50
+
+class Playlist:
+    """Compiled playlist: a name, aliases and a tuple of (effect index, args, pause) steps"""
+
+    def __init__(self, name, steps, aliases=()):
+        self.name = name
+        self.steps = steps
+        self.aliases = aliases
+
+def _color(value, named, where):
+    """Resolve a color name or [r, g, b] list to an RGB tuple"""
+    if isinstance(value, str):
+        if value not in named:
+            raise ValueError(f"{where}: unknown color {value!r}")
+        value = named[value]
+    if len(value) != 3:
+        raise ValueError(f"{where}: color {value!r} is not [r, g, b]")
+    return tuple(int(c) for c in value)
+
+def compile_playlist(data):
+    """
+    Check a playlist description and compile it into a step table
+
+    Args:
+        data: dict with "name", "steps" and optional "aliases", "colors" and "pause"
+
+    Returns:
+        Playlist
+
+    Raises:
+        ValueError: If a step names an unknown effect or color, lacks a field,
+            or has a count or width below 1 or a negative pause
+    """
+    name = data.get("name", "playlist")
+    named = data.get("colors", {})
+    default_pause = int(data.get("pause", DEFAULT_PAUSE))
+    steps = []
+
+    for n, step in enumerate(data.get("steps", ())):
+        where = f"{name} step {n}"
+        effect = step.get("effect")
+        if effect not in EFFECT_INDEX:
+            raise ValueError(f"{where}: unknown effect {effect!r}")
+        index = EFFECT_INDEX[effect]
+        fields, defaults = EFFECTS[index][2], EFFECTS[index][3]
+
+        colors = [_color(c, named, where) for c in step.get("colors", ())]
+        values = {
+            "colors": tuple(colors),
+            "color": colors[0] if colors else None,
+            "color2": colors[1] if len(colors) > 1 else None,
+        }
+        for key in ("wait", "count", "width"):
+            if key in step:
+                values[key] = int(step[key])
+            elif key in defaults:
+                values[key] = defaults[key]
+        if values.get("count", 1) < 1 or values.get("width", 1) < 1:
+            raise ValueError(f"{where}: count and width must be at least 1")
+
+        args = []
+        for field in fields:
+            value = values.get(field)
+            if value is None or value == ():
+                raise ValueError(f"{where}: {effect} needs {field!r}")
+            args.append(value)
+
+        pause = int(step.get("pause", default_pause))
+        if pause < 0:
+            raise ValueError(f"{where}: pause must not be negative")
+        steps.append((index, tuple(args), pause))
+
+    if not steps:
+        raise ValueError(f"{name}: playlist has no steps")
+    return Playlist(name, tuple(steps), tuple(data.get("aliases", ())))
+
+def load_playlists(path):
+    """
+    Load and compile playlists from a JSON file
+
+    Args:
+        path: JSON file holding a list of playlists, or {"playlists": [...]}
+
+    Returns:
+        dict of playlist name to Playlist
+    """
+    with open(path) as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("playlists", [data])
+    return {playlist.name: playlist for playlist in (compile_playlist(d) for d in data)}
+
+def builtin_playlists():
+    """
+    Compile the built-in playlists
+
+    Returns:
+        dict of playlist name to Playlist
+    """
+    return {playlist.name: playlist for playlist in (compile_playlist(d) for d in BUILTIN_PLAYLISTS)}
+
+class PlaybackState:
+    """Where a pattern is in its playlist, allocated once and reset in place"""
+
+    __slots__ = ("step", "loops", "offset")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Go back to before the first step"""
+        self.step = -1  # Index of the step drawn last, -1 before the first frame
+        self.loops = 0  # Times the whole playlist has played
+        self.offset = 0  # Milliseconds into the step of the last frame drawn
+
+class PlaylistPattern(BasePattern):
+    """Pattern that plays a compiled playlist forever"""
+
+    def __init__(self, pixels, num_pixels, playlist, cache=None):
+        """
+        Initialize pattern
+
+        Args:
+            pixels: FrameBuffer shared by all patterns, or a NeoPixel object
+            num_pixels: Number of pixels in the strip
+            playlist: Compiled Playlist, or a playlist dict to compile
+            cache: Optional FrameCache for the steps with cacheable frames
+
+        Raises:
+            ValueError: If the playlist takes no time at all on this strip
+        """
+        super().__init__(pixels, num_pixels)
+        if not isinstance(playlist, Playlist):
+            playlist = compile_playlist(playlist)
+        self.playlist = playlist
+        # One effect per step, built once so starting a step allocates nothing
+        self._effects = tuple(EFFECTS[index][1](self.pixels, *args)
+                              for index, args, pause in playlist.steps)
+        if cache is not None and isinstance(self.pixels, FrameBuffer):
+            # Zones are not one contiguous buffer, so only whole frames are cached
+            for effect in self._effects:
+                if effect.slots:
+                    effect.cache = cache
+        ends = []
+        end = 0
+        for effect, step in zip(self._effects, playlist.steps):
+            end += effect.length + step[2]
+            ends.append(end)
+        if end < 1:
+            # Every step ends as it starts, so no time falls inside any of them
+            raise ValueError(f"{playlist.name}: playlist takes no time on {num_pixels} pixels")
+        self._ends = tuple(ends)  # When each step ends, in milliseconds from the start
+        self.period = end  # Milliseconds the whole playlist takes
+        self._off = self.pixels.prepare(self.pixels.pack((0, 0, 0)))
+        self.state = PlaybackState()
+
+    def frames(self):
+        """
+        Endless playlist sequence - yields the delay before each frame in milliseconds
+
+        Starting a new sequence resets the pattern's state in place.
+        """
+        self.state.reset()
+        return self.timeline_frames(self)
+
+    def render(self, t):
+        """
+        Draw the frame at a time in the playlist
+
+        Playing on from the last frame drawn only draws what changed. Any
+        other time is a seek: the steps before it are drawn as they end
+        first, so wipes and fills start from what the strip would show.
+
+        Args:
+            t: Milliseconds since the playlist started
+
+        Returns:
+            Milliseconds since the start when the next frame is due
+        """
+        loops = t // self.period
+        t -= loops * self.period
+        ends = self._ends
+        step = 0
+        while t >= ends[step]:
+            step += 1
+        begin = ends[step - 1] if step else 0
+        offset = t - begin
+        effect = self._effects[step]
+        state = self.state
+
+        if step != state.step or offset < state.offset:
+            if state.step >= 0 and step == (state.step + 1) % len(ends):
+                # Playing on - finish the last step in case its end was skipped
+                if not effect.full:
+                    last = self._effects[state.step]
+                    last.render(last.length)
+                if step == 0:
+                    state.loops += 1
+            else:
+                if not effect.full:
+                    self._draw_start(loops * len(ends) + step)
+                state.loops = loops
+            effect.reset()
+            state.step = step
+        state.offset = offset
+
+        next_due = effect.render(offset)
+        if next_due is None or next_due >= effect.length:
+            next_due = ends[step] - begin  # Hold the last frame through the pause
+        return loops * self.period + begin + next_due
+
+    def _draw_start(self, position):
+        """
+        Draw the strip as it looks when a step starts
+
+        Args:
+            position: Steps played before this one since the playlist started
+        """
+        count = len(self._effects)
+        # Go back to the latest step whose last frame covers the whole strip
+        first = position
+        while first > 0 and position - first < count:
+            first -= 1
+            if self._effects[first % count].fills:
+                break
+        else:
+            self.pixels.tile(self._off)  # Nothing earlier covers it - start from black
+
+        for p in range(first, position):
+            effect = self._effects[p % count]
+            effect.reset()
+            effect.render(effect.length)
@@ -0,0 +1,99 @@
+"""
+Pattern registry for CircuitPython NeoPixel control
+Maps pattern names, aliases and numeric IDs to pattern objects
+
+Every key a feed value can take is put in one dictionary when a pattern
+is registered, so resolving a value is a single lookup however many
+patterns there are. A pattern's ID is its registration order.
+
+Names and IDs must be unique. Aliases give way: a pattern named like an
+earlier pattern's alias takes the alias over, and an alias that is
+already taken is left out. Either way the alias is listed in shadowed,
+so the caller can warn about it.
+"""
+
+OFF = -1  # ID of the "off" state
+
+class PatternRegistry:
+    """Index of registered patterns by name, alias and ID"""
+
+    def __init__(self):
+        self.patterns = []  # Pattern objects by ID
+        self.names = []  # Pattern names by ID
+        self._ids = {"off": OFF}  # Lower-case name, alias or ID string -> ID
+        self._aliases = {}  # The keys of _ids that are aliases, which a name can take over
+        self.shadowed = []  # (alias, pattern name) of aliases left out or taken over
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def __getitem__(self, pattern_id):
+        """Pattern object for an ID"""
+        return self.patterns[pattern_id]
+
+    def register(self, name, pattern, aliases=()):
+        """
+        Add a pattern
+
+        Args:
+            name: Pattern name, also sent as status to Adafruit.IO
+            pattern: Pattern object (anything with frames())
+            aliases: Other names the pattern can be selected by
+
+        Returns:
+            The new pattern's ID
+
+        Raises:
+            ValueError: If the name is already taken
+        """
+        pattern_id = len(self.patterns)
+        keys = (str(name).lower().strip(), str(pattern_id))
+        for key in keys:
+            if key in self._ids and key not in self._aliases:
+                raise ValueError(f"Pattern name {key!r} is already registered")
+
+        self.patterns.append(pattern)
+        self.names.append(name)
+        for key in keys:
+            if key in self._aliases:
+                self.shadowed.append((key, self.names[self._aliases.pop(key)]))
+            self._ids[key] = pattern_id
+        for alias in aliases:
+            key = str(alias).lower().strip()
+            if key in self._ids:
+                if self._ids[key] != pattern_id:
+                    self.shadowed.append((key, name))
+                continue
+            self._ids[key] = pattern_id
+            self._aliases[key] = pattern_id
+        return pattern_id
+
+    def resolve(self, value):
+        """
+        Convert a feed value to a pattern ID
+
+        Args:
+            value: Pattern name, alias, "off" or pattern number
+
+        Returns:
+            Pattern ID, OFF for "off", or None if the value is not recognized
+        """
+        key = str(value).lower().strip()
+        pattern_id = self._ids.get(key)
+        if pattern_id is not None:
+            return pattern_id
+
+        # Numbers written some other way, e.g. "03"
+        try:
+            pattern_id = int(key)
+        except ValueError:
+            return None
+        if 0 <= pattern_id < len(self.patterns):
+            return pattern_id
+        return None
+
+    def name(self, pattern_id):
+        """Name of a pattern ID, "off" for OFF"""
+        if pattern_id == OFF:
+            return "off"
+        return self.names[pattern_id]
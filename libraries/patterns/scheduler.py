@@ -0,0 +1,160 @@
+"""
+Frame scheduler for CircuitPython NeoPixel patterns
+Drives a pattern's frame generator against absolute millisecond deadlines
+
+Each frame's deadline is the previous deadline plus the wait the effect
+asked for, not the time the previous frame finished plus the wait. Time
+spent rendering and sending a frame therefore comes out of the wait
+instead of stretching it, so a pattern plays at the same speed on a short
+strip and a long one.
+
+Patterns draw each frame for the time it is rendered at, so when
+rendering falls behind, the next frame simply shows the animation further
+along and the frames in between are skipped. A generator that does not
+catch up by itself is restarted from the current time once it is more
+than max_late behind.
+"""
+
+from . import backend
+
+LATE_TOLERANCE = 2  # Milliseconds after its deadline a frame counts as late
+
+class FrameScheduler:
+    """Advances a frame generator one frame at a time when its deadline passes"""
+
+    def __init__(self, monitor=None, max_late=250):
+        """
+        Initialize scheduler
+
+        Args:
+            monitor: Optional GCMonitor told about every rendered frame
+            max_late: Milliseconds behind schedule before the backlog is dropped
+        """
+        self.frames = None
+        self.deadline = 0  # Tick value of the next frame
+        self.monitor = monitor
+        self.max_late = max_late
+        self._last_wait = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Clear the timing counters"""
+        self.rendered = 0  # Frames rendered
+        self.late_frames = 0  # Frames rendered more than LATE_TOLERANCE ms after their deadline
+        self.skipped = 0  # Frames at least one frame interval late, so the pattern jumped ahead
+        self.resyncs = 0  # Times the backlog was dropped
+        self.lateness_total = 0  # Sum of milliseconds each frame was late
+        self.lateness_max = 0
+
+    @property
+    def active(self):
+        """True while a frame generator is loaded"""
+        return self.frames is not None
+
+    def start(self, frames, delay=0):
+        """
+        Load a new frame generator, replacing (and closing) the current one
+
+        Args:
+            frames: Generator yielding the delay before the next frame in milliseconds
+            delay: Milliseconds from now until the first frame
+        """
+        if frames is not self.frames:
+            self._close()
+        self.frames = frames
+        self.deadline = backend.ticks_add(backend.clock.ticks_ms(), delay)
+        self._last_wait = 0
+
+    def stop(self):
+        """Drop the current frame generator, closing it"""
+        self._close()
+        self.frames = None
+
+    def _close(self):
+        """
+        Close the current generator so its finally blocks run now (CircuitPython
+        does not close generators when it collects them), e.g. to release a file
+        """
+        close = getattr(self.frames, "close", None)
+        if close is not None:
+            close()
+
+    def time_until_next(self):
+        """
+        Seconds until the next frame is due
+
+        Returns:
+            Seconds to wait (0 if a frame is due, None if idle)
+        """
+        if self.frames is None:
+            return None
+        wait = backend.ticks_diff(self.deadline, backend.clock.ticks_ms())
+        return wait / 1000.0 if wait > 0 else 0
+
+    def poll(self):
+        """
+        Render the next frame if it is due
+
+        Returns:
+            True if a frame was rendered
+        """
+        if self.frames is None:
+            return False
+
+        now = backend.clock.ticks_ms()
+        late = backend.ticks_diff(now, self.deadline)
+        if late < 0:
+            return False
+
+        monitor = self.monitor
+        if monitor is not None:
+            monitor.begin()
+        try:
+            wait = next(self.frames)
+        except StopIteration:
+            self.frames = None
+            return False
+        finally:
+            if monitor is not None:
+                monitor.end()
+
+        self.deadline = backend.ticks_add(self.deadline, wait)
+        if backend.ticks_diff(now, self.deadline) > self.max_late:
+            # Too far behind to catch up - carry on from now
+            self.deadline = backend.ticks_add(now, wait)
+            self.resyncs += 1
+
+        self.rendered += 1
+        if self._last_wait > 0 and late >= self._last_wait:
+            self.skipped += 1
+        self._last_wait = wait
+        if late > LATE_TOLERANCE:
+            self.late_frames += 1
+        self.lateness_total += late
+        if late > self.lateness_max:
+            self.lateness_max = late
+        return True
+
+    def stats(self):
+        """
+        Timing counters since the last reset_stats()
+
+        Returns:
+            dict with rendered, late_frames, skipped, resyncs, mean_lateness_ms
+            and max_lateness_ms
+        """
+        return {
+            "rendered": self.rendered,
+            "late_frames": self.late_frames,
+            "skipped": self.skipped,
+            "resyncs": self.resyncs,
+            "mean_lateness_ms": self.lateness_total / self.rendered if self.rendered else 0,
+            "max_lateness_ms": self.lateness_max,
+        }
+
+    def report(self):
+        """One-line summary for the console"""
+        stats = self.stats()
+        return (f"Frames: {stats['rendered']} rendered, {stats['late_frames']} late, "
+                f"{stats['skipped']} skipped, {stats['resyncs']} resyncs, "
+                f"jitter {stats['mean_lateness_ms']:.1f} ms mean / {stats['max_lateness_ms']} ms max")
@@ -0,0 +1,120 @@
+"""
+Seesaw NeoPixel output for CircuitPython NeoPixel patterns
+Sends a FrameBuffer to a seesaw NeoPixel driver (e.g. the NeoDriver at
+I2C address 0x60) with as few, as full I2C transfers as possible
+
+Each frame is written straight from the framebuffer into the seesaw's pixel
+buffer in the largest chunks one transfer allows, all under a single bus
+lock, followed by one show (latch) command. Only the chunks holding the
+dirty span of the frame are sent.
+
+The frame is cut into transfer-sized chunks on a fixed grid, and the view
+of each chunk is made once, so sending a frame allocates nothing.
+"""
+
+from . import backend
+
+# Seesaw NeoPixel module registers
+_NEOPIXEL_BASE = 0x0E
+_NEOPIXEL_PIN = 0x01
+_NEOPIXEL_SPEED = 0x02
+_NEOPIXEL_BUF_LENGTH = 0x03
+_NEOPIXEL_BUF = 0x04
+_NEOPIXEL_SHOW = 0x05
+
+# The seesaw firmware receives at most 32 bytes per I2C transfer
+MAX_TRANSFER = 32
+_HEADER = 4  # Module base, register, 16-bit buffer offset
+
+class SeesawOutput:
+    """Chunked, single-latch frame transfer to a seesaw NeoPixel pin"""
+
+    def __init__(self, seesaw, pin, num_bytes, max_transfer=MAX_TRANSFER):
+        """
+        Initialize output and configure the seesaw NeoPixel module
+
+        Args:
+            seesaw: adafruit_seesaw Seesaw object (or anything with an i2c_device)
+            pin: Seesaw pin the strip is connected to
+            num_bytes: Frame size in bytes (num_pixels * bytes per pixel)
+            max_transfer: Largest I2C write the seesaw accepts, in bytes
+        """
+        self.i2c_device = seesaw.i2c_device
+        self.num_bytes = num_bytes
+        self._chunk = max_transfer - _HEADER
+        self._tx = bytearray(max_transfer)
+        self._tx[0] = _NEOPIXEL_BASE
+        self._tx[1] = _NEOPIXEL_BUF
+        self._tx_view = memoryview(self._tx)
+        self._show = bytes((_NEOPIXEL_BASE, _NEOPIXEL_SHOW))
+        self._frame = None  # Frame the chunk views below were made for
+        self._chunks = []  # (byte offset, memoryview) of each chunk of the frame
+
+        with self.i2c_device as i2c:
+            i2c.write(bytes((_NEOPIXEL_BASE, _NEOPIXEL_PIN, pin)))
+            i2c.write(bytes((_NEOPIXEL_BASE, _NEOPIXEL_SPEED, 1)))  # 800 KHz
+            i2c.write(bytes((_NEOPIXEL_BASE, _NEOPIXEL_BUF_LENGTH, num_bytes >> 8, num_bytes & 0xFF)))
+
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Restart the transfer counters"""
+        self.bytes_sent = 0  # Bytes on the bus, headers included
+        self.frames_sent = 0
+        self.transfers = 0
+        self._stats_start = backend.clock.monotonic()
+
+    def rates(self):
+        """
+        Throughput since the last reset_stats()
+
+        Returns:
+            Tuple of (bytes per second, frames per second)
+        """
+        elapsed = backend.clock.monotonic() - self._stats_start
+        if elapsed <= 0:
+            return (0.0, 0.0)
+        return (self.bytes_sent / elapsed, self.frames_sent / elapsed)
+
+    def _split(self, frame):
+        """Make the chunk views of a frame's buffer"""
+        src = frame._view
+        size = min(len(src), self.num_bytes)
+        chunk = self._chunk
+        self._chunks = [(offset, src[offset:min(offset + chunk, size)])
+                        for offset in range(0, size, chunk)]
+        self._frame = frame
+
+    def write(self, frame):
+        """
+        Transmit the chunks holding the dirty span of a frame and latch it
+
+        Args:
+            frame: FrameBuffer to send
+        """
+        if frame is not self._frame:
+            self._split(frame)
+
+        chunks = self._chunks
+        chunk = self._chunk
+        first = frame.dirty_start * frame.bpp // chunk
+        last = min((frame.dirty_stop * frame.bpp + chunk - 1) // chunk, len(chunks))
+        tx = self._tx
+        tx_view = self._tx_view
+
+        with self.i2c_device as i2c:
+            for k in range(first, last):
+                offset, data = chunks[k]
+                count = len(data)
+                tx[2] = offset >> 8
+                tx[3] = offset & 0xFF
+                tx_view[_HEADER:_HEADER + count] = data
+                i2c.write(tx, end=_HEADER + count)
+                self.bytes_sent += _HEADER + count
+                self.transfers += 1
+
+            i2c.write(self._show)
+
+        self.bytes_sent += 2
+        self.transfers += 1
+        self.frames_sent += 1
@@ -0,0 +1,121 @@
+"""
+Segmented output for CircuitPython NeoPixel patterns
+Spreads one logical strip over several physical strips
+
+The patterns render once into a single frame covering every strip end to
+end. Each segment is a run of that frame's pixels sent to its own output
+(a seesaw pin, a seesaw at another I2C address, or a native pin), so
+adding strips adds transfer time but no pattern work.
+
+A segment hands its output a window onto the frame's buffer rather than a
+copy, with the frame's dirty span clipped to the segment, so the outputs
+send exactly the bytes they would for a frame of their own. Segments the
+dirty span does not reach are not sent at all. All segments share the
+frame's wire order.
+"""
+
+class Segment:
+    """A run of the logical frame's pixels, sent to one output"""
+
+    def __init__(self, output, start, num_pixels):
+        """
+        Initialize segment
+
+        Args:
+            output: Object with a write(frame) method for this strip
+            start: First pixel of the logical frame on this strip
+            num_pixels: Number of pixels on this strip
+        """
+        self.output = output
+        self.start = start
+        self.num_pixels = num_pixels
+        self.frame = None  # Logical frame the window below was made for
+        self.buf = None
+        self._view = None
+        self.bpp = 0
+        self.pixel_order = None
+        self.dirty_start = 0
+        self.dirty_stop = 0
+
+    def __len__(self):
+        return self.num_pixels
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.num_pixels
+        return self.frame[self.start + index]
+
+    def bind(self, frame):
+        """
+        Make the window onto a frame's buffer
+
+        Args:
+            frame: Logical FrameBuffer the segment is part of
+        """
+        if self.start < 0 or self.start + self.num_pixels > frame.num_pixels:
+            raise ValueError(f"Segment {self.start}-{self.start + self.num_pixels - 1} "
+                             f"is outside the {frame.num_pixels} pixel frame")
+        bpp = frame.bpp
+        self.frame = frame
+        self.bpp = bpp
+        self.pixel_order = frame.pixel_order
+        self.buf = frame._view[self.start * bpp:(self.start + self.num_pixels) * bpp]
+        self._view = self.buf
+
+class SegmentedOutput:
+    """Output that sends each segment of a frame to its own strip"""
+
+    def __init__(self, segments):
+        """
+        Initialize output
+
+        Args:
+            segments: Sequence of Segment objects
+        """
+        self.segments = tuple(segments)
+        self.num_pixels = 0  # Pixels up to the end of the last segment
+        for segment in self.segments:
+            if segment.start + segment.num_pixels > self.num_pixels:
+                self.num_pixels = segment.start + segment.num_pixels
+
+    def write(self, frame):
+        """
+        Send the segments holding the dirty span of a frame, in order
+
+        Args:
+            frame: FrameBuffer to send
+        """
+        dirty_start = frame.dirty_start
+        dirty_stop = frame.dirty_stop
+        for segment in self.segments:
+            if segment.frame is not frame:
+                segment.bind(frame)
+            start = dirty_start - segment.start
+            stop = dirty_stop - segment.start
+            if start < 0:
+                start = 0
+            if stop > segment.num_pixels:
+                stop = segment.num_pixels
+            if start >= stop:
+                continue
+
+            segment.dirty_start = start
+            segment.dirty_stop = stop
+            segment.output.write(segment)
+
+def chain(outputs):
+    """
+    Lay strips end to end as segments of one logical strip
+
+    Args:
+        outputs: Sequence of (output, num_pixels) in strip order
+
+    Returns:
+        SegmentedOutput covering all the strips
+    """
+    segments = []
+    start = 0
+    for output, num_pixels in outputs:
+        segments.append(Segment(output, start, num_pixels))
+        start += num_pixels
+    return SegmentedOutput(segments)
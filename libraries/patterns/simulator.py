@@ -0,0 +1,218 @@
+"""
+Host-side simulator for CircuitPython NeoPixel patterns
+Runs patterns against a simulated strip, a virtual clock and fake console
+input, so they can be profiled and regression-tested without a board
+
+Time only moves when the simulator jumps the virtual clock to the next
+frame deadline (and, if asked to, while frames are sent to the strip), so
+patterns play much faster than real time.
+"""
+
+from . import backend
+from .framebuffer import FrameBuffer
+from .scheduler import FrameScheduler
+
+class VirtualClock:
+    """Clock whose time only advances when told to"""
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def monotonic(self):
+        """Current virtual time in seconds"""
+        return self.now
+
+    def ticks_ms(self):
+        """Current virtual time as a wrapping millisecond tick counter"""
+        return int(round(self.now * 1000)) & backend.TICKS_MAX
+
+    def sleep(self, seconds):
+        """Advance virtual time instead of blocking"""
+        if seconds > 0:
+            self.now += seconds
+
+class SimulatedInput:
+    """Console input that reports bytes once a break time is reached"""
+
+    def __init__(self, clock, break_time=None):
+        """
+        Initialize input
+
+        Args:
+            clock: VirtualClock the break time is measured against
+            break_time: Virtual time at which a key press arrives, or None for never
+        """
+        self.clock = clock
+        self.break_time = break_time
+
+    @property
+    def serial_bytes_available(self):
+        if self.break_time is None or self.clock.now < self.break_time:
+            return 0
+        return 1
+
+class SimulatedStrip:
+    """Output that counts and records the frames sent to it"""
+
+    def __init__(self, clock, record=True, byte_time=None):
+        """
+        Initialize strip
+
+        Args:
+            clock: Clock used to timestamp frames
+            record: Keep a copy of every frame (turn off for long runs)
+            byte_time: Virtual seconds sending one byte takes, or None for free;
+                the clock advances by this much per byte of every frame sent
+        """
+        self.clock = clock
+        self.record = record
+        self.byte_time = byte_time
+        self.show_count = 0
+        self.frames = []  # (timestamp, wire-order bytes)
+
+    def write(self, frame):
+        """Record a frame"""
+        self.show_count += 1
+        if self.record:
+            self.frames.append((self.clock.monotonic(), bytes(frame.buf)))
+        if self.byte_time is not None:
+            self.clock.sleep(len(frame.buf) * self.byte_time)
+
+class Simulator:
+    """Drives a frame generator on a simulated strip in virtual time"""
+
+    def __init__(self, num_pixels=90, pixel_order="GRB", record=True, break_time=None, timer=None,
+                 monitor=None, byte_time=None):
+        """
+        Initialize simulator
+
+        Args:
+            num_pixels: Number of pixels in the simulated strip
+            pixel_order: Wire byte order of the simulated strip
+            record: Keep a copy of every frame shown
+            break_time: Virtual time at which simulated console input arrives
+            timer: Optional real-time counter in seconds (e.g. time.perf_counter)
+                used to measure how long each frame takes to render
+            monitor: Optional GCMonitor measuring allocation per frame
+            byte_time: Virtual seconds sending one byte to the strip takes, to
+                see how patterns keep time on a slow bus (default free)
+        """
+        self.clock = VirtualClock()
+        self.input = SimulatedInput(self.clock, break_time)
+        self.strip = SimulatedStrip(self.clock, record, byte_time)
+        self.frame = FrameBuffer(num_pixels, self.strip, pixel_order)
+        self.scheduler = FrameScheduler(monitor)
+        self.steps = 0
+        self.timer = timer
+        self.busy_time = 0.0  # Real seconds spent rendering, when timed
+        self.worst_step = 0.0  # Longest single frame render, when timed
+
+    def run(self, frames, seconds, max_steps=None):
+        """
+        Play a frame generator for a span of virtual time
+
+        Stops early when the generator finishes, simulated console input
+        arrives, or max_steps frames have been rendered.
+
+        Args:
+            frames: Generator yielding the delay before the next frame in milliseconds
+            seconds: Virtual seconds to run for
+            max_steps: Optional cap on rendered frames, guards against zero-delay loops
+
+        Returns:
+            List of recorded (timestamp, wire-order bytes) frames
+        """
+        saved = (backend.clock, backend.serial)
+        backend.install(self.clock, self.input)
+        try:
+            end = self.clock.now + seconds
+            self.scheduler.start(frames)
+
+            while self.clock.now < end:
+                if self.input.serial_bytes_available:
+                    break
+                if self.timer is not None:
+                    started = self.timer()
+                    rendered = self.scheduler.poll()
+                    elapsed = self.timer() - started
+                    if rendered:
+                        self.busy_time += elapsed
+                        self.worst_step = max(self.worst_step, elapsed)
+                else:
+                    rendered = self.scheduler.poll()
+
+                if rendered:
+                    self.steps += 1
+                    if max_steps is not None and self.steps >= max_steps:
+                        break
+
+                wait = self.scheduler.time_until_next()
+                if wait is None:
+                    break
+                self.clock.sleep(min(wait, end - self.clock.now))
+        finally:
+            backend.install(*saved)
+
+        return self.strip.frames
+
+class MockSeesaw:
+    """
+    Stand-in for a seesaw NeoPixel driver and its I2C bus
+
+    Acts as both the Seesaw object and its i2c_device, so it can be handed
+    to SeesawOutput directly. It decodes NeoPixel register writes into a
+    local pixel buffer and records a copy of that buffer at each show.
+    """
+
+    def __init__(self, max_transfer=32, record=True):
+        """
+        Initialize mock
+
+        Args:
+            max_transfer: Largest write accepted, longer writes raise ValueError
+            record: Keep a copy of the pixel buffer at every show
+        """
+        self.i2c_device = self
+        self.max_transfer = max_transfer
+        self.record = record
+        self.pin = None
+        self.speed = None
+        self.pixels = bytearray()
+        self.locks = 0  # Times the bus was locked
+        self.writes = 0  # I2C write transactions
+        self.bytes_written = 0
+        self.latches = []  # Pixel buffer copies at each show
+
+    def __enter__(self):
+        self.locks += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def write(self, buf, start=0, end=None):
+        """Decode one I2C write to the seesaw NeoPixel module"""
+        data = bytes(buf[start:end])
+        if len(data) > self.max_transfer:
+            raise ValueError(f"{len(data)} byte write exceeds {self.max_transfer} byte limit")
+
+        self.writes += 1
+        self.bytes_written += len(data)
+        base, reg = data[0], data[1]
+        if base != 0x0E:
+            return
+
+        if reg == 0x01:
+            self.pin = data[2]
+        elif reg == 0x02:
+            self.speed = data[2]
+        elif reg == 0x03:
+            self.pixels = bytearray((data[2] << 8) | data[3])
+        elif reg == 0x04:
+            offset = (data[2] << 8) | data[3]
+            payload = data[4:]
+            if offset + len(payload) > len(self.pixels):
+                raise ValueError("Write past end of seesaw pixel buffer")
+            self.pixels[offset:offset + len(payload)] = payload
+        elif reg == 0x05:
+            self.latches.append(bytes(self.pixels) if self.record else None)
@@ -0,0 +1,128 @@
+"""
+Pattern transitions for CircuitPython NeoPixel patterns
+Cross-fades the strip from the outgoing frame into the incoming pattern
+
+When a fade starts, the frame on the strip is copied aside and the shared
+frame buffer's output is detached, so the incoming pattern renders as
+usual without being sent. Each fade frame mixes the two buffers byte by
+byte with 8-bit fixed-point weights into a second buffer, which is what
+goes to the strip. Once the fade is over the output is handed back and
+the pattern carries on by itself.
+
+The fade is a frame generator like any pattern, so it runs in the normal
+frame loop and never sleeps.
+"""
+
+from . import backend
+from .framebuffer import FrameBuffer
+
+class Crossfade:
+    """Cross-fade between the frame on the strip and a pattern's frames"""
+
+    def __init__(self, frame, duration=500, interval=20):
+        """
+        Initialize cross-fade
+
+        Args:
+            frame: FrameBuffer the patterns render into, with its output attached
+            duration: Fade length in milliseconds (0 switches straight away)
+            interval: Milliseconds between fade frames
+        """
+        self.frame = frame
+        self.output = frame.output
+        self.duration = duration
+        self.interval = max(1, interval)
+        self.mixed = FrameBuffer(frame.num_pixels, frame.output, frame.pixel_order)
+        self.source = bytearray(len(frame.buf))  # The frame faded out of
+        self._source_view = memoryview(self.source)
+        self._off = frame.prepare(frame.pack((0, 0, 0)))
+        self.active = False  # True while the frame's output is detached
+        self._fades = 0  # Fades started, so an abandoned fade cannot end a newer one
+
+    def cancel(self):
+        """End a fade in progress and give the output back to the frame"""
+        if self.active:
+            self.active = False
+            self.frame.output = self.output
+            self.frame.invalidate()
+
+    def blend(self, level):
+        """
+        Send the source and the frame mixed together
+
+        Args:
+            level: Weight of the frame from 0 (all source) to 256 (all frame)
+        """
+        src = self.source
+        dst = self.frame.buf
+        out = self.mixed.buf
+        inv = 256 - level
+        for i in range(len(out)):
+            out[i] = (src[i] * inv + dst[i] * level) >> 8
+        self.mixed.invalidate()
+        self.mixed.show()
+
+    def frames(self, frames=None):
+        """
+        Start a fade from what the strip shows now
+
+        Args:
+            frames: Frame generator of the incoming pattern, or None to fade to black
+
+        Returns:
+            Generator yielding the delay before each frame in milliseconds,
+            which plays the rest of the pattern after the fade
+        """
+        frame = self.frame
+        # Fading again mid-fade starts from the mix on the strip
+        self._source_view[:] = self.mixed.buf if self.active else frame.buf
+        self._fades += 1
+        if self.duration > 0:
+            self.active = True
+            frame.output = None
+        if frames is None:
+            frame.tile(self._off)
+        return self._play(frames, self._fades)
+
+    def _play(self, frames, fade):
+        """Generator behind frames()"""
+        frame = self.frame
+        duration = self.duration
+        start = backend.clock.ticks_ms()
+        due = 0  # When this fade frame was due, in milliseconds since start
+        pattern_due = 0  # When the pattern's next frame is due
+        try:
+            while due < duration:
+                t = backend.ticks_diff(backend.clock.ticks_ms(), start)
+                if t < due:
+                    t = due
+                if frames is not None and t >= pattern_due:
+                    try:
+                        pattern_due += next(frames)
+                    except StopIteration:
+                        frames = None
+                if t >= duration:
+                    break
+
+                self.blend(t * 256 // duration)
+                next_due = (t // self.interval + 1) * self.interval
+                if frames is not None and pattern_due < next_due:
+                    next_due = pattern_due
+                if next_due > duration:
+                    next_due = duration
+                yield next_due - due
+                due = next_due
+        except GeneratorExit:
+            if frames is not None:
+                frames.close()  # Closed mid-fade - close the pattern too
+            raise
+        finally:
+            if self._fades == fade:
+                self.cancel()
+
+        frame.show()  # The whole incoming frame
+        if frames is None:
+            return
+        if pattern_due > due:
+            yield pattern_due - due
+        yield from frames
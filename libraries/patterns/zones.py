@@ -0,0 +1,77 @@
+"""
+Zoned patterns for CircuitPython NeoPixel patterns
+Plays several patterns side by side, each in its own zone of one strip
+
+Each part is an ordinary pattern created on a Zone of the shared frame.
+The parts keep their own timing: every frame of the zoned pattern
+advances the parts that are due, then shows the shared frame once, so a
+strip split four ways still sends one frame per update rather than four.
+"""
+
+from . import backend
+from .base_pattern import BasePattern
+
+REBASE = 1 << 20  # Milliseconds after which the clock is wound forward
+
+class ZonedPattern(BasePattern):
+    """Several patterns playing at once in zones of one frame"""
+
+    def __init__(self, pixels, num_pixels, parts):
+        """
+        Initialize zoned pattern
+
+        Args:
+            pixels: FrameBuffer the zones are part of
+            num_pixels: Number of pixels in the strip
+            parts: Patterns created on Zones of pixels
+        """
+        super().__init__(pixels, num_pixels)
+        self.parts = tuple(parts)
+        self._due = [0] * len(self.parts)  # When each part's next frame is due
+
+    def frames(self):
+        """
+        Endless frame generator playing every part - yields the delay before
+        each frame in milliseconds
+        """
+        return self._play([part.frames() for part in self.parts])
+
+    def _play(self, frames):
+        """Generator behind frames()"""
+        due_at = self._due
+        count = len(frames)
+        for k in range(count):
+            due_at[k] = 0
+        start = backend.clock.ticks_ms()
+        due = 0  # When this frame was due, in milliseconds since start
+        while True:
+            t = backend.ticks_diff(backend.clock.ticks_ms(), start)
+            if t < due:
+                t = due
+
+            next_due = -1
+            for k in range(count):
+                part = frames[k]
+                if part is None:
+                    continue
+                if due_at[k] <= t:
+                    try:
+                        due_at[k] += next(part)
+                    except StopIteration:
+                        frames[k] = None  # A part that ends leaves its zone as it is
+                        continue
+                if next_due < 0 or due_at[k] < next_due:
+                    next_due = due_at[k]
+
+            self.pixels.show()
+            if next_due < 0:
+                return
+
+            yield next_due - due
+            due = next_due
+            if due >= REBASE:
+                # Keep the times small ints however long the parts play
+                start = backend.ticks_add(start, due)
+                for k in range(count):
+                    due_at[k] -= due
+                due = 0
@@ -0,0 +1,107 @@
+"""
+Host-side animation recorder
+Plays a pattern or effect in the simulator and records it to an animation
+file that the board streams from flash (see patterns/animation.py)
+
+The frames are sampled at a fixed frame rate in virtual time, so a long
+show records in seconds. They are recorded before gamma and brightness,
+which the board applies as it plays them, like any other pattern.
+
+Usage:
+    python record.py --pattern xmas --seconds 120 xmas.npxa
+    python record.py --pattern easter --playlists playlists.json --fps 30 easter.npxa
+    python record.py --effect theater_chase "[[127, 127, 127], 30]" chase.npxa
+"""
+
+import argparse
+import json
+import random
+
+from patterns import backend
+from patterns.animation import AnimationWriter
+from patterns.base_pattern import BasePattern
+from patterns.playlist import PlaylistPattern, builtin_playlists, load_playlists
+from patterns.simulator import Simulator
+
+def record(make_frames, path, num_pixels, seconds, fps, pixel_order="GRB"):
+    """
+    Record a frame generator into an animation file
+
+    Args:
+        make_frames: Callable taking a FrameBuffer and returning a frame generator
+        path: Animation file to write
+        num_pixels: Number of pixels to record
+        seconds: Longest time to record (effects that finish stop earlier)
+        fps: Frames per second to sample at
+
+    Returns:
+        The AnimationWriter after the recording
+    """
+    interval = max(1, round(1000 / fps))
+    sim = Simulator(num_pixels, pixel_order, record=False)
+    saved = (backend.clock, backend.serial)
+    backend.install(sim.clock, sim.input)
+    try:
+        with open(path, "wb") as f:
+            writer = AnimationWriter(f, num_pixels, pixel_order, interval)
+            sim.scheduler.start(make_frames(sim.frame))
+            for k in range(max(1, int(seconds * 1000) // interval)):
+                sim.clock.now = k * interval / 1000.0
+                # Render every frame due by now, as the board would have
+                while sim.scheduler.active and sim.scheduler.time_until_next() == 0:
+                    sim.scheduler.poll()
+                writer.write_frame(sim.frame.buf)
+                if not sim.scheduler.active:
+                    break  # The effect finished
+            writer.close()
+    finally:
+        backend.install(*saved)
+    return writer
+
+def _tuples(value):
+    """Turn JSON lists (colors) into the tuples the effects take"""
+    if isinstance(value, list):
+        return tuple(_tuples(v) for v in value)
+    return value
+
+def main():
+    """Record the selected pattern or effect"""
+    parser = argparse.ArgumentParser(description="Record a NeoPixel pattern to an animation file")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--pattern", help="Playlist to record")
+    source.add_argument("--effect", nargs=2, metavar=("NAME", "ARGS"),
+                        help="BasePattern effect (e.g. theater_chase) and its arguments as a JSON list")
+    parser.add_argument("--playlists", metavar="FILE",
+                        help="JSON playlist file to add to the built-in playlists")
+    parser.add_argument("--pixels", type=int, default=90, help="Strip length (default 90)")
+    parser.add_argument("--seconds", type=float, default=60.0, help="Length to record (default 60)")
+    parser.add_argument("--fps", type=float, default=50.0, help="Frames per second (default 50)")
+    parser.add_argument("--seed", type=int, help="Seed the random effects for a repeatable recording")
+    parser.add_argument("output", help="Animation file to write")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    if args.pattern:
+        playlists = builtin_playlists()
+        if args.playlists:
+            playlists.update(load_playlists(args.playlists))
+        if args.pattern not in playlists:
+            parser.error(f"no playlist named {args.pattern!r}")
+        playlist = playlists[args.pattern]
+        make_frames = lambda frame: PlaylistPattern(frame, args.pixels, playlist).frames()
+    else:
+        name, effect_args = args.effect
+        if not hasattr(BasePattern, name + "_frames"):
+            parser.error(f"no effect named {name!r}")
+        effect_args = _tuples(json.loads(effect_args))
+        make_frames = lambda frame: getattr(BasePattern(frame, args.pixels), name + "_frames")(*effect_args)
+
+    writer = record(make_frames, args.output, args.pixels, args.seconds, args.fps)
+    full = writer.frame_count * args.pixels * writer.bpp
+    print(f"{args.output}: {writer.frame_count} frames at {writer.interval} ms, "
+          f"{writer.bytes_written} bytes ({full} uncompressed)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Host-side pattern simulator
+Runs the NeoPixel patterns on a workstation against a simulated strip and a
+virtual clock, faster than real time, and optionally records the frames
+
+Usage:
+    python simulate.py                      # every pattern, 60 virtual seconds each
+    python simulate.py --pattern xmas --seconds 300 --pixels 300
+    python simulate.py --seed 1 --dump frames/   # write frames for regression diffs
+    python simulate.py --playlists playlists.json --pattern easter
+    python simulate.py --pattern blue --pixels 600 --bus-khz 400   # timing on a slow bus
+    python simulate.py --pattern july --cache-kb 32   # replay cacheable frames from a FrameCache
+"""
+
+import argparse
+import os
+import random
+import time
+
+from config import PATTERN_NAMES
+from patterns.simulator import Simulator
+from patterns.framecache import FrameCache
+from patterns.playlist import PlaylistPattern, builtin_playlists, load_playlists
+
+def simulate_pattern(playlist, num_pixels, seconds, record, byte_time=None, cache=None):
+    """
+    Run one pattern in the simulator
+
+    Args:
+        playlist: Compiled Playlist to play
+        num_pixels: Number of pixels in the simulated strip
+        seconds: Virtual seconds to run
+        record: Keep a copy of every frame
+        byte_time: Virtual seconds sending one byte takes (default free)
+        cache: Optional FrameCache for the pattern's cacheable frames
+
+    Returns:
+        The Simulator after the run
+    """
+    sim = Simulator(num_pixels, record=record, byte_time=byte_time)
+    pattern = PlaylistPattern(sim.frame, num_pixels, playlist, cache)
+    sim.run(pattern.frames(), seconds)
+    return sim
+
+def dump_frames(path, frames):
+    """Write recorded frames as one "timestamp hexbytes" line per frame"""
+    with open(path, "w") as f:
+        for timestamp, data in frames:
+            f.write(f"{timestamp:.3f} {data.hex()}\n")
+
+def main():
+    """Simulate the selected patterns and print a summary"""
+    parser = argparse.ArgumentParser(description="Run NeoPixel patterns in a host-side simulator")
+    parser.add_argument("--pattern", action="append",
+                        help="Pattern to run (repeatable, default all in PATTERN_NAMES)")
+    parser.add_argument("--playlists", metavar="FILE",
+                        help="JSON playlist file to add to the built-in playlists")
+    parser.add_argument("--pixels", type=int, default=90, help="Strip length (default 90)")
+    parser.add_argument("--seconds", type=float, default=60.0, help="Virtual seconds per pattern (default 60)")
+    parser.add_argument("--seed", type=int, help="Seed the random effects for repeatable output")
+    parser.add_argument("--dump", metavar="DIR", help="Write each pattern's frames to DIR/<name>.frames")
+    parser.add_argument("--bus-khz", type=float,
+                        help="Simulate sending frames over a bus this fast (9 bit times per byte, "
+                             "e.g. 400 for I2C), default instant")
+    parser.add_argument("--cache-kb", type=float,
+                        help="Replay cacheable frames from a frame cache of this many KB")
+    args = parser.parse_args()
+
+    playlists = builtin_playlists()
+    if args.playlists:
+        playlists.update(load_playlists(args.playlists))
+
+    names = args.pattern or PATTERN_NAMES
+    for name in names:
+        if name not in playlists:
+            parser.error(f"no playlist named {name!r}")
+    if args.dump:
+        os.makedirs(args.dump, exist_ok=True)
+
+    byte_time = 9 / (args.bus_khz * 1000) if args.bus_khz else None
+
+    for name in names:
+        if args.seed is not None:
+            random.seed(args.seed)
+
+        cache = FrameCache(int(args.cache_kb * 1024)) if args.cache_kb else None
+        started = time.monotonic()
+        sim = simulate_pattern(playlists[name], args.pixels, args.seconds, bool(args.dump),
+                               byte_time, cache)
+        elapsed = time.monotonic() - started
+
+        speedup = args.seconds / elapsed if elapsed > 0 else float("inf")
+        print(f"{name:8s} {sim.strip.show_count:7d} frames  {args.seconds:.0f}s virtual  "
+              f"{elapsed:.2f}s wall  {speedup:.0f}x real time")
+        if byte_time:
+            print(f"         {sim.scheduler.report()}")
+        if cache is not None:
+            print(f"         {cache.report()}")
+
+        if args.dump:
+            dump_frames(os.path.join(args.dump, f"{name}.frames"), sim.strip.frames)
+
+if __name__ == "__main__":
+    main()
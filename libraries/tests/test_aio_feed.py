@@ -0,0 +1,223 @@
+"""
+Tests for the Adafruit.IO feed helpers, against the loopback broker and a fake HTTP session
+"""
+
+import random
+
+from aio_feed import FeedPoller, FeedSubscription, StatusQueue
+from aio_loopback import LoopbackBroker
+
+TOPIC = "user/feeds/neopixel-pattern"
+
+def subscribe(broker):
+    """A FeedSubscription on the loopback broker"""
+    return FeedSubscription("user", "key", "neopixel-pattern", client=broker.client())
+
+def test_connect_subscribes():
+    broker = LoopbackBroker()
+    feed = subscribe(broker)
+    assert feed.connect()
+    assert feed.connected
+    assert TOPIC in feed.client.subscriptions
+
+def test_connect_gets_the_last_value():
+    broker = LoopbackBroker()
+    broker.publish(TOPIC, "xmas")
+    feed = subscribe(broker)
+    feed.connect()
+    assert feed.poll() == "xmas"
+    assert feed.poll() is None
+
+def test_connect_with_an_empty_feed():
+    feed = subscribe(LoopbackBroker())
+    feed.connect()
+    assert feed.poll() is None
+
+def test_poll_takes_only_the_latest_value():
+    broker = LoopbackBroker()
+    feed = subscribe(broker)
+    feed.connect()
+    dashboard = broker.client()
+    dashboard.connect()
+    dashboard.publish(TOPIC, "fall")
+    dashboard.publish(TOPIC, "july")
+    assert feed.poll() == "july"
+    assert feed.messages == 2
+
+def test_other_topics_are_ignored():
+    broker = LoopbackBroker()
+    feed = subscribe(broker)
+    feed.connect()
+    feed.client.subscribe("user/feeds/other")
+    broker.publish("user/feeds/other", "fall")
+    assert feed.poll() is None
+
+def test_publish():
+    broker = LoopbackBroker()
+    feed = subscribe(broker)
+    feed.connect()
+    assert feed.publish("blue")
+    assert broker.retained[TOPIC] == "blue"
+    assert feed.poll() == "blue"  # Adafruit.IO echoes it to subscribers
+
+def test_disconnect():
+    broker = LoopbackBroker()
+    feed = subscribe(broker)
+    feed.connect()
+    feed.disconnect()
+    assert not feed.connected
+    broker.publish(TOPIC, "pink")
+    assert feed.poll() is None
+    assert not feed.publish("pink")
+
+def test_failed_connect():
+    broker = LoopbackBroker()
+    feed = subscribe(broker)
+
+    def refuse():
+        raise OSError("connection refused")
+
+    feed.client.connect = refuse
+    assert not feed.connect()
+    assert feed.poll() is None
+
+def test_lost_connection():
+    broker = LoopbackBroker()
+    feed = subscribe(broker)
+    feed.connect()
+
+    def drop(timeout=0):
+        raise OSError("connection reset")
+
+    feed.client.loop = drop
+    assert feed.poll() is None
+    assert not feed.connected
+
+class FakeResponse:
+    def __init__(self, status_code, data=None, headers=None):
+        self.status_code = status_code
+        self.data = data
+        self.headers = headers or {}
+        self.closed = False
+
+    def json(self):
+        return self.data
+
+    def close(self):
+        self.closed = True
+
+class FakeSession:
+    """Hands out queued responses and records the request headers"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers=None):
+        self.requests.append(headers)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+def poller(session, **kwargs):
+    return FeedPoller(session, "user", "key", "neopixel-pattern", **kwargs)
+
+def value(text, created_at, etag=None):
+    headers = {"etag": etag} if etag is not None else {}
+    return FakeResponse(200, {"value": text, "created_at": created_at}, headers)
+
+def test_poll_returns_a_new_value():
+    response = value("fall", "t1")
+    feed = poller(FakeSession(response))
+    assert feed.poll(0) == "fall"
+    assert response.closed
+    assert feed.next_poll == feed.fast_interval
+
+def test_etag_is_sent_and_304_is_unchanged():
+    session = FakeSession(value("fall", "t1", etag='"abc"'), FakeResponse(304))
+    feed = poller(session)
+    feed.poll(0)
+    assert feed.poll(1) is None
+    assert "If-None-Match" not in session.requests[0]
+    assert session.requests[1]["If-None-Match"] == '"abc"'
+    assert session.requests[1]["X-AIO-Key"] == "key"
+    assert feed.unchanged == 1
+
+def test_same_value_is_unchanged():
+    feed = poller(FakeSession(value("fall", "t1"), value("fall", "t1"), value("fall", "t2")))
+    assert feed.poll(0) == "fall"
+    assert feed.poll(1) is None
+    assert feed.poll(2) == "fall"  # Set again, so it counts
+
+def test_idle_feed_slows_down():
+    feed = poller(FakeSession(*[FakeResponse(304)] * 80), fast_interval=0.5,
+                  slow_interval=5.0, idle_after=30.0)
+    now = 0
+    while now < 30:
+        feed.poll(now)
+        now = feed.next_poll
+    assert feed.interval == 0.5  # Fast until the feed has been idle for idle_after
+    for _ in range(10):
+        feed.poll(now)
+        now = feed.next_poll
+    assert feed.interval == 5.0
+
+def test_change_speeds_up_again():
+    feed = poller(FakeSession(value("fall", "t1")), fast_interval=0.5)
+    feed.interval = 5.0
+    feed.last_created_at = "t0"
+    feed.poll(100)
+    assert feed.interval == 0.5
+    assert feed.next_poll == 100.5
+
+def test_failures_back_off(monkeypatch):
+    monkeypatch.setattr(random, "random", lambda: 1.0)  # No jitter
+    feed = poller(FakeSession(OSError("timeout"), FakeResponse(500), OSError("timeout")),
+                  fast_interval=0.5, max_backoff=3.0)
+    feed.poll(0)
+    assert feed.next_poll == 1.0
+    feed.poll(1)
+    assert feed.next_poll == 1 + 2.0
+    feed.poll(3)
+    assert feed.next_poll == 3 + 3.0  # Capped at max_backoff
+    assert feed.failures == 3
+
+def test_backoff_is_jittered(monkeypatch):
+    monkeypatch.setattr(random, "random", lambda: 0.0)
+    feed = poller(FakeSession(OSError("timeout")), fast_interval=0.5)
+    feed.poll(0)
+    assert feed.next_poll == 0.5  # Half the full delay
+
+def test_success_clears_backoff():
+    feed = poller(FakeSession(OSError("timeout"), value("fall", "t1")))
+    feed.poll(0)
+    feed.poll(feed.next_poll)
+    assert feed.failures == 0
+
+def test_rate_limit_honours_retry_after():
+    response = FakeResponse(429, headers={"retry-after": "30"})
+    feed = poller(FakeSession(response))
+    assert feed.poll(0) is None
+    assert feed.next_poll == 30.0
+    assert response.closed
+
+def test_rate_limit_with_bad_retry_after(monkeypatch):
+    monkeypatch.setattr(random, "random", lambda: 1.0)
+    feed = poller(FakeSession(FakeResponse(429, headers={"retry-after": "soon"})),
+                  fast_interval=0.5)
+    assert feed.poll(0) is None
+    assert feed.next_poll == 1.0  # Ordinary backoff
+
+def test_status_queue_coalesces_and_drops():
+    sent = []
+    queue = StatusQueue(lambda value: sent.append(value) or False, retry_interval=1.0, max_attempts=2)
+    queue.submit("fall")
+    queue.submit("xmas")
+    assert queue.depth == 1
+    queue.flush(0)
+    queue.flush(0.5)  # Waiting to retry
+    queue.flush(1)
+    assert sent == ["xmas", "xmas"]
+    assert queue.stats() == {"depth": 0, "submitted": 2, "sent": 0, "coalesced": 1, "dropped": 1}
+    assert queue.report() == "Status queue: 0 waiting, 2 submitted, 0 sent, 1 coalesced, 1 dropped"
@@ -0,0 +1,80 @@
+"""
+Tests for recording and streaming animation files
+"""
+
+from patterns import backend
+from patterns.animation import AnimationPattern, AnimationWriter
+from patterns.framebuffer import FrameBuffer
+from patterns.scheduler import FrameScheduler
+from patterns.simulator import VirtualClock
+from patterns.transition import Crossfade
+
+def write_animation(path, num_pixels, count, interval=20):
+    """An animation of one lit pixel walking along the strip"""
+    with open(path, "wb") as f:
+        writer = AnimationWriter(f, num_pixels, "GRB", interval)
+        for k in range(count):
+            buf = bytearray(num_pixels * 3)
+            buf[(k % num_pixels) * 3] = 255
+            writer.write_frame(buf)
+        writer.close()
+
+def test_frames_play_back(tmp_path):
+    path = str(tmp_path / "walk.npxa")
+    write_animation(path, 10, 30)
+    frame = FrameBuffer(10)
+    pattern = AnimationPattern(frame, 10, path)
+    pattern.file = open(path, "rb")
+    pattern._rewind()
+    try:
+        for k in (0, 5, 12, 3):  # Seeking back rewinds
+            pattern.render(k * 20)
+            assert frame[k % 10] == (0, 255, 0)  # Green is the first wire byte
+            assert sum(map(sum, (frame[i] for i in range(10)))) == 255
+    finally:
+        pattern.close()
+
+def test_pixels_past_the_recording_are_cleared(tmp_path):
+    path = str(tmp_path / "short.npxa")
+    write_animation(path, 6, 5)
+    frame = FrameBuffer(10)
+    frame.fill((9, 9, 9))  # Left over from the previous pattern
+    clock = VirtualClock()
+    backend.install(clock)
+    try:
+        frames = AnimationPattern(frame, 10, path).frames()
+        next(frames)
+        frames.close()
+    finally:
+        backend.reset()
+    assert [frame[i] for i in range(6, 10)] == [(0, 0, 0)] * 4
+    assert frame[0] == (0, 255, 0)
+
+def test_file_is_closed_when_the_scheduler_moves_on(tmp_path):
+    path = str(tmp_path / "walk.npxa")
+    write_animation(path, 10, 30)
+    frame = FrameBuffer(10)
+    pattern = AnimationPattern(frame, 10, path)
+    clock = VirtualClock()
+    backend.install(clock)
+    try:
+        scheduler = FrameScheduler()
+        playing = pattern.frames()
+        scheduler.start(playing)
+        scheduler.poll()
+        file = pattern.file
+        assert not file.closed
+        scheduler.stop()
+        assert file.closed
+        assert pattern.file is None
+
+        # Mid-fade, a switch closes the pattern behind the fade too
+        crossfade = Crossfade(frame, 500)
+        frames = pattern.frames()  # Held here, so only close() can release the file
+        scheduler.start(crossfade.frames(frames))
+        scheduler.poll()
+        file = pattern.file
+        scheduler.start(crossfade.frames())
+        assert file.closed
+    finally:
+        backend.reset()
@@ -0,0 +1,108 @@
+"""
+Tests for gamma and brightness correction
+"""
+
+import pytest
+
+from patterns.correction import CorrectedOutput, correction_table, dither_tables
+from patterns.framebuffer import FrameBuffer
+
+class Recorder:
+    """Output keeping a copy of every frame written to it"""
+
+    def __init__(self):
+        self.frames = []
+
+    def write(self, frame):
+        self.frames.append(bytes(frame.buf))
+
+@pytest.mark.parametrize("value, corrected", [(0, 0), (128, 11), (255, 77)])
+def test_table_known_points(value, corrected):
+    assert correction_table(2.8, 0.3)[value] == corrected
+
+def test_table_is_linear_without_gamma():
+    assert correction_table() == bytes(range(256))
+    assert correction_table(1.0, 0.5)[200] == 100
+
+def test_table_is_monotonic():
+    table = correction_table(2.8, 0.3)
+    assert all(a <= b for a, b in zip(table, table[1:]))
+
+@pytest.mark.parametrize("pixel_order, color", [("GRB", (200, 100, 50)), ("RGB", (200, 100, 50)),
+                                                ("GRBW", (200, 100, 50, 255))])
+def test_tables_apply_per_channel_in_wire_order(pixel_order, color):
+    recorder = Recorder()
+    balance = {"R": 1.0, "G": 0.8, "B": 0.5, "W": 0.25}  # A different table per channel
+    output = CorrectedOutput(recorder, 4, pixel_order, 2.8, 0.5, balance)
+    frame = FrameBuffer(4, output, pixel_order)
+    frame[2] = color
+    frame.show()
+
+    channels = dict(zip("RGBW", color))
+    expected = bytes(correction_table(2.8, 0.5 * balance[c])[channels[c]] for c in pixel_order)
+    bpp = len(pixel_order)
+    assert recorder.frames[-1][2 * bpp:3 * bpp] == expected
+    assert recorder.frames[-1][:2 * bpp] == bytes(2 * bpp)
+
+def test_patterns_frame_keeps_its_uncorrected_values():
+    output = CorrectedOutput(Recorder(), 3, "GRB", 2.8, 0.3)
+    frame = FrameBuffer(3, output)
+    frame.fill((128, 255, 0))
+    frame.show()
+    assert frame[1] == (128, 255, 0)
+    assert output.target[1] == (11, 77, 0)
+
+def test_brightness_change_resends_the_frame():
+    recorder = Recorder()
+    output = CorrectedOutput(recorder, 2, "GRB", 1.0, 1.0)
+    frame = FrameBuffer(2, output)
+    frame.fill((200, 100, 50))
+    frame.show()
+    assert output.set_brightness(0.5)
+    assert len(recorder.frames) == 2
+    assert output.target[0] == (100, 50, 25)
+    assert not output.set_brightness(0.5)
+
+def exact(value, gamma, level):
+    """The corrected value before rounding to a whole level"""
+    return ((value / 255) ** gamma) * level * 255
+
+@pytest.mark.parametrize("frames", [16, 64, 256])
+@pytest.mark.parametrize("gamma, brightness", [(2.8, 0.3), (2.8, 0.05), (1.0, 0.1)])
+def test_dithered_frames_average_to_the_exact_value(frames, gamma, brightness):
+    values = (1, 20, 64, 100, 128, 200, 255)
+    recorder = Recorder()
+    output = CorrectedOutput(recorder, len(values), "GRB", gamma, brightness, dither=True)
+    frame = FrameBuffer(len(values), output)
+    for i, v in enumerate(values):
+        frame[i] = (v, v, v)
+    frame.show()
+    for _ in range(frames - 1):
+        output.refresh()
+    assert len(recorder.frames) == frames
+
+    for o in range(len(values) * 3):
+        v = values[o // 3]
+        average = sum(sent[o] for sent in recorder.frames) / frames
+        # Within 1/N of the value kept to 1/256 of a level, which is itself
+        # within 1/512 of the exact one
+        assert abs(average - exact(v, gamma, brightness)) <= 1 / frames + 1 / 512, (v, average)
+
+def test_dither_tables_split_the_exact_value():
+    whole, fraction = dither_tables(2.8, 0.3)
+    for v in range(256):
+        assert abs(whole[v] + fraction[v] / 256 - exact(v, 2.8, 0.3)) <= 1 / 512
+
+def test_dither_off_sends_the_plain_table_output():
+    recorder = Recorder()
+    output = CorrectedOutput(recorder, 256, "RGB", 2.8, 0.3)
+    frame = FrameBuffer(256, output, "RGB")
+    for v in range(256):
+        frame[v] = (v, v, v)
+    frame.show()
+    output.refresh()
+    output.refresh()
+
+    table = correction_table(2.8, 0.3)
+    expected = bytes(table[v] for v in range(256) for _ in range(3))
+    assert recorder.frames == [expected] * 3
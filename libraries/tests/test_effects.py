@@ -0,0 +1,165 @@
+"""
+Tests for the time-based effects
+"""
+
+import random
+
+import pytest
+
+from patterns import effects, palette
+from patterns.framebuffer import FrameBuffer
+
+def baseline_wheel(pos):
+    """wheel() as the original per-pixel rainbow_cycle() called it"""
+    if pos < 85:
+        return (pos * 3, 255 - pos * 3, 0)
+    elif pos < 170:
+        pos -= 85
+        return (255 - pos * 3, 0, pos * 3)
+    else:
+        pos -= 170
+        return (0, pos * 3, 255 - pos * 3)
+
+def pixels_of(frame):
+    return [frame[i] for i in range(frame.num_pixels)]
+
+@pytest.mark.parametrize("num_pixels", [1, 30, 90, 300])
+def test_rainbow_cycle_matches_baseline(num_pixels):
+    frame = FrameBuffer(num_pixels)
+    effect = effects.RainbowCycle(frame, 2, 5)
+    for k in list(range(40)) + [255, 256, 300, 511]:
+        effect.render(k * 5)
+        assert pixels_of(frame) == [baseline_wheel(((i * 256 // num_pixels) + k) & 255)
+                                    for i in range(num_pixels)], f"frame {k}"
+
+@pytest.mark.parametrize("num_pixels", [30, 90, 300])
+def test_rainbow_matches_baseline(num_pixels):
+    frame = FrameBuffer(num_pixels)
+    effect = effects.Rainbow(frame, 10)
+    for k in list(range(40)) + [700, 1279]:
+        effect.render(k * 10)
+        first_pixel_hue = k * 256
+        # The hue wraps around the wheel rather than running past its end
+        assert pixels_of(frame) == [palette.hsv_to_rgb((first_pixel_hue + (i * 65536 // num_pixels)) & 0xFFFF, 255, 255)
+                                    for i in range(num_pixels)], f"frame {k}"
+
+@pytest.mark.parametrize("num_pixels", [30, 90])
+def test_theater_chase_rainbow_matches_baseline(num_pixels):
+    frame = FrameBuffer(num_pixels)
+    effect = effects.TheaterChaseRainbow(frame, 50)
+    for k in range(90):
+        effect.render(k * 50)
+        first_pixel_hue = k * (65536 // 90)
+        want = [(0, 0, 0)] * num_pixels
+        for c in range(k % 3, num_pixels, 3):
+            want[c] = palette.hsv_to_rgb((first_pixel_hue + c * 65536 // num_pixels) & 0xFFFF, 255, 255)
+        assert pixels_of(frame) == want, f"frame {k}"
+
+@pytest.mark.parametrize("make", [lambda f: effects.RainbowCycle(f, 1, 5), lambda f: effects.Rainbow(f, 5)])
+def test_rainbow_moves_every_frame(make):
+    frame = FrameBuffer(30)
+    effect = make(frame)
+    effect.render(0)
+    frame.show()
+    for k in range(1, 256):
+        effect.render(k * 5)
+        assert frame.dirty, f"frame {k} did not move"
+        frame.show()
+
+# Effects that draw each frame's change on top of the last, by name
+INCREMENTAL = [
+    ("color_wipe", lambda f: effects.ColorWipe(f, (255, 0, 0), 20)),
+    ("fast_color_wipe", lambda f: effects.FastColorWipe(f, (0, 255, 0), 10)),
+    ("random_position_fill", lambda f: effects.RandomPositionFill(f, (0, 0, 255), 30)),
+    ("middle_fill", lambda f: effects.MiddleFill(f, (0, 255, 0), 30)),
+    ("side_fill", lambda f: effects.SideFill(f, (255, 255, 255), 30)),
+    ("interleave_fill", lambda f: effects.InterleaveFill(f, ((255, 0, 0), (0, 0, 255)), 20, 50)),
+    ("twinkle", lambda f: effects.Twinkle(f, ((255, 0, 0), (255, 255, 0)), 20, 50)),
+]
+
+# Effects that draw every pixel of every frame, by name
+FULL = [
+    ("theater_chase", lambda f: effects.TheaterChase(f, (127, 127, 127), 30, 2)),
+    ("rainbow_cycle", lambda f: effects.RainbowCycle(f, 2, 5)),
+    ("rainbow", lambda f: effects.Rainbow(f, 5)),
+    ("theater_chase_rainbow", lambda f: effects.TheaterChaseRainbow(f, 30)),
+    ("candy_cane", lambda f: effects.CandyCane(f, 5, 3, 100)),
+    ("rainbow_stripe", lambda f: effects.RainbowStripe(f, 2, 4, 60)),
+    ("alternate_color", lambda f: effects.AlternateColor(f, (255, 0, 0), (0, 255, 0), 500)),
+]
+
+def play(make, times, num_pixels=25, seed=1):
+    """Render an effect at each of times in turn, returning the frame after each"""
+    random.seed(seed)
+    frame = FrameBuffer(num_pixels)
+    effect = make(frame)
+    out = []
+    for t in times:
+        effect.render(t)
+        out.append(bytes(frame.buf))
+    return out
+
+@pytest.mark.parametrize("name, make", INCREMENTAL + FULL)
+def test_late_frame_catches_up(name, make):
+    effect = make(FrameBuffer(25))
+    every = range(0, effect.length, effect.wait)
+    in_step = play(make, every)
+    # Only every third frame rendered, a few ms late - the skipped frames are drawn too
+    late = play(make, [t + 3 for t in every][2::3])
+    assert late == in_step[2::3]
+
+@pytest.mark.parametrize("name, make", INCREMENTAL + FULL)
+def test_render_returns_when_the_next_frame_is_due(name, make):
+    effect = make(FrameBuffer(25))
+    wait = effect.wait
+    assert effect.render(0) == wait
+    k = (effect.frames - 1) // 2
+    assert effect.render(k * wait + 1) == (k + 1) * wait
+    assert effect.render(effect.length - 1) == effect.length
+    assert effect.render(effect.length) is None
+    assert effect.drawn == effect.frames - 1
+
+@pytest.mark.parametrize("name, make", INCREMENTAL)
+def test_reset_replays_from_the_first_frame(name, make):
+    effect = make(FrameBuffer(25))
+    every = list(range(0, effect.length, effect.wait))
+    first = play(make, every)
+
+    random.seed(1)
+    frame = FrameBuffer(25)
+    effect = make(frame)
+    for t in every:
+        effect.render(t)
+    frame.fill((0, 0, 0))  # What the playlist does before replaying a step
+    effect.reset()
+    for k, t in enumerate(every):
+        if k == 0:
+            random.seed(1)
+        effect.render(t)
+        assert bytes(frame.buf) == first[k], k
+
+@pytest.mark.parametrize("name, make", FULL)
+def test_seek_draws_the_frame_at_that_time(name, make):
+    effect = make(FrameBuffer(25))
+    every = list(range(0, effect.length, effect.wait))
+    in_step = play(make, every)
+    n = len(every)
+    order = [k % n for k in (n - 1, 0, n // 2, 3, 1, n // 3)]  # Back and forth
+    seeked = play(make, [every[k] + 1 for k in order])
+    assert seeked == [in_step[k] for k in order]
+
+@pytest.mark.parametrize("name, make", FULL)
+def test_frames_in_the_same_slot_are_the_same(name, make):
+    frame = FrameBuffer(25)
+    effect = make(frame)
+    assert effect.slots > 0
+    drawn = {}
+    for k in range(effect.frames):
+        slot = effect.slot(k)
+        assert 0 <= slot < effect.slots
+        effect.draw(k)
+        if slot in drawn:
+            assert bytes(frame.buf) == drawn[slot], k
+        else:
+            drawn[slot] = bytes(frame.buf)
+    assert len(set(drawn.values())) == len(drawn)  # Different slots, different frames
@@ -0,0 +1,123 @@
+"""
+Tests for the frame cache
+"""
+
+import random
+
+import pytest
+
+from patterns import effects
+from patterns.framebuffer import FrameBuffer
+from patterns.framecache import FrameCache
+from patterns.playlist import builtin_playlists
+from simulate import simulate_pattern
+
+# Every effect with slots, as (name, constructor taking the frame)
+CACHEABLE = [
+    ("theater_chase", lambda frame: effects.TheaterChase(frame, (255, 35, 0), 30, 3)),
+    ("rainbow_cycle", lambda frame: effects.RainbowCycle(frame, 2, 5)),
+    ("rainbow", lambda frame: effects.Rainbow(frame, 20)),
+    ("theater_chase_rainbow", lambda frame: effects.TheaterChaseRainbow(frame, 50)),
+    ("candy_cane", lambda frame: effects.CandyCane(frame, 5, 3, 100)),
+    ("rainbow_stripe", lambda frame: effects.RainbowStripe(frame, 2, 4, 60)),
+    ("alternate_color", lambda frame: effects.AlternateColor(frame, (255, 0, 0), (0, 255, 0), 500)),
+]
+
+@pytest.mark.parametrize("num_pixels", [7, 30])
+@pytest.mark.parametrize("name, make", CACHEABLE)
+def test_cached_frames_match_drawn_frames(name, make, num_pixels):
+    drawn_frame = FrameBuffer(num_pixels)
+    cached_frame = FrameBuffer(num_pixels)
+    drawn = make(drawn_frame)
+    cached = make(cached_frame)
+    assert cached.slots > 0
+    cached.cache = FrameCache(1 << 20)
+
+    for loop in range(2):  # The second loop is copied from the cache
+        drawn.reset()
+        cached.reset()
+        for t in range(0, drawn.length, drawn.wait):
+            drawn.render(t)
+            cached.render(t)
+            assert bytes(cached_frame.buf) == bytes(drawn_frame.buf), (loop, t)
+    assert cached.cache.hits >= drawn.frames
+
+@pytest.mark.parametrize("name", sorted(builtin_playlists()))
+def test_cached_pattern_matches_uncached(name):
+    playlist = builtin_playlists()[name]
+    random.seed(1)
+    plain = simulate_pattern(playlist, 30, 40, True)
+    random.seed(1)
+    cached = simulate_pattern(playlist, 30, 40, True, cache=FrameCache(32 * 1024))
+    assert cached.strip.frames == plain.strip.frames
+
+def chase(num_pixels=20):
+    return effects.TheaterChase(FrameBuffer(num_pixels), (255, 0, 0), 10)
+
+def test_least_recently_used_entry_is_evicted():
+    a, b, c = chase(), chase(), chase()
+    nbytes = 3 * 20 * 3
+    cache = FrameCache(2 * nbytes)
+    cache.draw(a, 0)
+    cache.draw(b, 0)
+    cache.draw(a, 1)  # b is now the least recently used
+    cache.draw(c, 0)
+    assert cache.evictions == 1
+    assert b not in cache._entries
+    assert a in cache._entries and c in cache._entries
+    assert cache.used_bytes == 2 * nbytes
+
+    cache.draw(a, 2)
+    cache.draw(b, 0)  # c is the oldest now
+    assert c not in cache._entries
+    assert cache.evictions == 2
+
+def test_entries_stay_within_the_budget():
+    effects_ = [chase(n) for n in (10, 20, 30, 15, 25, 5)]
+    cache = FrameCache(400)
+    for k in range(12):
+        for effect in effects_:
+            cache.draw(effect, k)
+            assert cache.used_bytes <= cache.budget
+            assert cache.used_bytes == sum(entry.nbytes for entry in cache._entries.values()
+                                           if entry is not None)
+
+def test_effect_too_big_for_the_budget_is_drawn_as_usual():
+    effect = chase(30)
+    cache = FrameCache(100)
+    cache.draw(effect, 1)
+    assert cache._entries[effect] is None
+    assert cache.used_bytes == 0
+    assert cache.hits == 0 and cache.misses == 0
+
+    plain = chase(30)
+    plain.draw(1)
+    assert bytes(effect.pixels.buf) == bytes(plain.pixels.buf)
+
+def test_unchanged_cached_frame_is_not_resent():
+    frame = FrameBuffer(20)
+    effect = effects.CandyCane(frame, 5, 2, 10)
+    effect.cache = FrameCache(4096)
+    effect.render(0)  # Drawn and stored
+    frame.show()
+    effect.reset()
+    effect.render(0)
+    frame.show()
+    effect.reset()
+    effect.render(40)  # Frame 4 is slot 0 again, copied from the cache
+    assert effect.cache.hits == 2
+    assert not frame.dirty
+    frame.show()
+    assert frame.transmit_count == 1
+
+def test_changed_cached_frame_is_sent():
+    frame = FrameBuffer(20)
+    effect = effects.CandyCane(frame, 5, 2, 10)
+    effect.cache = FrameCache(4096)
+    for t in (0, 10, 20):
+        effect.render(t)
+        frame.show()
+    effect.reset()
+    effect.render(40)  # Slot 0 from the cache, after slot 2
+    assert effect.cache.hits == 1
+    assert (frame.dirty_start, frame.dirty_stop) == (0, 20)
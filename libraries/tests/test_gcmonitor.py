@@ -0,0 +1,48 @@
+"""
+Tests for the per-frame allocation counters
+"""
+
+import tracemalloc
+
+from patterns.gcmonitor import GCMonitor
+
+def measure(monitor, work):
+    monitor.begin()
+    work()
+    monitor.end()
+
+def test_temporaries_are_not_counted():
+    monitor = GCMonitor()
+    work = lambda: sum(bytearray(4096)) + 100000
+    tracemalloc.start()
+    try:
+        for _ in range(3):
+            measure(monitor, work)
+    finally:
+        tracemalloc.stop()
+    assert monitor.frames == 3
+    assert monitor.alloc_frames == 0
+    assert monitor.heap_peak > 0
+
+def test_kept_memory_is_counted():
+    monitor = GCMonitor()
+    kept = []
+    tracemalloc.start()
+    try:
+        measure(monitor, lambda: kept.append(bytearray(4096)))
+    finally:
+        tracemalloc.stop()
+    assert monitor.alloc_frames == 1
+    assert monitor.alloc_bytes >= 4096
+
+def test_mem_free_drop_and_collection():
+    free = [10000]
+    monitor = GCMonitor(mem_free=lambda: free[0])
+    monitor.begin()
+    free[0] -= 64
+    monitor.end()
+    monitor.begin()
+    free[0] += 5000  # A collection ran
+    monitor.end()
+    assert monitor.stats() == {"frames": 2, "alloc_frames": 1, "alloc_bytes": 64,
+                               "worst_bytes": 64, "collections": 1}
@@ -0,0 +1,44 @@
+"""
+Golden-frame tests for the built-in patterns
+
+Each pattern is run in the simulator with a fixed seed and the frames it
+sends are compared against a stored checksum. The checksums are the
+SHA-256 of the files simulate.py writes, so after a change that is meant
+to alter the output they can be regenerated with
+
+    python simulate.py --seed 1 --seconds 20 --pixels 30 --dump frames/
+    sha256sum frames/*.frames
+"""
+
+import hashlib
+import random
+
+import pytest
+
+from patterns.playlist import builtin_playlists
+from simulate import dump_frames, simulate_pattern
+
+SEED = 1
+SECONDS = 20  # Longer than one pass of every built-in playlist
+NUM_PIXELS = 30
+
+GOLDEN = {
+    "fall": "acb4ac7e830a16d40a2cd0a2b478348fe49a8cf87c03bb1861a9318640ea9782",
+    "july": "81a6e049662d0b26418a2297ab42b7a9ba32c576f1a3957ee8048e193a9a041a",
+    "xmas": "8c579587446fb7755e6a5b68be7eada41785b72e658eb0ef3df1ab002451fa29",
+    "normal": "f05062bcce704db22d7f43243ee200607d203c40c8ac03773a37895442599654",
+    "alert": "016b1a73a245aaf764610e341dcc06f86b033bec404499d4e741ec32adfec73b",
+    "blue": "c4c5f7f5aae14634a9ad0df59b5ea9c7e35ae2b6774bfd9b70c06f450591d16d",
+    "pink": "8040afd40156cd2bbb79f80ca3e5dede154db9b2c4e921d4ef49b6b7cb56768b",
+}
+
+def test_every_builtin_pattern_has_a_checksum():
+    assert sorted(GOLDEN) == sorted(builtin_playlists())
+
+@pytest.mark.parametrize("name", sorted(GOLDEN))
+def test_frames_match_golden(name, tmp_path):
+    random.seed(SEED)
+    sim = simulate_pattern(builtin_playlists()[name], NUM_PIXELS, SECONDS, True)
+    path = tmp_path / f"{name}.frames"
+    dump_frames(path, sim.strip.frames)
+    assert hashlib.sha256(path.read_bytes()).hexdigest() == GOLDEN[name]
@@ -0,0 +1,55 @@
+"""
+Tests for compositing overlay layers over a frame
+"""
+
+from patterns.framebuffer import FrameBuffer
+from patterns.layers import Compositor
+
+def test_changed_span_is_copied_through():
+    compositor = Compositor(None, 20)
+    frame = FrameBuffer(20, compositor)
+    frame.fill((1, 2, 3))
+    frame.show()
+    frame[5] = (9, 9, 9)
+    frame.show()
+    assert bytes(compositor.mixed.buf) == bytes(frame.buf)
+
+def test_layer_is_blended_over_the_frame():
+    compositor = Compositor(None, 10)
+    layer = compositor.layer("max")
+    frame = FrameBuffer(10, compositor)
+    frame.fill((0, 0, 100))
+    layer.pixels[3] = (255, 0, 0)
+    layer.pixels.show()
+    frame.show()
+    mixed = compositor.mixed
+    assert mixed[3] == (255, 0, 100)
+    assert mixed[4] == (0, 0, 100)
+
+class CountingView:
+    """Stands in for a frame's memoryview, counting the slices made of it"""
+
+    def __init__(self, view):
+        self.view = view
+        self.slices = 0
+
+    def __getitem__(self, index):
+        self.slices += 1
+        return self.view[index]
+
+def test_composite_reuses_its_views():
+    compositor = Compositor(None, 30)
+    frame = FrameBuffer(30, compositor)
+    mixed = compositor.mixed
+    for i in range(30):  # Make the span views once
+        frame[i] = (i, 0, 0)
+        frame.show()
+
+    frame._view = CountingView(frame._view)
+    mixed._view = CountingView(mixed._view)
+    for i in range(30):
+        frame[i] = (0, i, 0)
+        frame.show()
+    assert frame._view.slices == 0
+    assert mixed._view.slices == 0
+    assert bytes(mixed.buf) == bytes(frame.buf)
@@ -0,0 +1,42 @@
+"""
+Tests for playlist checking and the playlist timeline
+"""
+
+import pytest
+
+from patterns.framebuffer import FrameBuffer
+from patterns.playlist import PlaylistPattern, builtin_playlists, compile_playlist
+
+def playlist(*steps, pause=0):
+    return {"name": "test", "pause": pause, "colors": {"red": [255, 0, 0]}, "steps": list(steps)}
+
+def test_builtin_playlists_compile():
+    playlists = builtin_playlists()
+    assert playlists
+    for compiled in playlists.values():
+        PlaylistPattern(FrameBuffer(30), 30, compiled)
+
+@pytest.mark.parametrize("step", [
+    {"effect": "twinkle", "colors": ["red"], "count": 0, "wait": 10},
+    {"effect": "candy_cane", "count": 5, "width": 0, "wait": 10},
+    {"effect": "color_wipe", "colors": ["red"], "wait": 10, "pause": -1},
+])
+def test_bad_step_is_rejected(step):
+    with pytest.raises(ValueError):
+        compile_playlist(playlist(step))
+
+def test_zero_length_playlist_is_rejected():
+    # A fill of a single pixel has no frames, so with no pause it takes no time
+    data = playlist({"effect": "middle_fill", "colors": ["red"], "wait": 10})
+    with pytest.raises(ValueError):
+        PlaylistPattern(FrameBuffer(1), 1, data)
+    PlaylistPattern(FrameBuffer(2), 2, data)
+
+def test_zero_length_step_is_skipped():
+    data = playlist({"effect": "middle_fill", "colors": ["red"], "wait": 10},
+                    {"effect": "color_wipe", "colors": ["red"], "wait": 10})
+    pattern = PlaylistPattern(FrameBuffer(1), 1, data)
+    assert pattern.period == 10
+    for t in range(0, 40, 5):
+        pattern.render(t)
+    assert pattern.state.step == 1
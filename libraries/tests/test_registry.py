@@ -0,0 +1,72 @@
+"""
+Tests for looking patterns up by name, alias and number
+"""
+
+import pytest
+
+from patterns.playlist import builtin_playlists
+from patterns.registry import OFF, PatternRegistry
+
+def registry(*entries):
+    """A registry of (name, aliases) entries, each pattern being its name"""
+    patterns = PatternRegistry()
+    for name, aliases in entries:
+        patterns.register(name, name, aliases)
+    return patterns
+
+def test_resolve_names_aliases_and_ids():
+    patterns = registry(("fall", ["autumn"]), ("xmas", ["christmas", "Holiday"]))
+    assert patterns.resolve("fall") == 0
+    assert patterns.resolve(" XMAS ") == 1
+    assert patterns.resolve("autumn") == 0
+    assert patterns.resolve("holiday") == 1
+    assert patterns.resolve("1") == 1
+    assert patterns.resolve(1) == 1
+    assert patterns.resolve("01") == 1
+    assert patterns.resolve("off") == OFF
+    assert patterns.name(OFF) == "off"
+    assert patterns.name(1) == "xmas"
+    assert patterns[0] == "fall"
+
+@pytest.mark.parametrize("value", ["2", "-1", "spring", "", "1.5"])
+def test_unknown_values_resolve_to_none(value):
+    patterns = registry(("fall", ()), ("xmas", ()))
+    assert patterns.resolve(value) is None
+
+@pytest.mark.parametrize("name", ["fall", "FALL", "off", "0"])
+def test_name_collision_raises(name):
+    patterns = registry(("fall", ()))
+    with pytest.raises(ValueError):
+        patterns.register(name, name)
+
+def test_name_takes_over_an_earlier_alias():
+    patterns = registry(("fall", ["autumn"]), ("autumn", ()))
+    assert patterns.resolve("autumn") == 1
+    assert patterns.resolve("fall") == 0
+    assert patterns.shadowed == [("autumn", "fall")]
+
+def test_alias_already_taken_is_left_out():
+    patterns = registry(("autumn", ()), ("fall", ["autumn", "leaves"]), ("july", ["leaves", "off", "0"]))
+    assert patterns.resolve("autumn") == 0
+    assert patterns.resolve("leaves") == 1
+    assert patterns.resolve("off") == OFF
+    assert patterns.resolve("0") == 0
+    assert patterns.shadowed == [("autumn", "fall"), ("leaves", "july"), ("off", "july"), ("0", "july")]
+
+def test_alias_of_its_own_name_is_ignored():
+    patterns = registry(("fall", ["Fall"]))
+    assert patterns.shadowed == []
+
+def test_builtin_playlists_register_without_shadowing():
+    patterns = PatternRegistry()
+    for playlist in builtin_playlists().values():
+        patterns.register(playlist.name, playlist, playlist.aliases)
+    assert patterns.shadowed == []
+
+def test_user_playlist_named_like_a_builtin_alias():
+    patterns = PatternRegistry()
+    for playlist in builtin_playlists().values():
+        patterns.register(playlist.name, playlist, playlist.aliases)
+    patterns.register("christmas", None)  # e.g. from playlists.json
+    assert patterns.name(patterns.resolve("christmas")) == "christmas"
+    assert patterns.shadowed == [("christmas", "xmas")]
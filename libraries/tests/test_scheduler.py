@@ -0,0 +1,86 @@
+"""
+Tests for the frame scheduler's deadlines and monitor calls
+"""
+
+from patterns import backend
+from patterns.simulator import VirtualClock
+from patterns.scheduler import FrameScheduler
+
+class CountingMonitor:
+    def __init__(self):
+        self.begins = 0
+        self.ends = 0
+
+    def begin(self):
+        assert self.begins == self.ends, "begin() while a frame is open"
+        self.begins += 1
+
+    def end(self):
+        self.ends += 1
+
+def frames(count, wait):
+    for _ in range(count):
+        yield wait
+
+def play(scheduler, clock, limit=1000):
+    """Poll the scheduler in virtual time until its frames end"""
+    for _ in range(limit):
+        if not scheduler.active:
+            return
+        scheduler.poll()
+        wait = scheduler.time_until_next()
+        if wait:
+            clock.sleep(wait)
+
+def test_monitor_is_closed_after_every_frame():
+    clock = VirtualClock()
+    backend.install(clock)
+    try:
+        monitor = CountingMonitor()
+        scheduler = FrameScheduler(monitor)
+        scheduler.start(frames(3, 10))
+        play(scheduler, clock)
+        scheduler.start(frames(2, 10))
+        play(scheduler, clock)
+    finally:
+        backend.reset()
+    assert monitor.begins == monitor.ends == 7  # 5 frames and the two last steps
+    assert scheduler.rendered == 5
+
+def test_monitor_is_closed_when_a_frame_fails():
+    def failing():
+        yield 10
+        raise RuntimeError("broken effect")
+
+    clock = VirtualClock()
+    backend.install(clock)
+    try:
+        monitor = CountingMonitor()
+        scheduler = FrameScheduler(monitor)
+        scheduler.start(failing())
+        scheduler.poll()
+        clock.sleep(0.01)
+        try:
+            scheduler.poll()
+        except RuntimeError:
+            pass
+    finally:
+        backend.reset()
+    assert monitor.begins == monitor.ends == 2
+
+def test_deadlines_do_not_drift():
+    clock = VirtualClock()
+    backend.install(clock)
+    try:
+        scheduler = FrameScheduler()
+        scheduler.start(frames(10, 20))
+        times = []
+        for _ in range(10):
+            scheduler.poll()
+            times.append(clock.ticks_ms())
+            clock.sleep(0.003)  # Rendering and sending take time
+            clock.sleep(scheduler.time_until_next() or 0)
+    finally:
+        backend.reset()
+    assert times == list(range(0, 200, 20))
+    assert scheduler.late_frames == 0
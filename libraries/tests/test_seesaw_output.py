@@ -0,0 +1,114 @@
+"""
+Tests for the seesaw frame transfer against MockSeesaw
+"""
+
+from patterns.framebuffer import FrameBuffer
+from patterns.seesaw_output import SeesawOutput, MAX_TRANSFER
+from patterns.segments import chain
+from patterns.simulator import MockSeesaw
+
+PAYLOAD = MAX_TRANSFER - 4  # Bytes of pixel data per transfer
+
+def make_strip(num_pixels=90):
+    """A frame sent through SeesawOutput to a MockSeesaw"""
+    mock = MockSeesaw()
+    output = SeesawOutput(mock, 15, num_pixels * 3)
+    return mock, FrameBuffer(num_pixels, output, "GRB")
+
+def test_setup_configures_pin_and_buffer():
+    mock, _ = make_strip(90)
+    assert mock.pin == 15
+    assert mock.speed == 1
+    assert len(mock.pixels) == 270
+
+def test_full_frame_is_sent_in_full_chunks():
+    mock, frame = make_strip(90)
+    sizes = []
+    write = mock.write
+    mock.write = lambda buf, start=0, end=None: sizes.append(len(buf[start:end])) or write(buf, start, end)
+    frame.fill((1, 2, 3))
+    frame.show()
+
+    payloads = [size - 4 for size in sizes[:-1]]
+    assert sizes[-1] == 2  # The latch
+    assert payloads == [PAYLOAD] * (270 // PAYLOAD) + [270 % PAYLOAD]
+    assert bytes(mock.pixels) == bytes(frame.buf)
+
+def test_one_latch_per_frame():
+    mock, frame = make_strip(90)
+    for k in range(3):
+        frame.fill((k, 0, 0))
+        frame.show()
+    assert len(mock.latches) == 3
+    assert mock.latches[-1] == bytes(frame.buf)
+
+def test_unchanged_frame_is_not_sent():
+    mock, frame = make_strip(90)
+    frame.show()
+    writes = mock.writes
+    frame.show()
+    assert mock.writes == writes
+    assert len(mock.latches) == 1
+
+def test_only_dirty_chunks_are_resent():
+    mock, frame = make_strip(90)
+    frame.show()
+    writes = mock.writes
+    frame[40] = (255, 0, 0)  # Bytes 120-122, all in chunk 4
+    frame.show()
+    assert mock.writes - writes == 2  # One chunk and the latch
+    assert mock.latches[-1] == bytes(frame.buf)
+
+def test_dirty_span_across_chunks():
+    mock, frame = make_strip(90)
+    frame.show()
+    writes = mock.writes
+    frame.fill_range(9, 19, (0, 0, 255))  # Bytes 27-56, chunks 0 to 2
+    frame.show()
+    assert mock.writes - writes == 4
+    assert mock.latches[-1] == bytes(frame.buf)
+
+def test_segments_go_to_their_own_seesaw():
+    first = MockSeesaw()
+    second = MockSeesaw()
+    strips = chain([(SeesawOutput(first, 15, 30 * 3), 30), (SeesawOutput(second, 15, 60 * 3), 60)])
+    frame = FrameBuffer(strips.num_pixels, strips, "GRB")
+    for i in range(frame.num_pixels):
+        frame[i] = (i, 255 - i, 7)
+    frame.show()
+
+    assert len(first.latches) == 1
+    assert len(second.latches) == 1
+    assert first.latches[0] == bytes(frame.buf[:90])
+    assert second.latches[0] == bytes(frame.buf[90:])
+
+def test_only_dirty_segments_are_resent():
+    first = MockSeesaw()
+    second = MockSeesaw()
+    strips = chain([(SeesawOutput(first, 15, 30 * 3), 30), (SeesawOutput(second, 15, 60 * 3), 60)])
+    frame = FrameBuffer(strips.num_pixels, strips, "GRB")
+    frame.show()
+    first_writes = first.writes
+    second_writes = second.writes
+
+    frame[45] = (9, 9, 9)  # Pixel 15 of the second strip, bytes 45-47 of its buffer
+    frame.show()
+    assert first.writes == first_writes
+    assert len(first.latches) == 1
+    assert second.writes - second_writes == 2  # Chunk 1 and the latch
+    assert len(second.latches) == 2
+    assert second.latches[-1] == bytes(frame.buf[90:])
+
+def test_dirty_span_over_a_boundary_sends_both_segments():
+    first = MockSeesaw()
+    second = MockSeesaw()
+    strips = chain([(SeesawOutput(first, 15, 30 * 3), 30), (SeesawOutput(second, 15, 60 * 3), 60)])
+    frame = FrameBuffer(strips.num_pixels, strips, "GRB")
+    frame.show()
+
+    frame.fill_range(28, 32, (1, 1, 1))
+    frame.show()
+    assert len(first.latches) == 2
+    assert len(second.latches) == 2
+    assert first.latches[-1] == bytes(frame.buf[:90])
+    assert second.latches[-1] == bytes(frame.buf[90:])
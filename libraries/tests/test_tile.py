@@ -0,0 +1,110 @@
+"""
+Tests for FrameBuffer.tile() and prepared TileRuns
+"""
+
+import tracemalloc
+
+import pytest
+
+from patterns.framebuffer import FrameBuffer
+
+def make_run(frame, length):
+    """A run of distinct pixels, pixel m is (m + 1, 0, 0)"""
+    return b"".join(frame.pack((m + 1, 0, 0)) for m in range(length))
+
+def expected(frame, before, run, phase, start, stop):
+    """Reference tile: pixel p takes run pixel (p - start + phase) % length"""
+    bpp = frame.bpp
+    length = len(run) // bpp
+    out = bytearray(before)
+    for p in range(start, stop):
+        m = (p - start + phase) % length
+        out[p * bpp:(p + 1) * bpp] = run[m * bpp:(m + 1) * bpp]
+    return bytes(out)
+
+CASES = [
+    # run length, phase, start, stop
+    (3, 0, 0, 20),
+    (3, 1, 0, 20),
+    (3, 5, 0, 20),  # Phase past the run wraps
+    (3, -1, 0, 20),  # Negative phase rotates the other way
+    (3, -7, 0, 20),
+    (7, 2, 4, 17),  # Sub-range
+    (12, 3, 2, 9),  # Run longer than the range
+    (12, -5, 0, 20),
+    (20, 19, 0, 20),  # Run as long as the strip
+    (1, 0, 5, 6),  # One pixel
+]
+
+@pytest.mark.parametrize("prepared", [False, True])
+@pytest.mark.parametrize("length, phase, start, stop", CASES)
+def test_tile_matches_reference(length, phase, start, stop, prepared):
+    frame = FrameBuffer(20)
+    frame.fill((0, 0, 9))
+    before = bytes(frame.buf)
+    run = make_run(frame, length)
+    frame.tile(frame.prepare(run) if prepared else run, phase, start, stop)
+    assert bytes(frame.buf) == expected(frame, before, run, phase, start, stop)
+
+def test_tile_rgbw():
+    frame = FrameBuffer(10, pixel_order="GRBW")
+    run = frame.pack((1, 2, 3, 4)) + frame.pack((5, 6, 7, 8))
+    frame.tile(frame.prepare(run), 1, 1, 8)
+    assert bytes(frame.buf) == expected(frame, bytes(40), run, 1, 1, 8)
+
+def test_empty_range_is_a_no_op():
+    frame = FrameBuffer(10)
+    frame.show()
+    frame.tile(frame.prepare(make_run(frame, 3)), 0, 5, 5)
+    assert not frame.dirty
+    assert bytes(frame.buf) == bytes(30)
+
+def test_default_stop_is_the_end_of_the_strip():
+    frame = FrameBuffer(10)
+    run = make_run(frame, 4)
+    frame.tile(run, 0, 3)
+    assert bytes(frame.buf) == expected(frame, bytes(30), run, 0, 3, 10)
+
+@pytest.mark.parametrize("start, stop", [(0, 20), (2, 9)])
+def test_prepared_tile_does_not_allocate(start, stop):
+    frame = FrameBuffer(20)
+    run = frame.prepare(make_run(frame, 12))
+    for phase in range(12):  # Make every view once
+        frame.tile(run, phase, start, stop)
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for phase in range(12):
+            frame.tile(run, phase, start, stop)
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert after == before
+    # The slice of the run laid down first is made once and kept
+    length = (stop - start) * frame.bpp
+    assert run.rotation(5, length) is run.rotation(5, length)
+
+@pytest.mark.parametrize("prepared", [False, True])
+@pytest.mark.parametrize("length, phase, start, stop", CASES)
+def test_unchanged_tile_is_not_resent(length, phase, start, stop, prepared):
+    frame = FrameBuffer(20)
+    run = make_run(frame, length)
+    if prepared:
+        run = frame.prepare(run)
+    frame.tile(run, phase, start, stop)
+    frame.show()
+    sent = frame.transmit_count
+
+    frame.tile(run, phase, start, stop)
+    assert not frame.dirty
+    frame.show()
+    assert frame.transmit_count == sent
+
+def test_changed_tile_is_marked():
+    frame = FrameBuffer(20)
+    run = frame.prepare(make_run(frame, 3))
+    frame.tile(run, 0, 2, 9)
+    frame.show()
+    frame.tile(run, 1, 2, 9)
+    assert (frame.dirty_start, frame.dirty_stop) == (2, 9)
@@ -0,0 +1,82 @@
+"""
+Tests for cross-fading between patterns
+"""
+
+import pytest
+
+from patterns.framebuffer import FrameBuffer
+from patterns.simulator import Simulator
+from patterns.transition import Crossfade
+
+class Recorder:
+    """Output keeping a copy of every frame written to it"""
+
+    def __init__(self):
+        self.frames = []
+
+    def write(self, frame):
+        self.frames.append(bytes(frame.buf))
+
+def idle():
+    """A pattern that draws nothing"""
+    while True:
+        yield 1000
+
+def walk(frame, wait=30):
+    """A pattern lighting one pixel at a time along the strip"""
+    k = 0
+    while True:
+        frame.tile(frame.pack((0, 0, 0)))
+        frame[k % frame.num_pixels] = (255, 255, 255)
+        frame.show()
+        k += 1
+        yield wait
+
+@pytest.mark.parametrize("level, expected", [(0, (200, 100, 0)), (128, (100, 50, 100)), (256, (0, 0, 200))])
+def test_blend_levels(level, expected):
+    recorder = Recorder()
+    frame = FrameBuffer(4, recorder)
+    frame.fill((200, 100, 0))
+    frame.show()
+    crossfade = Crossfade(frame, 500)
+    crossfade.frames(idle())
+    frame.fill((0, 0, 200))  # The incoming pattern's frame, not sent by itself
+    frame.show()
+    assert len(recorder.frames) == 1
+
+    crossfade.blend(level)
+    assert len(recorder.frames) == 2
+    assert [crossfade.mixed[i] for i in range(4)] == [expected] * 4
+
+def test_fade_to_off():
+    sim = Simulator(6)
+    sim.frame.fill((200, 200, 200))
+    sim.frame.show()
+    crossfade = Crossfade(sim.frame, 100, 20)
+    frames = sim.run(crossfade.frames(), 1)
+
+    levels = [data[0] for timestamp, data in frames]
+    assert levels[0] == 200
+    assert levels[-1] == 0
+    assert all(a >= b for a, b in zip(levels, levels[1:]))
+    assert 0 < levels[2] < 200  # Mixed part way
+    assert frames[-1][1] == bytes(18)
+    assert not crossfade.active
+    assert sim.frame.output is sim.strip
+
+def test_output_goes_back_to_the_pattern_after_the_fade():
+    sim = Simulator(6)
+    sim.frame.fill((0, 0, 200))
+    sim.frame.show()
+    crossfade = Crossfade(sim.frame, 100, 20)
+    frames = sim.run(crossfade.frames(walk(sim.frame)), 1)
+
+    during = [data for timestamp, data in frames if 0 < round(timestamp * 1000) < 100]
+    after = [data for timestamp, data in frames if round(timestamp * 1000) >= 100]
+    assert during and after
+    assert all(any(0 < b < 200 for b in data) for data in during)  # Mixed
+    for data in after:  # Straight from the pattern: one pixel lit, the rest off
+        assert sorted(data) == [0] * 15 + [255] * 3
+    assert frames[-1][1] == bytes(sim.frame.buf)
+    assert not crossfade.active
+    assert sim.frame.output is sim.strip
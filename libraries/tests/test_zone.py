@@ -0,0 +1,68 @@
+"""
+Tests for drawing into zones of a shared frame
+"""
+
+import pytest
+
+from patterns.framebuffer import FrameBuffer, Zone
+
+def clean_frame(num_pixels=20):
+    frame = FrameBuffer(num_pixels)
+    frame.show()  # No output - just clears the dirty span
+    return frame
+
+def dirty(frame):
+    return (frame.dirty_start, frame.dirty_stop)
+
+@pytest.mark.parametrize("reverse, mirror, span", [
+    (False, False, (7, 9)),  # Zone pixels 2-3 are frame pixels 7-8
+    (True, False, (11, 13)),  # Counted back from frame pixel 14
+    (False, True, (7, 13)),  # 7-8 and their mirror images 11-12
+    (True, True, (6, 14)),  # 2-3 out from the middle: 12-13 and 6-7
+])
+def test_mark_dirty_marks_only_the_range(reverse, mirror, span):
+    frame = clean_frame()
+    zone = Zone(frame, 5, 10, reverse, mirror)
+    zone.mark_dirty(2, 4)
+    assert dirty(frame) == span
+
+@pytest.mark.parametrize("reverse, mirror", [(False, False), (True, False), (False, True), (True, True)])
+def test_mark_dirty_covers_the_pixels_drawn(reverse, mirror):
+    frame = clean_frame()
+    zone = Zone(frame, 5, 10, reverse, mirror)
+    before = bytes(frame.buf)
+    zone.fill_range(2, 4, (255, 0, 0))
+    changed = [i for i in range(frame.num_pixels) if frame.buf[i * 3:i * 3 + 3] != before[i * 3:i * 3 + 3]]
+
+    frame.show()
+    zone.mark_dirty(2, 4)
+    assert frame.dirty_start == min(changed)
+    assert frame.dirty_stop == max(changed) + 1
+
+def test_mark_dirty_is_clipped_to_the_zone():
+    frame = clean_frame()
+    zone = Zone(frame, 5, 10)
+    zone.mark_dirty(-3, 40)
+    assert dirty(frame) == (5, 15)
+    frame.show()
+    zone.mark_dirty(4, 4)
+    assert frame.dirty_start >= frame.dirty_stop
+
+def test_invalidate_marks_the_whole_zone():
+    frame = clean_frame()
+    Zone(frame, 5, 10, mirror=True).invalidate()
+    assert dirty(frame) == (5, 15)
+
+@pytest.mark.parametrize("reverse, mirror", [(False, False), (True, False), (False, True), (True, True)])
+def test_unchanged_zone_is_not_resent(reverse, mirror):
+    frame = FrameBuffer(20)
+    zone = Zone(frame, 5, 10, reverse, mirror)
+    run = b"".join(frame.pack((m + 1, 0, 0)) for m in range(3))
+    zone.tile(run, 1)
+    frame.show()
+    sent = frame.transmit_count
+
+    zone.tile(run, 1)
+    assert not frame.dirty
+    frame.show()
+    assert frame.transmit_count == sent